@@ -0,0 +1,4 @@
+"""
+Core of the MADGood Micro BTC Miner: config, cpuminer log parsing, stats,
+event bus and the headless runner. Nothing in here imports tkinter or PIL.
+"""
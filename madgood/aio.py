@@ -0,0 +1,143 @@
+"""
+One asyncio event loop on one background thread.
+
+The miner processes and their output, the API pollers, the stats
+aggregator, the network status poller, the power governor and the history
+recorder all run as tasks on this loop, so supervising N cpuminer
+instances costs no thread per instance. Results
+leave the loop through the EventBus (publish() is thread-safe), which the
+Tk thread drains once per frame.
+
+    loop = shared_loop()
+    future = loop.submit(some_coroutine())   # concurrent.futures.Future
+    value = loop.run(other_coroutine(), timeout=5)
+    task = loop.spawn(periodic_coroutine())     # asyncio.Task
+    loop.cancel(task)                            # returns once it has unwound
+"""
+import asyncio
+import concurrent.futures
+import os
+import sys
+import threading
+import warnings
+from typing import Optional
+
+
+def _use_pidfd_watcher(loop):
+    # Before 3.12 asyncio's default child watcher parks one thread per
+    # child in waitpid(); a pidfd lets the loop itself notice the exit.
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return  # kernel < 5.3
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        watcher = asyncio.PidfdChildWatcher()
+        watcher.attach_loop(loop)
+        asyncio.set_child_watcher(watcher)
+
+
+class LoopThread:
+    def __init__(self, name: str = "madgood-aio"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The event loop, started on first use.
+        """
+        with self._lock:
+            if self._loop is None or self._thread is None:
+                ready = threading.Event()
+                loop = asyncio.new_event_loop()
+                _use_pidfd_watcher(loop)
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+                    tasks = asyncio.all_tasks(loop)
+                    for task in tasks:
+                        task.cancel()
+                    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                    loop.close()
+
+                self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def in_loop(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro):
+        """
+        Schedule `coro` on the loop; returns a concurrent.futures.Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """
+        Run `coro` on the loop and wait for its result from another thread.
+        """
+        if self.in_loop():
+            raise RuntimeError("LoopThread.run() called from the loop thread")
+        return self.submit(coro).result(timeout)
+
+    def spawn(self, coro) -> asyncio.Task:
+        """
+        Start `coro` as a task on the loop and return the task, for cancel().
+        """
+        if self.in_loop():
+            return asyncio.ensure_future(coro)
+
+        async def start():
+            return asyncio.ensure_future(coro)
+
+        return self.run(start(), timeout=5)
+
+    def cancel(self, task: asyncio.Task, timeout: float = 5.0):
+        """
+        Cancel a spawn()ed task and wait (up to `timeout`) until its finally:
+        blocks have run, so the caller can tear down what it was using.
+        """
+        if self.in_loop():
+            task.cancel()
+            return
+
+        async def finish():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        try:
+            self.run(finish(), timeout)
+        except concurrent.futures.TimeoutError:
+            pass
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+
+
+_shared: Optional[LoopThread] = None
+_shared_lock = threading.Lock()
+
+
+def shared_loop() -> LoopThread:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LoopThread()
+        return _shared
@@ -0,0 +1,195 @@
+"""
+Client for cpuminer-opt's local API (--api-bind).
+
+The API is a one-shot TCP exchange: connect, send a command ("summary" or
+"threads"), read until the miner closes the socket. Replies are records of
+KEY=VALUE pairs separated by ';', records terminated by '|':
+
+    summary: NAME=cpuminer-opt;VER=25.6;...;HS=5131356.49;KHS=5131.36;
+             ACC=0;REJ=0;SOL=0;ACCMN=0.000;DIFF=0;...;UPTIME=8;TS=...|
+    threads: CPU=0;kH/s=5131.36|CPU=1;kH/s=5120.02|
+
+ApiPoller reads both on a schedule into MinerStats as a task on the
+supervisor's asyncio loop (run_async()). While it is healthy,
+handle_miner_lines() leaves hashrate and share counts to it and only
+falls back to the log when the API stops answering.
+"""
+import asyncio
+import socket
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .parsing import _to_hps
+from .stats import MinerStats
+
+DEFAULT_API_HOST = "127.0.0.1"
+DEFAULT_API_PORT = 4048
+
+
+class ApiSummary(NamedTuple):
+    hashrate: float     # H/s
+    accepted: int
+    rejected: int
+    solved: int
+    difficulty: float   # share difficulty
+    uptime: float       # seconds
+    version: str
+
+
+def free_port(host: str = DEFAULT_API_HOST) -> int:
+    """
+    A port nothing is listening on right now, so two miners (or another
+    app) never answer each other's API queries.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+async def query_async(command: str, host: str = DEFAULT_API_HOST, port: int = DEFAULT_API_PORT,
+                      timeout: float = 1.0) -> str:
+    async def exchange():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(command.encode())
+            await writer.drain()
+            return await reader.read()
+        finally:
+            writer.close()
+
+    data = await asyncio.wait_for(exchange(), timeout)
+    return data.decode("ascii", "replace").rstrip("\0\r\n ")
+
+
+def parse_reply(text: str) -> List[Dict[str, str]]:
+    records = []
+    for record in text.split("|"):
+        fields = {}
+        for pair in record.split(";"):
+            key, sep, value = pair.partition("=")
+            if sep:
+                fields[key.strip()] = value.strip()
+        if fields:
+            records.append(fields)
+    return records
+
+
+def _num(fields: Dict[str, str], key: str, default: float = 0.0) -> float:
+    try:
+        return float(fields.get(key, default))
+    except ValueError:
+        return default
+
+
+def parse_summary(text: str) -> Optional[ApiSummary]:
+    records = parse_reply(text)
+    if not records or "ACC" not in records[0]:
+        return None
+    f = records[0]
+    hashrate = _num(f, "HS", -1.0)
+    if hashrate < 0:
+        hashrate = _num(f, "KHS") * 1e3
+    return ApiSummary(
+        hashrate=hashrate,
+        accepted=int(_num(f, "ACC")),
+        rejected=int(_num(f, "REJ")),
+        solved=int(_num(f, "SOL")),
+        difficulty=_num(f, "DIFF"),
+        uptime=_num(f, "UPTIME"),
+        version=f.get("VER", ""),
+    )
+
+
+def parse_threads(text: str) -> Tuple[float, ...]:
+    """
+    Per-thread H/s in CPU order. Keys look like "H/s", "kH/s", "MH/s".
+    """
+    rates = []
+    for fields in parse_reply(text):
+        for key, value in fields.items():
+            if key.endswith("H/s") or key == "KHS":
+                unit = "k" if key == "KHS" else key[:-3]
+                try:
+                    rates.append((int(fields.get("CPU", len(rates))), _to_hps(value, unit)))
+                except ValueError:
+                    pass
+                break
+    return tuple(rate for _, rate in sorted(rates))
+
+
+class ApiPoller:
+    """
+    Polls one cpuminer's API every `interval` seconds into `stats`.
+
+    Share counts from the API are totals since that cpuminer started; they
+    are added to whatever `stats` held when the poller was created, the same
+    way a restarted miner carries its counters forward. Whenever the API
+    answers after being unhealthy, that base is raised to cover the shares
+    the log counted in the meantime, so the totals never drop or count a
+    share twice.
+    """
+
+    def __init__(self, stats: MinerStats, port: int, host: str = DEFAULT_API_HOST,
+                 interval: float = 1.0, timeout: float = 1.0):
+        self.stats = stats
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.timeout = timeout
+        self.summary: Optional[ApiSummary] = None
+        self.last_ok = 0.0
+        self.failures = 0
+
+        base = stats.snapshot()
+        self._base_accepted = base.shares_accepted
+        self._base_rejected = base.shares_rejected
+
+    @property
+    def healthy(self) -> bool:
+        return time.time() - self.last_ok <= 3 * self.interval + self.timeout
+
+    async def poll_async(self) -> bool:
+        try:
+            summary = parse_summary(await query_async("summary", self.host, self.port, self.timeout))
+            threads = parse_threads(await query_async("threads", self.host, self.port, self.timeout))
+        except (OSError, UnicodeError, asyncio.TimeoutError):
+            summary = threads = None
+        return self._apply(summary, threads)
+
+    def _apply(self, summary: Optional[ApiSummary], threads) -> bool:
+        if summary is None:
+            self.failures += 1
+            return False
+
+        now = time.time()
+        # Until now handle_miner_lines() counted shares from the log.
+        recovered = not self.healthy
+        self.summary = summary
+        self.last_ok = now
+        self.failures = 0
+        self.stats.set_hashrate(summary.hashrate, now)
+
+        def fold(snap):
+            if recovered:
+                self._base_accepted = max(self._base_accepted,
+                                          snap.shares_accepted - summary.accepted)
+                self._base_rejected = max(self._base_rejected,
+                                          snap.shares_rejected - summary.rejected)
+            return snap._replace(
+                thread_hashrates=threads,
+                share_difficulty=summary.difficulty,
+                shares_accepted=self._base_accepted + summary.accepted,
+                shares_rejected=self._base_rejected + summary.rejected,
+            )
+
+        self.stats.merge(fold)
+        return True
+
+    async def run_async(self):
+        """
+        Poll until cancelled, on the caller's event loop.
+        """
+        while True:
+            # cpuminer needs a moment to open the port.
+            await asyncio.sleep(self.interval)
+            await self.poll_async()
@@ -0,0 +1,314 @@
+"""
+Thread-count / layout autotuner.
+
+Runs `cpuminer --benchmark` briefly over a grid of thread counts and CPU
+layouts, reads the "Total: ... H/s" reports, and derives settings for the
+three power modes:
+
+  high:   the fastest configuration (ties within 2% go to fewer threads)
+  medium: the knee of the curve - the most threads for which every added
+          thread still brings at least half a core's worth of hashrate,
+          i.e. before SMT siblings start burning power for little gain
+  low:    one thread
+
+Results are cached in user_data_dir()/autotune.json keyed by CPU model,
+CPU count and the SHA-256 of the cpuminer binary, so a tuned machine starts
+at its optimum instantly. Without a cache entry the fixed mapping in
+miner.get_threads_for_power() is used.
+"""
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .config import CPUMINER_PATH, user_data_dir
+from .miner import get_threads_for_power, terminate_miner
+from .parsing import EVENT_HASHRATE, classify_line, iter_pipe_lines
+from .topology import (
+    CpuInfo,
+    affinity_mask,
+    plan_groups,
+    read_topology,
+    should_pin,
+)
+
+CACHE_NAME = "autotune.json"
+
+TIE_TOLERANCE = 0.02
+KNEE_FRACTION = 0.5
+
+
+class TuneResult(NamedTuple):
+    layout: str
+    threads: int
+    hashrate: float  # H/s, summed over instances
+
+
+class PowerSetting(NamedTuple):
+    threads: int
+    layout: str
+
+
+# ---------------- IDENTITY ----------------
+
+def cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.lower().startswith(("model name", "hardware", "cpu model")):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine() or "unknown"
+
+
+def binary_hash(path: str = CPUMINER_PATH) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(binary: str = CPUMINER_PATH) -> str:
+    return f"{cpu_model()}|{os.cpu_count() or 1}|{binary_hash(binary)}"
+
+
+def cache_path() -> str:
+    return os.path.join(user_data_dir(), CACHE_NAME)
+
+
+def _load_cache() -> Dict:
+    try:
+        with open(cache_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(data: Dict):
+    path = cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# ---------------- MEASURING ----------------
+
+def benchmark_command(binary: str, threads: int, cpus: Optional[List[int]] = None) -> List[str]:
+    cmd = [binary, "-a", "sha256d", "--benchmark", "-t", str(threads), "--no-color"]
+    if cpus is not None:
+        cmd += ["--cpu-affinity", affinity_mask(cpus)]
+    return cmd
+
+
+def _collect_rates(proc, rates: List[float]):
+    for batch in iter_pipe_lines(proc.stdout):
+        for line in batch:
+            # TTF estimates and per-thread "CPU #n" lines are hashrate
+            # events too; only the machine-wide reports count here.
+            if "Total:" not in line:
+                continue
+            ev = classify_line(line)
+            if ev is not None and ev.kind == EVENT_HASHRATE and ev.value > 0:
+                rates.append(ev.value)
+
+
+def measure(groups: List[List[int]], pin: bool, seconds: float = 15.0,
+            binary: str = CPUMINER_PATH) -> float:
+    """
+    Run one benchmark process per group at the same time; return the summed
+    H/s. Each process's first report is a warm-up and is ignored.
+    """
+    runs = []
+    try:
+        for cpus in groups:
+            proc = subprocess.Popen(
+                benchmark_command(binary, len(cpus), cpus if pin else None),
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            )
+            rates: List[float] = []
+            reader = threading.Thread(target=_collect_rates, args=(proc, rates), daemon=True)
+            reader.start()
+            runs.append((proc, rates, reader))
+
+        deadline = time.time() + seconds
+        # cpuminer reports roughly every 5 s; wait for two reports each.
+        while time.time() < deadline or any(len(r) < 2 for _, r, _ in runs):
+            if time.time() > deadline + 15 or any(p.poll() is not None for p, _, _ in runs):
+                break
+            time.sleep(0.2)
+    finally:
+        for proc, _, reader in runs:
+            terminate_miner(proc)
+            reader.join(timeout=2)
+
+    total = 0.0
+    for _, rates, _ in runs:
+        steady = rates[1:] or rates
+        if steady:
+            total += sum(steady) / len(steady)
+    return total
+
+
+def thread_grid(cpus: List[CpuInfo]) -> List[int]:
+    """
+    1, powers of two, half the physical cores, all physical cores, and all
+    logical CPUs.
+    """
+    logical = len(cpus)
+    physical = len({(c.package, c.core) for c in cpus})
+    grid = {1, max(1, physical // 2), physical, logical}
+    n = 2
+    while n < logical:
+        grid.add(n)
+        n *= 2
+    return sorted(grid)
+
+
+def candidate_layouts(cpus: List[CpuInfo]) -> List[str]:
+    layouts = ["single", "pinned"]
+    if len({c.node for c in cpus}) > 1:
+        layouts.append("node")
+    return layouts
+
+
+def run_autotune(seconds: float = 15.0, binary: str = CPUMINER_PATH,
+                 cpus: Optional[List[CpuInfo]] = None,
+                 progress: Optional[Callable[[TuneResult], None]] = None) -> Dict:
+    """
+    Measure the grid, store the result in the cache and return the entry.
+    """
+    cpus = read_topology() if cpus is None else cpus
+    results: List[TuneResult] = []
+    for layout in candidate_layouts(cpus):
+        for threads in thread_grid(cpus):
+            if layout == "pinned" and threads == len(cpus):
+                continue  # same CPUs as single
+            groups = plan_groups(cpus, threads, layout)
+            rate = measure(groups, should_pin(layout, groups), seconds, binary)
+            result = TuneResult(layout, threads, rate)
+            results.append(result)
+            if progress:
+                progress(result)
+
+    entry = {
+        "measured_at": time.time(),
+        "seconds": seconds,
+        "results": [list(r) for r in results],
+        "modes": {mode: list(s) for mode, s in fit_power_modes(results).items()},
+    }
+    data = _load_cache()
+    data[cache_key(binary)] = entry
+    _save_cache(data)
+    with _cached_lock:
+        _cached_modes.clear()  # the next lookup picks up the new entry
+    return entry
+
+
+# ---------------- FITTING ----------------
+
+def _curve(results: List[TuneResult], layout: str) -> List[Tuple[int, float]]:
+    return sorted((r.threads, r.hashrate) for r in results if r.layout == layout)
+
+
+def knee(points: List[Tuple[int, float]], fraction: float = KNEE_FRACTION) -> int:
+    """
+    Walk the measured curve and stop once the marginal gain per added
+    thread falls below `fraction` of the one-thread rate.
+    """
+    if not points:
+        return 1
+    t0, h0 = points[0]
+    per_thread = h0 / t0
+    best = t0
+    for (t1, h1), (t2, h2) in zip(points, points[1:]):
+        if (h2 - h1) / (t2 - t1) < fraction * per_thread:
+            break
+        best = t2
+    return best
+
+
+def fit_power_modes(results: List[TuneResult]) -> Dict[str, PowerSetting]:
+    measured = [r for r in results if r.hashrate > 0]
+    if not measured:
+        return {}
+    top = max(r.hashrate for r in measured)
+    high = min(
+        (r for r in measured if r.hashrate >= top * (1 - TIE_TOLERANCE)),
+        key=lambda r: (r.threads, r.layout != "single"),
+    )
+
+    medium = None
+    for layout in sorted({r.layout for r in measured}):
+        points = _curve(measured, layout)
+        t = knee(points)
+        rate = dict(points)[t]
+        if medium is None or rate > medium.hashrate:
+            medium = TuneResult(layout, t, rate)
+
+    return {
+        "high": PowerSetting(high.threads, high.layout),
+        "medium": PowerSetting(medium.threads, medium.layout),
+        "low": PowerSetting(1, "single"),
+    }
+
+
+# ---------------- LOOKUP ----------------
+
+# (binary path, size, mtime) -> modes; a replaced binary misses and is re-hashed.
+_cached_modes: Dict[Tuple[str, int, int], Dict[str, PowerSetting]] = {}
+_cached_lock = threading.Lock()
+
+
+def tuned_modes(binary: str = CPUMINER_PATH) -> Dict[str, PowerSetting]:
+    """
+    Power mode settings from the cache for this CPU and binary, or {}.
+    The binary is hashed once per process for as long as its size and
+    mtime stay the same.
+    """
+    try:
+        st = os.stat(binary)
+        memo = (os.path.abspath(binary), st.st_size, st.st_mtime_ns)
+    except OSError:
+        return {}
+    with _cached_lock:
+        modes = _cached_modes.get(memo)
+    if modes is None:
+        try:
+            entry = _load_cache().get(cache_key(binary), {})
+        except OSError:
+            entry = {}
+        modes = {
+            mode: PowerSetting(int(v[0]), str(v[1]))
+            for mode, v in entry.get("modes", {}).items()
+        }
+        with _cached_lock:
+            _cached_modes[memo] = modes
+    return modes
+
+
+def settings_for_power(mode: str = "high", layout: str = "auto",
+                       binary: str = CPUMINER_PATH) -> PowerSetting:
+    """
+    Threads and layout for a power mode: the tuned optimum if this machine
+    has been tuned, else the fixed core-count mapping. An explicit layout
+    (anything but "auto") always wins over the tuned one.
+    """
+    tuned = tuned_modes(binary).get(mode)
+    if tuned is None:
+        return PowerSetting(get_threads_for_power(mode), layout)
+    return PowerSetting(tuned.threads, tuned.layout if layout == "auto" else layout)
+
+
+def describe_cpus(cpus: List[CpuInfo]) -> str:
+    physical = len({(c.package, c.core) for c in cpus})
+    nodes = len({c.node for c in cpus})
+    return f"{cpu_model()} - {len(cpus)} CPUs, {physical} cores, {nodes} node(s)"
+
@@ -0,0 +1,75 @@
+import os
+import sys
+
+# ---------------- CONFIG ----------------
+
+APP_VERSION = "0.3.2"
+
+GIF_NAME = os.path.join("assets", "BTC Miner App.gif")   # Animated logo in assets/
+
+# Choose the right miner binary per OS
+if sys.platform.startswith("win"):
+    # Windows
+    CPUMINER_NAME = os.path.join("miner", "windows", "cpuminer.exe")
+elif sys.platform == "darwin":
+    # macOS
+    CPUMINER_NAME = os.path.join("miner", "mac", "cpuminer")
+else:
+    # Linux (what you're running now)
+    CPUMINER_NAME = os.path.join("miner", "linux", "cpuminer")
+
+README_FILENAME = "README.txt"
+
+# MADGOOD_POOL_HOST / MADGOOD_POOL_PORT point everything at another pool,
+# e.g. a local madgood.mockpool for offline runs.
+POOL_HOST = os.environ.get("MADGOOD_POOL_HOST", "solo.ckpool.org")
+POOL_PORT = int(os.environ.get("MADGOOD_POOL_PORT", "3333"))
+
+# Network info providers (block height as plain text, price as CoinGecko JSON)
+BLOCK_HEIGHT_URL = os.environ.get(
+    "MADGOOD_BLOCK_HEIGHT_URL", "https://blockstream.info/api/blocks/tip/height"
+)
+BTC_PRICE_URL = os.environ.get(
+    "MADGOOD_BTC_PRICE_URL",
+    "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd",
+)
+
+# Donation address (for future dev / support)
+DONATION_ADDRESS = "bc1qkjdpk5awqwswx7rl4nclh90x8gntm93g3y4mnc"
+
+
+# ---------------- PATH HELPERS ----------------
+
+def resource_path(relative_path: str) -> str:
+    """
+    Resolve path whether running from source or as a PyInstaller binary.
+    """
+    if hasattr(sys, "_MEIPASS"):
+        base = sys._MEIPASS
+    else:
+        base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, relative_path)
+
+
+def user_data_dir() -> str:
+    """
+    Per-user directory for caches and history (not created here).
+    MADGOOD_DATA_DIR overrides the platform default.
+    """
+    override = os.environ.get("MADGOOD_DATA_DIR")
+    if override:
+        return override
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(home, "Library", "Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+    return os.path.join(base, "madgood")
+
+
+LOGO_PATH = resource_path(GIF_NAME)
+# MADGOOD_CPUMINER swaps in another binary, e.g. madgood/fakeminer.py
+CPUMINER_PATH = os.environ.get("MADGOOD_CPUMINER") or resource_path(CPUMINER_NAME)
+README_PATH = resource_path(README_FILENAME)
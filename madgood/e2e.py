@@ -0,0 +1,98 @@
+"""
+Offline start -> connect -> mine -> stop cycle.
+
+Runs the real MinerSupervisor / process_miner_output() / ApiPoller stack
+against madgood/fakeminer.py and an in-process MockPool, and times:
+
+  connect_s          launch until the first job arrives
+  first_hashrate_s   launch until stats show a hashrate
+  lines_per_sec      log lines parsed per second while mining
+  stop_s             supervisor.stop() until every reader has finished
+
+    python3 -m madgood --e2e --bench-seconds 10 [--threads 4] [--e2e-out e2e.json]
+"""
+import os
+import time
+from typing import Dict, Optional
+
+from .events import EventBus
+from .logstore import LogStore
+from .mockpool import MockPool
+from .stats import MinerStats
+from .supervisor import MinerSupervisor
+
+FAKE_CPUMINER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fakeminer.py")
+
+# Fast enough to finish in seconds, busy enough to load the parser.
+DEFAULT_FAKE_ENV = {
+    "MADGOOD_FAKE_REPORT": "0.5",
+    "MADGOOD_FAKE_STARTUP": "0.1",
+    "MADGOOD_FAKE_SHARES": "60",
+    "MADGOOD_FAKE_NOISE": "2000",
+}
+
+
+def run_end_to_end(seconds: float = 10.0, threads: int = 2, use_api: bool = True,
+                   fake_env: Optional[Dict[str, str]] = None,
+                   binary: str = FAKE_CPUMINER) -> Dict:
+    pool = MockPool(job_interval=1.0, block_interval=5.0)
+    host, port = pool.start_background()
+
+    fake = dict(DEFAULT_FAKE_ENV, **(fake_env or {}))
+
+    stats = MinerStats()
+    bus = EventBus()
+    log_store = LogStore(maxlen=200)
+    supervisor = MinerSupervisor(
+        "bc1qe2etest", [list(range(threads))], stats, bus, log_store,
+        pool_host=host, pool_port=port, binary=binary, pin=False, use_api=use_api,
+        env=dict(os.environ, **fake),
+    )
+    result = {"threads": threads, "seconds": seconds, "use_api": use_api, "fake_env": fake}
+    try:
+        t0 = time.perf_counter()
+        stats.start()
+        supervisor.start()
+        connect = first_rate = None
+        deadline = t0 + 15.0
+        while (connect is None or first_rate is None) and time.perf_counter() < deadline:
+            snap = stats.snapshot()
+            now = time.perf_counter()
+            if connect is None and snap.block_attempts > 0:
+                connect = now - t0
+            if first_rate is None and snap.hashrate > 0:
+                first_rate = now - t0
+            if not supervisor.is_running():
+                break
+            bus.dispatch()
+            time.sleep(0.002)
+        result["connect_s"] = connect
+        result["first_hashrate_s"] = first_rate
+
+        seq0, _ = log_store.since(0)
+        m0 = time.perf_counter()
+        rates = []
+        while time.perf_counter() - m0 < seconds and supervisor.is_running():
+            time.sleep(0.1)  # one UI frame
+            bus.dispatch()
+            rates.append(stats.snapshot().hashrate)
+        seq1, _ = log_store.since(0)
+        span = time.perf_counter() - m0
+        result["lines_per_sec"] = (seq1 - seq0) / span if span else 0.0
+        result["mean_hashrate"] = sum(rates) / len(rates) if rates else 0.0
+        result["miner_alive"] = supervisor.is_running()
+
+        s0 = time.perf_counter()
+        supervisor.stop()
+        supervisor.wait(timeout=10)
+        stats.stop()
+        result["stop_s"] = time.perf_counter() - s0
+
+        snap = stats.snapshot()
+        result["jobs"] = snap.block_attempts
+        result["shares"] = [snap.shares_accepted, snap.shares_rejected]
+        result["pool"] = pool.stats()._asdict()
+    finally:
+        supervisor.stop()
+        pool.stop()
+    return result
@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+from typing import NamedTuple
+
+
+# Bus event kinds (payload in brackets)
+BUS_HASHRATE = "hashrate"      # [H/s]
+BUS_JOB = "job"                # [job id]
+BUS_SHARE = "share"            # [True = accepted, False = rejected]
+BUS_BLOCK = "block"            # [None] a block was found
+BUS_CONNECTION = "connection"  # [True/False] pool connectivity changed
+BUS_STATUS = "status"          # [status text]
+BUS_NETWORK = "network"        # [None] price / tip height refreshed
+BUS_MINER_EXIT = "miner_exit"  # [MinerSupervisor] every cpuminer it ran has exited
+
+
+class BusEvent(NamedTuple):
+    kind: str
+    payload: object = None
+
+
+class EventBus:
+    """
+    Thread-safe queue of typed events between worker threads and one
+    consumer thread.
+
+    publish() may be called from any thread. The consumer calls dispatch()
+    on its own schedule; every event queued since the previous call is
+    handed to each subscriber as one ordered list, so a burst of updates
+    costs one callback per subscriber instead of one per event.
+    """
+
+    def __init__(self):
+        self._queue = deque()  # append/popleft are atomic
+        self._subscribers = []
+        self._sub_lock = threading.Lock()
+
+    def publish(self, kind: str, payload=None):
+        self._queue.append(BusEvent(kind, payload))
+
+    def subscribe(self, callback, kinds=None):
+        """
+        Register callback(events) for the given event kinds (all if None).
+        """
+        kinds = frozenset(kinds) if kinds else None
+        with self._sub_lock:
+            self._subscribers.append((callback, kinds))
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._sub_lock:
+            self._subscribers = [
+                (cb, kinds) for cb, kinds in self._subscribers if cb != callback
+            ]
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def dispatch(self) -> int:
+        """
+        Deliver everything queued so far. Returns the number of events.
+        """
+        queue = self._queue
+        popleft = queue.popleft
+        events = [popleft() for _ in range(len(queue))]
+        if not events:
+            return 0
+
+        with self._sub_lock:
+            subscribers = list(self._subscribers)
+        for callback, kinds in subscribers:
+            batch = events if kinds is None else [e for e in events if e.kind in kinds]
+            if batch:
+                callback(batch)
+        return len(events)
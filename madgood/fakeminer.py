@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Stand-in for cpuminer-opt, for offline end-to-end runs.
+
+Takes the same command line the app builds (-o stratum+tcp://host:port,
+-u, -t, --api-bind, --benchmark, ...), speaks real Stratum to the pool
+(normally madgood.mockpool) and prints cpuminer-opt 25.6 style log lines at
+a controlled rate. Standard library only and no package imports, so the
+file can be pointed at directly:
+
+    MADGOOD_CPUMINER=madgood/fakeminer.py MADGOOD_POOL_HOST=127.0.0.1 \\
+        MADGOOD_POOL_PORT=3333 python3 -m madgood --wallet bc1q...
+
+Behaviour is scripted through the environment:
+
+    MADGOOD_FAKE_HASHRATE   kH/s per thread (default 5000)
+    MADGOOD_FAKE_REPORT     seconds between "Total:" lines (default 5)
+    MADGOOD_FAKE_STARTUP    seconds from launch to mining (default 0.2)
+    MADGOOD_FAKE_SHARES     shares submitted per minute (default 2)
+    MADGOOD_FAKE_NOISE      extra debug lines per second (default 0)
+    MADGOOD_FAKE_RECONNECT  drop and re-open the pool connection every N s
+    MADGOOD_FAKE_CRASH      die with status 139 after N s
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+
+
+def _env(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get("MADGOOD_FAKE_" + name, default))
+    except ValueError:
+        return default
+
+
+HASHRATE_KHS = _env("HASHRATE", 5000.0)
+REPORT_INTERVAL = max(0.05, _env("REPORT", 5.0))
+STARTUP_DELAY = _env("STARTUP", 0.2)
+SHARES_PER_MIN = _env("SHARES", 2.0)
+NOISE_PER_SEC = _env("NOISE", 0.0)
+RECONNECT_EVERY = _env("RECONNECT", 0.0)
+CRASH_AFTER = _env("CRASH", 0.0)
+
+_out_lock = threading.Lock()
+
+
+def log(msg: str, stamp: bool = True):
+    line = f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {msg}" if stamp else msg
+    with _out_lock:
+        try:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            os._exit(0)
+
+
+def _height_from_coinb1(coinb1: str) -> int:
+    # BIP34: the coinbase script starts with a push of the height.
+    try:
+        n = int(coinb1[84:86], 16)
+        return int.from_bytes(bytes.fromhex(coinb1[86:86 + 2 * n]), "little") if n <= 8 else 0
+    except ValueError:
+        return 0
+
+
+class FakeMiner:
+    def __init__(self, args):
+        self.args = args
+        self.threads = max(1, args.threads)
+        self.started = time.time()
+        self.accepted = 0
+        self.rejected = 0
+        self.diff = 0.0
+        self.shown_diff = None
+        self.job = None          # notify params
+        self.height = 0
+        self.extranonce2_size = 4
+        self.sock = None
+        self.msg_id = 10
+        self.pending = {}        # id -> (kind, submitted at)
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+
+    # ---------- Output ----------
+
+    def rate(self) -> float:
+        return HASHRATE_KHS * self.threads * random.uniform(0.99, 1.01)
+
+    def report_loop(self):
+        next_report = time.time() + REPORT_INTERVAL
+        next_share = time.time() + self._share_gap()
+        next_noise = time.time()
+        while not self.stop.is_set():
+            now = time.time()
+            if CRASH_AFTER and now - self.started >= CRASH_AFTER:
+                log("Segmentation fault", stamp=False)
+                os._exit(139)
+            if now >= next_report:
+                log(f"Total: {self.rate():.2f} kH/s, Temp: 0C, Freq: 0.000/0.000 GHz")
+                next_report += REPORT_INTERVAL
+            if self.sock is not None and self.job is not None and now >= next_share:
+                self.submit()
+                next_share = now + self._share_gap()
+            if NOISE_PER_SEC > 0:
+                while next_noise <= now:
+                    log(f"DEBUG: hash_count {random.getrandbits(40)}, nonce 0x{random.getrandbits(32):08x}")
+                    next_noise += 1.0 / NOISE_PER_SEC
+            wait = min(next_report, next_share) - time.time()
+            if NOISE_PER_SEC > 0:
+                wait = min(wait, next_noise - time.time())
+            self.stop.wait(max(0.001, min(wait, 0.5)))
+
+    def _share_gap(self) -> float:
+        if SHARES_PER_MIN <= 0:
+            return float("inf")
+        return random.expovariate(SHARES_PER_MIN / 60.0)
+
+    # ---------- Stratum ----------
+
+    def send(self, method: str, params, kind: str = "") -> int:
+        with self.lock:
+            self.msg_id += 1
+            msg_id = self.msg_id
+            self.pending[msg_id] = (kind or method, time.time())
+            data = json.dumps({"id": msg_id, "method": method, "params": params}) + "\n"
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.sendall(data.encode())
+            except OSError:
+                pass
+        return msg_id
+
+    def submit(self):
+        job = self.job
+        en2 = os.urandom(self.extranonce2_size).hex()
+        nonce = f"{random.getrandbits(32):08x}"
+        log(f"{self.accepted + self.rejected + 1} Submitted Diff {self.diff * random.uniform(1, 3):.4g}, "
+            f"Block {self.height}, Job {job[0]}")
+        self.send("mining.submit", [self.args.user, job[0], en2, job[7], nonce], "submit")
+
+    def connect(self, url: str) -> bool:
+        host, _, port = url.split("://", 1)[-1].rpartition(":")
+        try:
+            sock = socket.create_connection((host, int(port)), timeout=5)
+        except (OSError, ValueError):
+            return False
+        sock.settimeout(None)
+        self.sock = sock
+        self.send("mining.subscribe", ["cpuminer-opt-25.6"])
+        self.send("mining.authorize", [self.args.user, self.args.password])
+        return True
+
+    def handle(self, msg: dict):
+        method = msg.get("method")
+        params = msg.get("params") or []
+        if method == "mining.set_difficulty":
+            self.diff = float(params[0])
+            return
+        if method == "mining.notify":
+            old = self.job
+            self.job = params
+            height = _height_from_coinb1(params[2]) or self.height
+            txs = random.randint(1500, 4000)
+            if old is None or self.diff != self.shown_diff:
+                self.shown_diff = self.diff
+                log(f"New Stratum Diff {self.diff:g}, Block {height}, Tx {txs}, Job {params[0]}")
+            elif old[1] != params[1]:
+                log(f"New Block {height}, Tx {txs}, Net Diff 1.2e+14, Job {params[0]}")
+            else:
+                log(f"New Work: Block {height}, Tx {txs}, Net Diff 1.2e+14, Job {params[0]}")
+            self.height = height
+            return
+        if method == "mining.set_extranonce":
+            log(f"Stratum extranonce1 0x{params[0]}, extranonce2 size {params[1]}")
+            self.extranonce2_size = int(params[1])
+            return
+
+        with self.lock:
+            kind, sent_at = self.pending.pop(msg.get("id"), ("", 0.0))
+        result = msg.get("result")
+        if kind == "mining.subscribe" and result:
+            self.extranonce2_size = int(result[2])
+            log(f"Stratum extranonce1 0x{result[1]}, extranonce2 size {result[2]}")
+        elif kind == "mining.authorize" and not result:
+            log("Stratum authentication failed")
+            os._exit(1)
+        elif kind == "submit":
+            ms = int((time.time() - sent_at) * 1000)
+            if result:
+                self.accepted += 1
+                log(f"{self.accepted + self.rejected} Accepted {self.accepted} S0 R{self.rejected} B0, "
+                    f"{ms / 1000:.3f} sec ({ms}ms)")
+            else:
+                self.rejected += 1
+                reason = (msg.get("error") or [0, "rejected"])
+                log(f"{self.accepted + self.rejected} Rejected {self.rejected} S0 R{self.rejected} B0, "
+                    f"{ms / 1000:.3f} sec ({ms}ms)")
+                log(f"Reject reason: {reason[1] if isinstance(reason, list) else reason}")
+
+    def read_loop(self):
+        buf = b""
+        sock = self.sock
+        while True:
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                data = b""
+            if not data:
+                return
+            buf += data
+            *lines, buf = buf.split(b"\n")
+            for raw in lines:
+                if raw.strip():
+                    try:
+                        self.handle(json.loads(raw))
+                    except (ValueError, TypeError, IndexError, KeyError):
+                        pass
+
+    def session(self):
+        url = self.args.url
+        first = True
+        while not self.stop.is_set():
+            log(f"Starting Stratum on {url}")
+            if not self.connect(url):
+                if first:
+                    log("Stratum connection failed")
+                    os._exit(1)
+                self.stop.wait(1.0)
+                continue
+            first = False
+            log("Stratum connection established")
+            if RECONNECT_EVERY > 0:
+                timer = threading.Timer(RECONNECT_EVERY, self._drop)
+                timer.daemon = True
+                timer.start()
+            self.read_loop()
+            self.sock = None
+            self.job = None
+            if not self.stop.is_set():
+                log("Stratum connection interrupted")
+                self.stop.wait(0.5)
+
+    def _drop(self):
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    # ---------- API ----------
+
+    def api_reply(self, command: str) -> str:
+        if command.startswith("threads"):
+            per = self.rate() / self.threads
+            return "".join(f"CPU={i};kH/s={per:.2f}|" for i in range(self.threads))
+        if command.startswith("summary"):
+            khs = self.rate()
+            return (f"NAME=cpuminer-opt;VER=25.6;API=1.0;ALGO=sha256d;CPUS={self.threads};"
+                    f"URL={self.args.url};HS={khs * 1000:.2f};KHS={khs:.2f};"
+                    f"ACC={self.accepted};REJ={self.rejected};SOL=0;ACCMN=0.000;"
+                    f"DIFF={self.diff:g};TEMP=0.0;FAN=0;FREQ=0;"
+                    f"UPTIME={int(time.time() - self.started)};TS={int(time.time())}|")
+        return ""
+
+    def api_loop(self, bind: str):
+        host, _, port = bind.rpartition(":")
+        srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        srv.bind((host or "127.0.0.1", int(port)))
+        srv.listen(8)
+        log(f"API listening to {host or '127.0.0.1'}:{port}")
+        while True:
+            conn, _ = srv.accept()
+            with conn:
+                try:
+                    command = conn.recv(1024).decode("ascii", "replace").strip()
+                    conn.sendall(self.api_reply(command).encode() + b"\0")
+                except OSError:
+                    pass
+
+    # ---------- Main ----------
+
+    def run(self):
+        log("         **********  cpuminer-opt 25.6  ***********", stamp=False)
+        log("CPU: Fake CPU for offline tests", stamp=False)
+        if self.args.api_bind:
+            threading.Thread(target=self.api_loop, args=(self.args.api_bind,), daemon=True).start()
+        if not self.args.benchmark:
+            threading.Thread(target=self.session, daemon=True).start()
+        time.sleep(STARTUP_DELAY)
+        log(f"{self.threads} of {self.threads} miner threads started using 'sha256d' algorithm")
+        self.report_loop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("-o", "--url", default="")
+    parser.add_argument("-u", "--user", default="")
+    parser.add_argument("-p", "--password", default="x")
+    parser.add_argument("-t", "--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--api-bind", default="")
+    parser.add_argument("--benchmark", action="store_true")
+    args, _ = parser.parse_known_args(argv)
+    if not args.url and not args.benchmark:
+        log("No URL supplied", stamp=False)
+        return 1
+
+    miner = FakeMiner(args)
+
+    def on_term(signum, frame):
+        log("SIGTERM received, exiting")
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, on_term)
+    signal.signal(signal.SIGINT, on_term)
+    miner.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
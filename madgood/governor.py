@@ -0,0 +1,277 @@
+"""
+Runtime power governor.
+
+Samples /proc/stat, /proc/loadavg and /sys/class/thermal/thermal_zone*/temp
+every few seconds and moves the number of CPUs the miner may run on between
+`min_cpus` and `max_cpus`:
+
+  - too hot (>= temp_high): step down right away
+  - other work needs CPUs: step down to leave room for it
+  - cool (<= temp_low) and idle for `up_samples` samples in a row: step up
+
+The gap between temp_high/temp_low and between the busy/idle thresholds,
+plus the `cooldown` after every change, keeps it from oscillating. Every
+change is reported with its reason.
+
+All paths hang off `root`, so tests can point it at a fake tree:
+
+    root/proc/stat, root/proc/loadavg, root/sys/class/thermal/thermal_zone0/temp
+"""
+import asyncio
+import glob
+import math
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Iterable, List, NamedTuple, Optional
+
+from .aio import LoopThread, shared_loop
+
+
+class CpuTimes(NamedTuple):
+    busy: int
+    total: int
+
+
+class GovernorSample(NamedTuple):
+    time: float
+    cpu_busy: float      # 0..1 over all CPUs since the previous sample
+    miner_busy: float    # 0..1 share of that taken by the miner processes
+    load1: float         # 1-minute load average
+    temp: Optional[float]  # hottest thermal zone, degrees C
+
+
+class GovernorDecision(NamedTuple):
+    time: float
+    old: int
+    new: int
+    reason: str
+
+
+# ---------------- SAMPLING ----------------
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_cpu_times(root: str = "/") -> Optional[CpuTimes]:
+    text = _read(os.path.join(root, "proc", "stat"))
+    if not text or not text.startswith("cpu "):
+        return None
+    fields = [int(x) for x in text.split("\n", 1)[0].split()[1:]]
+    # user nice system idle iowait irq softirq steal [guest guest_nice]
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    total = sum(fields[:8])
+    return CpuTimes(total - idle, total)
+
+
+def read_loadavg(root: str = "/") -> float:
+    text = _read(os.path.join(root, "proc", "loadavg"))
+    try:
+        return float(text.split()[0])
+    except (AttributeError, IndexError, ValueError):
+        return 0.0
+
+
+def read_max_temp(root: str = "/") -> Optional[float]:
+    temps = []
+    pattern = os.path.join(root, "sys", "class", "thermal", "thermal_zone*", "temp")
+    for path in glob.glob(pattern):
+        text = _read(path)
+        try:
+            value = int(text.strip())
+        except (AttributeError, ValueError):
+            continue
+        if value > 0:
+            temps.append(value / 1000.0)  # millidegrees
+    return max(temps) if temps else None
+
+
+def read_process_ticks(pids: Iterable[int], root: str = "/") -> int:
+    """
+    utime + stime (clock ticks) summed over `pids`.
+    """
+    ticks = 0
+    for pid in pids:
+        text = _read(os.path.join(root, "proc", str(pid), "stat"))
+        if not text:
+            continue
+        # The command name may contain spaces; fields resume after ')'.
+        fields = text.rsplit(")", 1)[-1].split()
+        try:
+            ticks += int(fields[11]) + int(fields[12])
+        except (IndexError, ValueError):
+            pass
+    return ticks
+
+
+# ---------------- GOVERNOR ----------------
+
+class Governor:
+    """
+    Decides how many CPUs the miner may use. `apply(n)` is called with the
+    new count; `pids()` lists the miner processes so their own CPU use is
+    not mistaken for other work.
+    """
+
+    def __init__(
+        self,
+        max_cpus: int,
+        apply: Callable[[int], None],
+        min_cpus: int = 1,
+        pids: Callable[[], List[int]] = list,
+        on_decision: Optional[Callable[[GovernorDecision], None]] = None,
+        root: str = "/",
+        interval: float = 5.0,
+        temp_high: float = 85.0,
+        temp_low: float = 75.0,
+        busy_high: float = 0.5,
+        busy_low: float = 0.2,
+        up_samples: int = 3,
+        cooldown: float = 15.0,
+        cpu_count: Optional[int] = None,
+        loop: Optional[LoopThread] = None,
+    ):
+        self.max_cpus = max(1, max_cpus)
+        self.min_cpus = max(1, min(min_cpus, self.max_cpus))
+        self.apply = apply
+        self.pids = pids
+        self.on_decision = on_decision
+        self.root = root
+        self.interval = interval
+        self.temp_high = temp_high
+        self.temp_low = temp_low
+        self.busy_high = busy_high  # other work beyond the free CPUs, in CPUs
+        self.busy_low = busy_low
+        self.up_samples = up_samples
+        self.cooldown = cooldown
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+
+        self.active = self.max_cpus
+        self.decisions: Deque[GovernorDecision] = deque(maxlen=100)
+        self._last_times: Optional[CpuTimes] = None
+        self._last_ticks = 0
+        self._last_change = 0.0
+        self._calm = 0
+        self.loop = loop  # shared_loop() unless given
+        self._task = None
+
+    def sample(self, now: Optional[float] = None) -> Optional[GovernorSample]:
+        """
+        Read the counters. The first call only primes the deltas and
+        returns None.
+        """
+        now = time.time() if now is None else now
+        times = read_cpu_times(self.root)
+        ticks = read_process_ticks(self.pids(), self.root)
+        last, last_ticks = self._last_times, self._last_ticks
+        self._last_times, self._last_ticks = times, ticks
+        if times is None or last is None or times.total <= last.total:
+            return None
+        span = times.total - last.total
+        return GovernorSample(
+            time=now,
+            cpu_busy=(times.busy - last.busy) / span,
+            # Both in clock ticks; the "cpu" line sums every CPU, so this is
+            # the miner's share of the whole machine.
+            miner_busy=min(1.0, max(0, ticks - last_ticks) / span),
+            load1=read_loadavg(self.root),
+            temp=read_max_temp(self.root),
+        )
+
+    def decide(self, s: GovernorSample) -> Optional[GovernorDecision]:
+        """
+        Decide on one sample without touching the system; returns the
+        change to make, if any.
+        """
+        other_cpus = max(0.0, s.cpu_busy - s.miner_busy) * self.cpu_count
+        # The miner's threads stay runnable even when squeezed onto fewer
+        # CPUs, so only load beyond all of them counts as other demand.
+        other_cpus = max(other_cpus, s.load1 - self.max_cpus)
+        free = self.cpu_count - self.active
+        hot = s.temp is not None and s.temp >= self.temp_high
+        cool = s.temp is None or s.temp <= self.temp_low
+        busy = other_cpus - free >= self.busy_high
+        # Would other work still fit with one CPU less to spare?
+        idle = other_cpus - (free - 1) <= self.busy_low
+
+        target = self.active
+        reason = ""
+        if hot and self.active > self.min_cpus:
+            target = self.active - 1
+            reason = f"temp {s.temp:.0f}C >= {self.temp_high:.0f}C"
+        elif busy and self.active > self.min_cpus:
+            wanted = max(self.min_cpus, self.cpu_count - math.ceil(other_cpus))
+            target = max(wanted, self.active - max(1, (self.active - wanted) // 2))
+            reason = f"other work using {other_cpus:.1f} CPUs, {free} free"
+
+        if target < self.active:
+            self._calm = 0
+        elif cool and idle and self.active < self.max_cpus:
+            self._calm += 1
+            if self._calm >= self.up_samples and s.time - self._last_change >= self.cooldown:
+                target = self.active + 1
+                temp = "n/a" if s.temp is None else f"{s.temp:.0f}C"
+                reason = f"cool ({temp}) and idle (other work {other_cpus:.1f} CPUs)"
+        else:
+            self._calm = 0
+
+        if target == self.active:
+            return None
+        if target > self.active or not hot:
+            # Cool-down applies to everything except thermal emergencies.
+            if s.time - self._last_change < self.cooldown:
+                return None
+        return GovernorDecision(s.time, self.active, target, reason)
+
+    def step(self, now: Optional[float] = None) -> Optional[GovernorDecision]:
+        s = self.sample(now)
+        if s is None:
+            return None
+        decision = self.decide(s)
+        if decision is not None:
+            self.active = decision.new
+            self._last_change = decision.time
+            self._calm = 0
+            self.decisions.append(decision)
+            self.apply(decision.new)
+            if self.on_decision:
+                self.on_decision(decision)
+        return decision
+
+    # ---------- Scheduling ----------
+
+    def start(self):
+        """
+        Step every `interval` seconds as a task on the miners' event loop;
+        a step is a few small /proc and /sys reads.
+        """
+        if self._task is not None:
+            return
+        if self.loop is None:
+            self.loop = shared_loop()
+        self._task = self.loop.spawn(self._run())
+
+    def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            self.loop.cancel(task, timeout=2)
+
+    async def _run(self):
+        read = self.sample  # the first read only primes the deltas
+        while True:
+            try:
+                read()
+            except Exception:
+                pass  # never let a bad sample kill mining
+            read = self.step
+            await asyncio.sleep(self.interval)
+
+
+def describe(decision: GovernorDecision) -> str:
+    arrow = "down" if decision.new < decision.old else "up"
+    return f"Governor: {arrow} {decision.old} -> {decision.new} CPUs ({decision.reason})"
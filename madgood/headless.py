@@ -0,0 +1,618 @@
+"""
+Headless miner: same command line, log parsing, power modes and network
+polling as the GUI, without importing tkinter or PIL.
+
+    python3 -m madgood --wallet <BTC address> [--power low] [--stats-interval 60]
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+
+from .config import APP_VERSION, CPUMINER_PATH, POOL_HOST, POOL_PORT
+from .events import BUS_STATUS, EventBus
+from .logstore import LogStore
+from .autotune import settings_for_power
+from .miner import POWER_MODES
+from .stats import MinerStats, StatsSnapshot
+from .supervisor import MinerSupervisor
+from .topology import (
+    LAYOUTS,
+    format_cpu_list,
+    plan_groups,
+    read_topology,
+    should_pin,
+)
+
+
+def log(msg: str):
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
+
+
+def format_stats(snap: StatsSnapshot, now: float) -> str:
+    return (
+        f"hashrate={snap.hashrate:,.2f} H/s "
+        f"total={int(snap.hashes_at(now)):,} "
+        f"jobs={snap.block_attempts} "
+        f"shares={snap.shares_accepted}/{snap.shares_rejected} "
+        f"diff={snap.share_difficulty:g} "
+        f"blocks={snap.blocks_found} "
+        f"height={snap.block_height} "
+        f"pool={'up' if snap.connected else 'down'} "
+        f"uptime={int(snap.uptime_at(now))}s"
+    )
+
+
+def parse_pool(value: str):
+    host, sep, port = value.rpartition(":")
+    if not sep:
+        return value, POOL_PORT
+    try:
+        return host, int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid pool address: {value!r}")
+
+
+def parse_listen(value: str):
+    host, sep, port = value.rpartition(":")
+    try:
+        return (host if sep and host else "127.0.0.1"), int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid listen address: {value!r}")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="madgood",
+        description="MADGood Micro BTC Miner (headless cpuminer-opt runner)",
+    )
+    parser.add_argument("--wallet", help="BTC address to mine to (pool username)")
+    parser.add_argument(
+        "--pool",
+        type=parse_pool,
+        default=(POOL_HOST, POOL_PORT),
+        metavar="HOST[:PORT]",
+        help=f"stratum pool (default: {POOL_HOST}:{POOL_PORT})",
+    )
+    parser.add_argument(
+        "--power",
+        choices=POWER_MODES,
+        default="high",
+        help="power mode used to pick the thread count (default: high)",
+    )
+    parser.add_argument(
+        "--threads", type=int, help="explicit thread count (overrides --power)"
+    )
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default="auto",
+        help="cpuminer processes: one per NUMA node, per physical core, or a "
+             "single one; auto splits per node on multi-socket machines "
+             "(default: auto)",
+    )
+    parser.add_argument(
+        "--governor",
+        action="store_true",
+        help="shrink/grow the CPUs cpuminer runs on with temperature and "
+             "other load (Linux)",
+    )
+    parser.add_argument(
+        "--max-temp",
+        type=float,
+        default=85.0,
+        metavar="C",
+        help="governor steps down at this temperature, back up 10C below "
+             "(default: 85)",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="print a stats line this often; 0 disables (default: 60)",
+    )
+    parser.add_argument(
+        "--cpuminer", default=CPUMINER_PATH, help="path to the cpuminer binary"
+    )
+    parser.add_argument(
+        "--no-network",
+        action="store_true",
+        help="don't poll block height / BTC price over HTTP",
+    )
+    parser.add_argument(
+        "--no-api",
+        action="store_true",
+        help="don't enable cpuminer's local API; take numbers from its log",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=parse_listen,
+        metavar="[HOST:]PORT",
+        help="serve Prometheus/OpenMetrics stats on http://HOST:PORT/metrics "
+             "(host defaults to 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="don't record per-second stats to the on-disk session history",
+    )
+    parser.add_argument(
+        "--history",
+        type=float,
+        metavar="HOURS",
+        help="print the recorded history of the last HOURS and exit",
+    )
+    parser.add_argument(
+        "--no-log-archive",
+        action="store_true",
+        help="don't keep the full cpuminer log in compressed files on disk",
+    )
+    parser.add_argument(
+        "--log-tail",
+        type=int,
+        metavar="N",
+        help="print the last N archived cpuminer log lines and exit",
+    )
+    parser.add_argument(
+        "--log-search",
+        metavar="TEXT",
+        help="print archived cpuminer log lines containing TEXT and exit",
+    )
+    parser.add_argument(
+        "--show-log",
+        action="store_true",
+        help="echo raw cpuminer output",
+    )
+    parser.add_argument(
+        "--proxy",
+        type=parse_listen,
+        metavar="[HOST:]PORT",
+        help="run a Stratum proxy here instead of cpuminer: local miners "
+             "connect to it and share one --pool connection",
+    )
+    parser.add_argument(
+        "--builtin",
+        action="store_true",
+        help="mine with the built-in sha256d engine in --power/--threads "
+             "worker processes instead of cpuminer (for systems without a "
+             "cpuminer binary; much slower)",
+    )
+    parser.add_argument(
+        "--autotune",
+        action="store_true",
+        help="benchmark cpuminer over thread counts and layouts, cache the "
+             "best settings for each power mode and exit (uses --bench-seconds "
+             "per point)",
+    )
+    parser.add_argument(
+        "--bench-parser",
+        action="store_true",
+        help="measure log classifier throughput and exit",
+    )
+    parser.add_argument(
+        "--replay",
+        nargs="+",
+        metavar="LOG",
+        help="replay cpuminer logs through the parser/UI pipeline and report "
+             "throughput, latency and queue depth, then exit. LOG is a "
+             "scenario (startup, steady, reconnect, debug, all) or a captured "
+             "log file",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=0.0,
+        metavar="X",
+        help="replay at X times real time; 0 = as fast as possible (default)",
+    )
+    parser.add_argument(
+        "--replay-out",
+        metavar="FILE",
+        help="save the --replay results as JSON",
+    )
+    parser.add_argument(
+        "--replay-compare",
+        metavar="FILE",
+        help="compare the --replay results with an earlier JSON report",
+    )
+    parser.add_argument(
+        "--e2e",
+        action="store_true",
+        help="run an offline start/mine/stop cycle against the fake cpuminer "
+             "and a local mock pool for --bench-seconds, print timings as "
+             "JSON and exit",
+    )
+    parser.add_argument(
+        "--e2e-out",
+        metavar="FILE",
+        help="save the --e2e timings as JSON",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="measure the built-in sha256d engine (H/s per core, or across "
+             "--threads worker processes) and exit",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("auto", "numpy", "hashlib"),
+        default="auto",
+        help="built-in hashing engine for --benchmark and --builtin "
+             "(default: auto)",
+    )
+    parser.add_argument(
+        "--bench-seconds",
+        type=float,
+        default=5.0,
+        metavar="SECONDS",
+        help="duration of --benchmark (default: 5)",
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {APP_VERSION}"
+    )
+    return parser
+
+
+def run(args) -> int:
+    if not os.path.exists(args.cpuminer):
+        log(f"ERROR: cpuminer not found at {args.cpuminer} "
+            f"(--builtin mines without it)")
+        return 1
+
+    setting = settings_for_power(args.power, args.layout, args.cpuminer)
+    threads = args.threads if args.threads else setting.threads
+    pool_host, pool_port = args.pool
+    groups = plan_groups(read_topology(), threads, setting.layout)
+
+    archive = None
+    if not args.no_log_archive:
+        from .logarchive import LogArchive
+
+        try:
+            archive = LogArchive()
+            archive.start()
+        except OSError as e:
+            log(f"Log archive disabled: {e}")
+
+    stats = MinerStats()
+    bus = EventBus()
+    log_store = LogStore(maxlen=200, sink=archive.write if archive else None)
+    bus.subscribe(
+        lambda events: log(events[-1].payload), kinds=[BUS_STATUS]
+    )
+
+    exporter = None
+    if args.metrics:
+        from .metrics import MetricsExporter
+
+        exporter = MetricsExporter(stats, host=args.metrics[0], port=args.metrics[1])
+        try:
+            exporter.start()
+        except OSError as e:
+            log(f"ERROR: metrics on {args.metrics[0]}:{args.metrics[1]}: {e}")
+            if archive is not None:
+                archive.stop()
+            return 1
+        log(f"Metrics on http://{exporter.host}:{exporter.port}/metrics")
+
+    stop = threading.Event()
+
+    def on_signal(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+
+    supervisor = MinerSupervisor(
+        args.wallet, groups, stats, bus, log_store,
+        pool_host=pool_host, pool_port=pool_port, binary=args.cpuminer,
+        pin=should_pin(setting.layout, groups), use_api=not args.no_api,
+    )
+    # Start the clock first: the readers may report a connection at once.
+    stats.start()
+    try:
+        supervisor.start()
+    except Exception as e:
+        stats.stop()
+        if exporter is not None:
+            exporter.stop()
+        if archive is not None:
+            archive.stop()
+        log(f"ERROR starting cpuminer: {e}")
+        return 1
+
+    log(f"cpuminer running on {threads} threads -> {pool_host}:{pool_port}")
+    if len(groups) > 1:
+        for i, cpus in enumerate(groups):
+            log(f"  instance {i}: cpus {format_cpu_list(cpus)}")
+
+    governor = None
+    if args.governor:
+        from .governor import Governor, describe
+
+        def apply(count):
+            if not supervisor.set_active_cpus(count):
+                log("Governor: could not change CPU affinity on this system")
+
+        governor = Governor(
+            threads, apply, pids=supervisor.pids,
+            on_decision=lambda d: log(describe(d)),
+            temp_high=args.max_temp, temp_low=args.max_temp - 10,
+            loop=supervisor.loop,
+        )
+        governor.start()
+
+    recorder = None
+    if not args.no_history:
+        from .history import HistoryRecorder
+
+        try:
+            recorder = HistoryRecorder(stats, loop=supervisor.loop)
+            recorder.start()
+        except OSError as e:
+            log(f"History disabled: {e}")
+
+    network = None
+    if not args.no_network:
+        from .network import network_status_task
+
+        network = supervisor.loop.submit(network_status_task(stats, lambda: None))
+
+    log_seq = 0
+    next_stats = time.time() + args.stats_interval
+    while not stop.is_set() and supervisor.is_running():
+        stop.wait(0.5)
+        bus.dispatch()
+        if args.show_log:
+            log_seq, lines = log_store.since(log_seq)
+            for line in lines:
+                print(line, flush=True)
+        now = time.time()
+        if args.stats_interval > 0 and now >= next_stats:
+            log(format_stats(stats.snapshot(), now))
+            next_stats = now + args.stats_interval
+
+    requested = stop.is_set()
+    if governor is not None:
+        governor.stop()
+    supervisor.stop()
+    supervisor.wait(timeout=5)
+    if network is not None:
+        network.cancel()
+    if recorder is not None:
+        recorder.stop()
+    if archive is not None:
+        archive.stop()
+    stats.stop()
+    if exporter is not None:
+        exporter.stop()
+    bus.dispatch()
+    if args.show_log:
+        for line in log_store.since(log_seq)[1]:
+            print(line, flush=True)
+    log(f"Stopped. {format_stats(stats.snapshot(), time.time())}")
+
+    # Exit non-zero if cpuminer died on its own so a supervisor restarts us.
+    return 0 if requested else 1
+
+
+def run_history_mode(args) -> int:
+    from .history import HistoryStore
+
+    store = HistoryStore()
+    end = time.time()
+    start = end - args.history * 3600
+    # One row per hour for long spans, per minute otherwise.
+    tier = "1h" if args.history > 6 else "1m"
+    records = store.read(tier, start, end)
+    if not records:
+        log(f"No history in {store.path} for the last {args.history:g} h")
+        return 0
+    for r in records:
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(r.ts))
+        print(f"{stamp}  {r.hashrate:>12,.0f} H/s  "
+              f"min {r.hr_min:>12,.0f}  max {r.hr_max:>12,.0f}  "
+              f"attempts={r.attempts} shares={r.accepted}/{r.rejected}  "
+              f"up {r.uptime_fraction:.0%}")
+    return 0
+
+
+def run_log_mode(args) -> int:
+    from .logarchive import LogArchive
+
+    archive = LogArchive()
+    if args.log_tail is not None:
+        lines = archive.tail(args.log_tail)
+    else:
+        lines = [f"{n}: {line}" for n, line in archive.search(args.log_search, limit=10000)]
+    for line in lines:
+        print(line)
+    return 0
+
+
+def run_replay_mode(args) -> int:
+    import json
+
+    from .replay import SCENARIOS, compare, run_suite, save
+
+    for name in args.replay:
+        if name != "all" and name not in SCENARIOS and not os.path.exists(name):
+            log(f"ERROR: no scenario or log file named {name!r}")
+            return 2
+
+    def progress(name, r):
+        q = r["queue_depth"]
+        ui = r["ui"]
+        print(f"{name:<10} {r['lines_processed']:>8,} lines  {r['lines_per_sec']:>12,.0f} lines/sec  "
+              f"{r['read_batches']:>6} batches  ui refreshes {ui['refreshes']} / {ui['frames']} frames  "
+              f"queue p95 {q.get('p95', 0):g} max {q.get('max', 0):g}")
+        for kind, lat in sorted(r["latency_ms"].items()):
+            print(f"    {kind:<12} {lat['count']:>8,}  latency p50 {lat['p50']:.3f} ms  "
+                  f"p95 {lat['p95']:.3f} ms  classify {r['classify_us'].get(kind, 0):.2f} us")
+
+    report = run_suite(args.replay, args.replay_speed, progress=progress)
+    if args.replay_out:
+        save(report, args.replay_out)
+        log(f"Saved to {args.replay_out}")
+    if args.replay_compare:
+        try:
+            with open(args.replay_compare, "r", encoding="utf-8") as f:
+                old = json.load(f)
+        except (OSError, ValueError) as e:
+            log(f"ERROR reading {args.replay_compare}: {e}")
+            return 1
+        print(f"vs {args.replay_compare} (version {old.get('version', '?')}):")
+        for row in compare(old, report):
+            print("  " + row)
+    return 0
+
+
+def run_autotune_mode(args) -> int:
+    from .autotune import cache_path, describe_cpus, run_autotune
+
+    if not os.path.exists(args.cpuminer):
+        log(f"ERROR: cpuminer not found at {args.cpuminer}")
+        return 1
+    cpus = read_topology()
+    log(f"Autotuning on {describe_cpus(cpus)}")
+
+    def progress(r):
+        log(f"  {r.layout:<7} {r.threads:>3} threads: {r.hashrate:,.0f} H/s")
+
+    entry = run_autotune(max(6.0, args.bench_seconds), args.cpuminer, cpus, progress)
+    for mode in POWER_MODES:
+        threads, layout = entry["modes"].get(mode, ("-", "-"))
+        log(f"{mode:<6} -> {threads} threads, {layout}")
+    log(f"Saved to {cache_path()}")
+    return 0
+
+
+def run_proxy_mode(args) -> int:
+    from .proxy import StratumProxy, run_proxy
+    from .stratum import StratumError
+
+    pool_host, pool_port = args.pool
+    listen_host, listen_port = args.proxy
+    proxy = StratumProxy(
+        args.wallet,
+        upstream_host=pool_host, upstream_port=pool_port,
+        listen_host=listen_host, listen_port=listen_port,
+        on_status=log,
+    )
+
+    def on_stats(s):
+        log(f"miners={s.downstreams} "
+            f"upstream={'up' if s.upstream_connected else 'down'} "
+            f"connects={s.upstream_connects} jobs={s.jobs} "
+            f"shares={s.shares_accepted}/{s.shares_rejected}")
+
+    try:
+        run_proxy(proxy, args.stats_interval, on_stats)
+    except (OSError, StratumError) as e:
+        log(f"ERROR: {e}")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    on_stats(proxy.stats())
+    return 0
+
+
+def run_builtin_mode(args) -> int:
+    from .inprocess import InProcessMiner, run_inprocess
+    from .sha256d import get_engine
+    from .workers import workers_for_power
+
+    try:
+        get_engine(args.engine)
+    except RuntimeError as e:
+        log(f"ERROR: {e}")
+        return 1
+    pool_host, pool_port = args.pool
+    stats = MinerStats()
+    miner = InProcessMiner(
+        args.wallet, stats,
+        workers=args.threads or workers_for_power(args.power), engine=args.engine,
+        pool_host=pool_host, pool_port=pool_port, on_status=log,
+    )
+    stats.start()
+    try:
+        run_inprocess(miner, args.stats_interval,
+                      lambda: log(format_stats(stats.snapshot(), time.time())))
+    except KeyboardInterrupt:
+        pass
+    stats.stop()
+    log(f"Stopped. {format_stats(stats.snapshot(), time.time())}")
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+
+    if args.bench_parser:
+        from .parsing import measure_parser_throughput
+
+        rate = measure_parser_throughput(seconds=2.0)
+        print(f"classify_line: {rate:,.0f} lines/sec")
+        return 0
+
+    if args.autotune:
+        return run_autotune_mode(args)
+
+    if args.replay:
+        return run_replay_mode(args)
+
+    if args.log_tail is not None or args.log_search:
+        return run_log_mode(args)
+
+    if args.e2e:
+        import json
+
+        from .e2e import run_end_to_end
+
+        result = run_end_to_end(args.bench_seconds, args.threads or 2, use_api=not args.no_api)
+        text = json.dumps(result, indent=1, sort_keys=True)
+        print(text)
+        if args.e2e_out:
+            with open(args.e2e_out, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        return 0 if result.get("first_hashrate_s") is not None else 1
+
+    if args.history is not None:
+        return run_history_mode(args)
+
+    if args.benchmark:
+        from .sha256d import benchmark, pick_engine
+
+        engine = pick_engine() if args.engine == "auto" else args.engine
+        try:
+            if args.threads:
+                from .workers import benchmark_pool
+
+                rates = benchmark_pool(args.threads, engine, args.bench_seconds)
+                for i, rate in enumerate(rates):
+                    print(f"worker {i}: {rate:,.0f} H/s")
+                print(f"sha256d [{engine}] x{len(rates)}: {sum(rates):,.0f} H/s total, "
+                      f"{sum(rates) / len(rates):,.0f} H/s per worker")
+            else:
+                rate = benchmark(engine, seconds=args.bench_seconds)
+                print(f"sha256d [{engine}]: {rate:,.0f} H/s per core")
+        except RuntimeError as e:
+            log(f"ERROR: {e}")
+            return 1
+        return 0
+
+    if not args.wallet:
+        log("ERROR: --wallet is required.")
+        return 2
+    if args.proxy:
+        return run_proxy_mode(args)
+    if args.builtin:
+        return run_builtin_mode(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
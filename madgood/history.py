@@ -0,0 +1,390 @@
+"""
+On-disk session history.
+
+Three append-only files of fixed-width 32-byte records, one per resolution:
+
+    raw.bin   one record per sample (normally every second)
+    1m.bin    one record per minute, rolled up from raw samples
+    1h.bin    one record per hour, rolled up from the minute records
+
+Every record has the same layout, so a sample is just a one-sample bucket:
+
+    u32 ts          bucket start, unix seconds
+    f32 hashrate    mean H/s over the bucket
+    f32 hr_min
+    f32 hr_max
+    u32 attempts    block_attempts at the end of the bucket
+    u32 accepted    shares_accepted at the end of the bucket
+    u32 rejected    shares_rejected at the end of the bucket
+    u16 samples     raw samples in the bucket
+    u16 connected   of which the pool connection was up
+
+Timestamps only grow, so a time range is found by binary search on the
+file itself and only the matching slice is read. The one exception is the
+newest 1m / 1h record: a session that stops mid-minute or mid-hour writes
+its partial bucket, and the next session in the same bucket rebuilds it
+from the finer tier and overwrites it in place. Writes are buffered and
+hit the disk every few seconds in one write() per file; raw and minute
+files are trimmed to their retention window once they grow past twice
+that size.
+"""
+import asyncio
+import os
+import struct
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from .aio import LoopThread, shared_loop
+from .config import user_data_dir
+from .stats import MinerStats
+
+_RECORD = struct.Struct("<IfffIIIHH")
+RECORD_SIZE = _RECORD.size  # 32
+
+RESOLUTIONS = {"raw": 1, "1m": 60, "1h": 3600}
+
+# How long each tier is kept; None = forever (1h grows ~280 KB a year).
+RETENTION = {"raw": 2 * 86400, "1m": 90 * 86400, "1h": None}
+
+
+class HistoryRecord(NamedTuple):
+    ts: int
+    hashrate: float
+    hr_min: float
+    hr_max: float
+    attempts: int
+    accepted: int
+    rejected: int
+    samples: int
+    connected: int
+
+    @property
+    def uptime_fraction(self) -> float:
+        return self.connected / self.samples if self.samples else 0.0
+
+
+def history_dir() -> str:
+    return os.path.join(user_data_dir(), "history")
+
+
+class _Bucket:
+    """
+    Running aggregate of records that fall into one coarser bucket.
+    """
+    __slots__ = ("start", "weighted", "weight", "hr_min", "hr_max", "last", "samples", "connected")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.weighted = 0.0
+        self.weight = 0
+        self.hr_min = float("inf")
+        self.hr_max = 0.0
+        self.last = None
+        self.samples = 0
+        self.connected = 0
+
+    def add(self, rec: HistoryRecord):
+        self.weighted += rec.hashrate * rec.samples
+        self.weight += rec.samples
+        self.hr_min = min(self.hr_min, rec.hr_min)
+        self.hr_max = max(self.hr_max, rec.hr_max)
+        self.last = rec
+        self.samples += rec.samples
+        self.connected += rec.connected
+
+    def record(self) -> HistoryRecord:
+        last = self.last
+        return HistoryRecord(
+            self.start,
+            self.weighted / self.weight if self.weight else 0.0,
+            0.0 if self.hr_min == float("inf") else self.hr_min,
+            self.hr_max,
+            last.attempts, last.accepted, last.rejected,
+            min(self.samples, 0xFFFF), min(self.connected, 0xFFFF),
+        )
+
+
+class HistoryStore:
+    """
+        store = HistoryStore()                    # user data dir
+        store.append(time.time(), snapshot)       # every second
+        store.query(start, end)                   # picks a resolution
+        store.close()
+    """
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 10.0,
+                 retention: Optional[Dict[str, Optional[float]]] = None):
+        self.path = path or history_dir()
+        self.flush_interval = flush_interval
+        self.retention = dict(RETENTION, **(retention or {}))
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[bytes]] = {tier: [] for tier in RESOLUTIONS}
+        self._last_flush = time.time()
+        self._last_ts = {tier: self._tail_ts(tier) for tier in RESOLUTIONS}
+        # The next flush overwrites the stored last record of this tier.
+        self._replace = {tier: False for tier in RESOLUTIONS}
+        self._minute: Optional[_Bucket] = None
+        self._hour: Optional[_Bucket] = None
+
+    def _file(self, tier: str) -> str:
+        return os.path.join(self.path, f"{tier}.bin")
+
+    def _tail_ts(self, tier: str) -> int:
+        try:
+            with open(self._file(tier), "rb") as f:
+                f.seek(0, os.SEEK_END)
+                n = f.tell() // RECORD_SIZE
+                if not n:
+                    return 0
+                f.seek((n - 1) * RECORD_SIZE)
+                return _RECORD.unpack(f.read(RECORD_SIZE))[0]
+        except OSError:
+            return 0
+
+    # ---------- Writing ----------
+
+    def append(self, now: float, snap) -> None:
+        """
+        Add one sample from a StatsSnapshot (or anything with the same
+        fields). Samples at or before the last stored second are dropped.
+        """
+        ts = int(now)
+        rec = HistoryRecord(
+            ts, snap.hashrate, snap.hashrate, snap.hashrate,
+            snap.block_attempts, snap.shares_accepted, snap.shares_rejected,
+            1, 1 if snap.connected else 0,
+        )
+        with self._lock:
+            if ts <= self._last_ts["raw"]:
+                return
+            self._queue("raw", rec)
+            self._roll(rec)
+            if now - self._last_flush >= self.flush_interval:
+                self._flush_locked(now)
+
+    def _queue(self, tier: str, rec: HistoryRecord):
+        """
+        Append a record, or replace the last one if it has the same bucket
+        start (a partial bucket written by close() or an earlier run).
+        """
+        last = self._last_ts[tier]
+        if rec.ts < last:
+            return
+        data = _RECORD.pack(*rec)
+        pending = self._pending[tier]
+        if rec.ts == last and last:
+            if pending:
+                pending[-1] = data
+                return
+            self._replace[tier] = True
+        pending.append(data)
+        self._last_ts[tier] = rec.ts
+
+    def _roll(self, rec: HistoryRecord):
+        minute = rec.ts - rec.ts % 60
+        if self._minute is None and self._hour is None:
+            self._resume(minute, rec.ts)
+        if self._minute is not None and self._minute.start != minute:
+            self._close_minute()
+        if self._minute is None:
+            self._minute = _Bucket(minute)
+        self._minute.add(rec)
+
+    def _resume(self, minute: int, ts: int):
+        """
+        Pick up the minute and hour an earlier run (or close()) left
+        unfinished, from the records of the next finer tier.
+        """
+        for rec in self._read_locked("raw", minute, ts):
+            if self._minute is None:
+                self._minute = _Bucket(minute)
+            self._minute.add(rec)
+        hour = minute - minute % 3600
+        for rec in self._read_locked("1m", hour, minute):
+            if self._hour is None:
+                self._hour = _Bucket(hour)
+            self._hour.add(rec)
+
+    def _close_minute(self):
+        m = self._minute.record()
+        self._minute = None
+        self._queue("1m", m)
+        hour = m.ts - m.ts % 3600
+        if self._hour is not None and self._hour.start != hour:
+            self._queue("1h", self._hour.record())
+            self._hour = None
+        if self._hour is None:
+            self._hour = _Bucket(hour)
+        self._hour.add(m)
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked(time.time())
+
+    def _flush_locked(self, now: float):
+        self._last_flush = now
+        for tier, chunks in self._pending.items():
+            if not chunks:
+                continue
+            with open(self._file(tier), "ab") as f:
+                if self._replace[tier]:
+                    f.truncate(max(0, f.seek(0, os.SEEK_END) - RECORD_SIZE))
+                    self._replace[tier] = False
+                f.write(b"".join(chunks))
+            chunks.clear()
+            self._trim(tier, now)
+
+    def _trim(self, tier: str, now: float):
+        keep = self.retention.get(tier)
+        if keep is None:
+            return
+        path = self._file(tier)
+        size = os.path.getsize(path)
+        limit = int(keep / RESOLUTIONS[tier]) * RECORD_SIZE
+        if size <= 2 * limit:
+            return
+        # Rewrite only the records inside the window; amortized O(1) per append.
+        # Always keep the newest record: it is how a restart finds where it left off.
+        start = min(self._bisect(path, int(now - keep)), size // RECORD_SIZE - 1)
+        tmp = path + ".tmp"
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            src.seek(start * RECORD_SIZE)
+            while True:
+                block = src.read(1 << 20)
+                if not block:
+                    break
+                dst.write(block)
+        os.replace(tmp, path)
+
+    def close(self):
+        """
+        Write out everything, including the partial minute and hour, so a
+        short session still shows up at every resolution.
+        """
+        with self._lock:
+            if self._minute is not None:
+                self._close_minute()
+            if self._hour is not None:
+                self._queue("1h", self._hour.record())
+                self._hour = None
+            self._flush_locked(time.time())
+
+    # ---------- Reading ----------
+
+    @staticmethod
+    def _bisect(path: str, ts: int) -> int:
+        """
+        Index of the first record with timestamp >= ts, reading only
+        O(log n) records.
+        """
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            lo, hi = 0, f.tell() // RECORD_SIZE
+            while lo < hi:
+                mid = (lo + hi) // 2
+                f.seek(mid * RECORD_SIZE)
+                if struct.unpack("<I", f.read(4))[0] < ts:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+
+    def count(self, tier: str) -> int:
+        try:
+            return os.path.getsize(self._file(tier)) // RECORD_SIZE
+        except OSError:
+            return 0
+
+    def read(self, tier: str, start: float, end: float) -> List[HistoryRecord]:
+        """
+        Stored records of one tier with start <= ts < end. Buffered records
+        not yet flushed are included.
+        """
+        out = self._read_file(tier, start, end)
+        with self._lock:
+            return self._add_pending(tier, out, start, end)
+
+    def _read_locked(self, tier: str, start: float, end: float) -> List[HistoryRecord]:
+        return self._add_pending(tier, self._read_file(tier, start, end), start, end)
+
+    def _read_file(self, tier: str, start: float, end: float) -> List[HistoryRecord]:
+        path = self._file(tier)
+        out = []
+        if os.path.exists(path):
+            first = self._bisect(path, int(start))
+            last = self._bisect(path, int(end))
+            if last > first:
+                with open(path, "rb") as f:
+                    f.seek(first * RECORD_SIZE)
+                    data = f.read((last - first) * RECORD_SIZE)
+                data = data[:len(data) - len(data) % RECORD_SIZE]
+                out = [HistoryRecord(*r) for r in _RECORD.iter_unpack(data)]
+        return out
+
+    def _add_pending(self, tier: str, out: List[HistoryRecord], start: float,
+                     end: float) -> List[HistoryRecord]:
+        # Caller holds the lock.
+        pending = [HistoryRecord(*_RECORD.unpack(c)) for c in self._pending[tier]]
+        if pending and self._replace[tier]:
+            # The stored last record is about to be overwritten.
+            out = [r for r in out if r.ts != pending[0].ts]
+        out.extend(r for r in pending if start <= r.ts < end)
+        return out
+
+    def query(self, start: float, end: float, max_points: int = 2000,
+              tier: Optional[str] = None) -> List[HistoryRecord]:
+        """
+        Records for [start, end) at the finest resolution that stays under
+        `max_points` (raw, then 1m, then 1h), unless `tier` is given.
+        """
+        if tier is None:
+            span = max(0.0, end - start)
+            tier = "1h"
+            for name in ("raw", "1m"):
+                if span / RESOLUTIONS[name] <= max_points:
+                    tier = name
+                    break
+        return self.read(tier, start, end)
+
+
+class HistoryRecorder:
+    """
+    Samples a MinerStats into a HistoryStore every `interval` seconds as a
+    task on the miners' event loop (shared_loop() unless `loop` is given).
+    Appends are buffered; the store only writes every few seconds, one
+    small write() per file.
+    """
+
+    def __init__(self, stats: MinerStats, store: Optional[HistoryStore] = None,
+                 interval: float = 1.0, loop: Optional[LoopThread] = None):
+        self.stats = stats
+        self.store = store or HistoryStore()
+        self.interval = interval
+        self.loop = loop
+        self._task = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        if self.loop is None:
+            self.loop = shared_loop()
+        self._task = self.loop.spawn(self._run())
+
+    def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            self.loop.cancel(task, timeout=2)
+        self.store.close()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            snap = self.stats.snapshot()
+            if snap.mining:
+                try:
+                    self.store.append(time.time(), snap)
+                except OSError:
+                    pass  # disk full / read-only: history is best effort
@@ -0,0 +1,260 @@
+"""
+Mining without cpuminer, for platforms with no bundled binary.
+
+    StratumClient --on_job--> WorkGenerator --next_work()--> HashingPool
+          ^                                                       |
+          +------------------- mining.submit <-- drain_shares() --+
+
+Jobs and extranonce1 come straight from the pool session. The generator
+rolls extranonce2 into fresh headers, the worker processes scan them with
+the built-in sha256d engine, and found shares are checked and submitted on
+the same connection. The hashrate comes from the workers' exact hash
+counters.
+
+    python3 -m madgood --wallet <BTC address> --builtin [--power medium]
+"""
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+from .config import POOL_HOST, POOL_PORT
+from .sha256d import hash_meets_target, sha256d
+from .stats import MinerStats
+from .stratum import StratumClient, StratumError
+from .work import Work, WorkGenerator
+from .workers import NONCE_SPACE, FoundShare, HashingPool
+
+
+class InProcessMiner:
+    """
+    One pool session feeding a HashingPool. run() reconnects until close().
+
+    `work_age` bounds how long one header is scanned before the next
+    extranonce2 is taken, so ntime never drifts far behind the clock.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        stats: MinerStats,
+        workers: int = 1,
+        engine: str = "auto",
+        password: str = "x",
+        pool_host: str = POOL_HOST,
+        pool_port: int = POOL_PORT,
+        work_age: float = 60.0,
+        on_status: Optional[Callable[[str], None]] = None,
+    ):
+        self.username = username
+        self.password = password
+        self.stats = stats
+        self.pool_host = pool_host
+        self.pool_port = pool_port
+        self.work_age = work_age
+        self.on_status = on_status
+
+        self.generator = WorkGenerator()
+        self.hashing = HashingPool(workers, engine=engine)
+        self.client: Optional[StratumClient] = None
+        self.connects = 0
+        self.shares_found = 0
+        self.shares_stale = 0
+
+        self._published: Dict[int, Work] = {}  # HashingPool generation -> Work
+        self._submits = set()
+        self._lost = None
+        self._stop = None
+        self._stopping = False
+
+    def _status(self, msg: str):
+        if self.on_status:
+            self.on_status(msg)
+
+    # ---------- Lifecycle ----------
+
+    def start(self):
+        """
+        Start the worker processes and the header builder thread.
+        """
+        self._lost = asyncio.Event()
+        self._stop = asyncio.Event()
+        self.hashing.start()
+        self.generator.start()
+        self._status(f"Built-in miner: {self.hashing.workers} worker(s), "
+                     f"{self.hashing.engine} engine")
+
+    async def close(self):
+        self._stopping = True
+        if self._stop is not None:
+            self._stop.set()
+            self._lost.set()
+        if self.client is not None:
+            await self.client.close()
+        for task in list(self._submits):
+            task.cancel()
+        if self._submits:
+            await asyncio.gather(*self._submits, return_exceptions=True)
+        self.generator.stop()
+        self.hashing.stop()
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self, retry_delay: float = 1.0, max_retry_delay: float = 60.0,
+                  poll: float = 0.05):
+        if self._stop is None:
+            self.start()
+        delay = retry_delay
+        while not self._stopping:
+            client = StratumClient(
+                self.username, self.password,
+                host=self.pool_host, port=self.pool_port,
+                on_job=lambda job: self._on_job(client, job),
+                on_difficulty=lambda d: self.stats.update(share_difficulty=d),
+                on_extranonce=self.generator.set_extranonce,
+                on_disconnect=lambda exc: self._lost.set(),
+            )
+            self._lost.clear()
+            try:
+                await client.connect()
+            except (OSError, StratumError, asyncio.TimeoutError) as e:
+                self._status(f"Pool {self.pool_host}:{self.pool_port} failed: {e}")
+                await client.close()
+                await self._sleep(delay)
+                delay = min(delay * 2, max_retry_delay)
+                continue
+
+            self.client = client
+            self.connects += 1
+            delay = retry_delay
+            self.stats.update(connected=True, share_difficulty=client.difficulty)
+            self._status(f"Connected to {self.pool_host}:{self.pool_port}")
+
+            await self._mine(client, poll)
+
+            await client.close()
+            self.stats.update(connected=False)
+            if not self._stopping:
+                self._status("Pool connection lost, reconnecting...")
+                await self._sleep(delay)
+        self.stats.set_hashrate(0.0)
+
+    # ---------- Work ----------
+
+    def _on_job(self, client: StratumClient, job):
+        # The subscription's extranonce1 goes into every coinbase; a no-op
+        # unless this is a new session.
+        self.generator.set_extranonce(client.extranonce1, client.extranonce2_size)
+        self.generator.set_job(job)
+        self.stats.record_job(job.job_id)
+
+    async def _mine(self, client: StratumClient, poll: float):
+        loop = asyncio.get_running_loop()
+        hashing = self.hashing
+        current: Optional[Work] = None
+        published_at = 0.0
+        base = 0  # total_hashes() when `current` was published
+        rate_at, rate_hashes = time.monotonic(), hashing.total_hashes()
+        # Work from an earlier session embeds that session's extranonce1.
+        self._published.clear()
+
+        while not self._lost.is_set():
+            now = time.monotonic()
+            total = hashing.total_hashes()
+            if (current is None or current.generation != self.generator.generation
+                    or total - base >= NONCE_SPACE or now - published_at >= self.work_age):
+                work = await loop.run_in_executor(None, self.generator.next_work, 0.5)
+                if self._lost.is_set():
+                    break
+                if work is not None:
+                    clean = current is None or (
+                        work.clean_jobs and work.generation != current.generation
+                    )
+                    gen = hashing.set_job(work.header, work.target, clean, work.job_id)
+                    self._published[gen] = work
+                    self._published.pop(gen - 2 * HashingPool.RECENT_JOBS, None)
+                    current, published_at, base = work, time.monotonic(), hashing.total_hashes()
+
+            for share in hashing.drain_shares():
+                self._found(client, share)
+
+            if now - rate_at >= 1.0:
+                total = hashing.total_hashes()
+                self.stats.set_hashrate((total - rate_hashes) / (now - rate_at))
+                rate_at, rate_hashes = now, total
+
+            try:
+                await asyncio.wait_for(self._lost.wait(), poll)
+            except asyncio.TimeoutError:
+                pass
+
+    # ---------- Shares ----------
+
+    def _found(self, client: StratumClient, share: FoundShare):
+        work = self._published.get(share.generation)
+        if work is None or self.generator.is_stale(work):
+            self.shares_stale += 1
+            return
+        # The workers already compared against the target; rebuild the
+        # header so a bad template can never reach the pool.
+        header = work.header[:76] + share.nonce.to_bytes(4, "little")
+        if not hash_meets_target(sha256d(header), work.target):
+            self._status(f"Discarded invalid share for job {work.job_id}")
+            return
+        self.shares_found += 1
+        task = asyncio.ensure_future(self._submit(client, work, share.nonce))
+        self._submits.add(task)
+        task.add_done_callback(self._submits.discard)
+
+    async def _submit(self, client: StratumClient, work: Work, nonce: int):
+        try:
+            result = await client.submit(*work.submit_params(nonce))
+        except (StratumError, asyncio.TimeoutError, ConnectionError) as e:
+            self._status(f"Share for job {work.job_id} not submitted: {e}")
+            return
+        self.stats.record_share(result.accepted)
+        if result.accepted:
+            self._status(f"Share accepted (job {work.job_id}, {result.latency * 1000:.0f} ms)")
+        else:
+            self._status(f"Share rejected (job {work.job_id}): {result.error}")
+
+
+def run_inprocess(miner: InProcessMiner, stats_interval: float = 60.0,
+                  on_stats: Optional[Callable[[], None]] = None):
+    """
+    Blocking entry point: mine until SIGINT/SIGTERM.
+    """
+    import signal
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C still raises KeyboardInterrupt
+
+        miner.start()
+        runner = asyncio.ensure_future(miner.run())
+        next_stats = time.time() + stats_interval
+        try:
+            while not stop.is_set() and not runner.done():
+                try:
+                    await asyncio.wait_for(stop.wait(), 0.5)
+                except asyncio.TimeoutError:
+                    pass
+                if on_stats and stats_interval > 0 and time.time() >= next_stats:
+                    on_stats()
+                    next_stats = time.time() + stats_interval
+        finally:
+            await miner.close()
+            try:
+                await asyncio.wait_for(runner, 5)
+            except asyncio.TimeoutError:
+                pass
+
+    asyncio.run(_main())
@@ -0,0 +1,317 @@
+"""
+On-disk archive of every cpuminer log line.
+
+Lines go to size-rotated segments under user_data_dir()/logs:
+
+    miner-000001.log.gz   concatenated gzip members, one per flushed block
+    miner-000001.idx      one 32-byte record per block
+
+Each block is compressed on its own, so the segment is still an ordinary
+.gz file (zcat reads it) and any block can be decompressed straight out of
+a memory map using its index record:
+
+    u64 offset      byte offset of the gzip member in the segment
+    u32 size        compressed size
+    u64 first_line  archive-wide number of the block's first line
+    u32 lines       lines in the block
+    f64 time        when the block's first line was queued (unix seconds)
+
+write() only appends to a deque, so the parser never waits on the disk; a
+background thread compresses and appends a block once enough lines have
+piled up or `flush_interval` has passed. It stays a thread rather than a
+task on the miners' event loop because gzip-ing a 2000-line block would
+hold up the loop that parses miner output. Old segments are deleted once
+there are more than `max_segments`.
+"""
+import gzip
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from .config import user_data_dir
+
+_INDEX = struct.Struct("<QIQId")
+INDEX_SIZE = _INDEX.size  # 32
+_SEGMENT_RE = re.compile(r"^miner-(\d{6})\.log\.gz$")
+
+
+class BlockIndex(NamedTuple):
+    offset: int
+    size: int
+    first_line: int
+    lines: int
+    time: float
+
+
+def archive_dir() -> str:
+    return os.path.join(user_data_dir(), "logs")
+
+
+class LogArchive:
+    """
+        archive = LogArchive()
+        archive.start()
+        LogStore(maxlen=200, sink=archive.write)   # every line ends up here
+        archive.tail(100)
+        archive.search("rejected")
+        archive.stop()
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        segment_bytes: int = 8 << 20,
+        max_segments: int = 16,
+        block_lines: int = 2000,
+        flush_interval: float = 2.0,
+        max_pending: int = 200_000,
+    ):
+        self.path = path or archive_dir()
+        self.segment_bytes = segment_bytes
+        self.max_segments = max(1, max_segments)
+        self.block_lines = block_lines
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+
+        self._pending = deque()  # (time queued, lines)
+        self._pending_lines = 0
+        self._queue_lock = threading.Lock()  # held for a few appends only
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+        os.makedirs(self.path, exist_ok=True)
+        segments = self.segments()
+        self._seq = segments[-1][0] if segments else 0
+        self._next_line = self._last_line()
+
+    # ---------- Files ----------
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.path, f"miner-{seq:06d}.log.gz")
+
+    def _index_path(self, seq: int) -> str:
+        return os.path.join(self.path, f"miner-{seq:06d}.idx")
+
+    def segments(self) -> List[Tuple[int, str]]:
+        """
+        (sequence number, segment path), oldest first.
+        """
+        out = []
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return out
+        for name in names:
+            m = _SEGMENT_RE.match(name)
+            if m:
+                out.append((int(m.group(1)), os.path.join(self.path, name)))
+        return sorted(out)
+
+    def read_index(self, seq: int) -> List[BlockIndex]:
+        try:
+            with open(self._index_path(seq), "rb") as f:
+                data = f.read()
+        except OSError:
+            return []
+        data = data[:len(data) - len(data) % INDEX_SIZE]
+        return [BlockIndex(*r) for r in _INDEX.iter_unpack(data)]
+
+    def _last_line(self) -> int:
+        for seq, _ in reversed(self.segments()):
+            blocks = self.read_index(seq)
+            if blocks:
+                last = blocks[-1]
+                return last.first_line + last.lines
+        return 0
+
+    # ---------- Writing ----------
+
+    def write(self, lines: List[str]):
+        """
+        Queue lines for the archive. Never waits on the disk; if the writer
+        falls `max_pending` lines behind, the oldest queued lines are dropped.
+        """
+        if not lines:
+            return
+        with self._queue_lock:
+            self._pending.append((time.time(), lines))
+            self._pending_lines += len(lines)
+            while self._pending_lines > self.max_pending and len(self._pending) > 1:
+                _, old = self._pending.popleft()
+                self._pending_lines -= len(old)
+                self.dropped += len(old)
+            full = self._pending_lines >= self.block_lines
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Compress and append everything queued so far.
+        """
+        with self._write_lock:
+            with self._queue_lock:
+                batches = list(self._pending)
+                self._pending.clear()
+                self._pending_lines = 0
+            block: List[str] = []
+            block_time = 0.0
+            for queued_at, lines in batches:
+                pos = 0
+                while pos < len(lines):
+                    if not block:
+                        block_time = queued_at
+                    part = lines[pos:pos + self.block_lines - len(block)]
+                    block.extend(part)
+                    pos += len(part)
+                    if len(block) >= self.block_lines:
+                        self._append_block(block_time, block)
+                        block = []
+            if block:
+                self._append_block(block_time, block)
+
+    def _append_block(self, first_time: float, lines: List[str]):
+        if self._seq == 0:
+            self._seq = 1
+        seg = self._segment_path(self._seq)
+        try:
+            offset = os.path.getsize(seg)
+        except OSError:
+            offset = 0
+        if offset >= self.segment_bytes:
+            self._rotate()
+            seg = self._segment_path(self._seq)
+            offset = 0
+
+        data = gzip.compress(("\n".join(lines) + "\n").encode("utf-8", "replace"), compresslevel=6)
+        with open(seg, "ab") as f:
+            f.write(data)
+        with open(self._index_path(self._seq), "ab") as f:
+            f.write(_INDEX.pack(offset, len(data), self._next_line, len(lines), first_time))
+        self._next_line += len(lines)
+
+    def _rotate(self):
+        self._seq += 1
+        segments = self.segments()
+        for seq, path in segments[:max(0, len(segments) + 1 - self.max_segments)]:
+            for p in (path, self._index_path(seq)):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError:
+                pass  # disk full / read-only: the archive is best effort
+
+    # ---------- Reading ----------
+
+    @staticmethod
+    def _blocks(path: str, blocks: List[BlockIndex]) -> Iterator[Tuple[BlockIndex, List[str]]]:
+        """
+        Decompress `blocks` of one segment through a memory map, one block
+        in memory at a time.
+        """
+        if not blocks:
+            return
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for b in blocks:
+                    if b.offset + b.size > size:
+                        break  # index ahead of data after a crash
+                    try:
+                        text = zlib.decompress(mm[b.offset:b.offset + b.size], 31)
+                    except zlib.error:
+                        continue
+                    yield b, text.decode("utf-8", "replace").split("\n")[:b.lines]
+
+    def tail(self, n: int = 100) -> List[str]:
+        """
+        The last `n` archived lines (plus any still queued), newest last.
+        Only the blocks needed are decompressed.
+        """
+        if n <= 0:
+            return []
+        with self._queue_lock:
+            queued = [line for _, batch in self._pending for line in batch]
+        chunks = [queued[-n:]]  # newest first
+        have = len(chunks[0])
+        for seq, path in reversed(self.segments()):
+            if have >= n:
+                break
+            picked = []
+            for b in reversed(self.read_index(seq)):
+                if have >= n:
+                    break
+                picked.append(b)
+                have += b.lines
+            picked.reverse()
+            chunks.extend(lines for _, lines in reversed(list(self._blocks(path, picked))))
+        flat = [line for chunk in reversed(chunks) for line in chunk]
+        return flat[-n:]
+
+    def search(self, pattern: str, regex: bool = False, ignore_case: bool = True,
+               since: Optional[float] = None, limit: int = 1000) -> List[Tuple[int, str]]:
+        """
+        (line number, line) for archived lines matching `pattern`, oldest
+        first, stopping after `limit` matches. `since` skips blocks queued
+        before that unix time using the index alone.
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        rx = re.compile(pattern if regex else re.escape(pattern), flags)
+        found = []
+        segments = [(path, self.read_index(seq)) for seq, path in self.segments()]
+        if since is not None:
+            # A block may hold lines queued up to the next block's time,
+            # and the next block may open the next segment.
+            following = [b.time for _, blocks in segments for b in blocks][1:] + [math.inf]
+            skip = next((i for i, t in enumerate(following) if t >= since), len(following))
+            trimmed = []
+            for path, blocks in segments:
+                trimmed.append((path, blocks[skip:]))
+                skip = max(0, skip - len(blocks))
+            segments = trimmed
+        for path, blocks in segments:
+            for b, lines in self._blocks(path, blocks):
+                for i, line in enumerate(lines):
+                    if rx.search(line):
+                        found.append((b.first_line + i, line))
+                        if len(found) >= limit:
+                            return found
+        return found
@@ -0,0 +1,182 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from .parsing import (
+    EVENT_BLOCK_FOUND,
+    EVENT_CONN_FAILED,
+    EVENT_CONNECTED,
+    EVENT_CONNECTING,
+    EVENT_ERROR,
+    EVENT_EXTRANONCE,
+    EVENT_HASHRATE,
+    EVENT_HEIGHT,
+    EVENT_JOB,
+    EVENT_REJECT,
+    EVENT_SHARE,
+    EVENT_SUBMIT,
+)
+
+# Log view kinds and the classifier events that fall under each
+LOG_SHARE = "share"
+LOG_JOB = "job"
+LOG_CONNECTION = "connection"
+LOG_ERROR = "error"
+LOG_HASHRATE = "hashrate"
+LOG_BLOCK = "block"
+LOG_KINDS = (LOG_SHARE, LOG_JOB, LOG_CONNECTION, LOG_ERROR, LOG_HASHRATE, LOG_BLOCK)
+
+_KIND_OF_EVENT = {
+    EVENT_SHARE: LOG_SHARE,
+    EVENT_REJECT: LOG_SHARE,
+    EVENT_SUBMIT: LOG_SHARE,
+    EVENT_JOB: LOG_JOB,
+    EVENT_HEIGHT: LOG_JOB,
+    EVENT_CONNECTING: LOG_CONNECTION,
+    EVENT_CONNECTED: LOG_CONNECTION,
+    EVENT_EXTRANONCE: LOG_CONNECTION,
+    EVENT_CONN_FAILED: LOG_ERROR,
+    EVENT_ERROR: LOG_ERROR,
+    EVENT_HASHRATE: LOG_HASHRATE,
+    EVENT_BLOCK_FOUND: LOG_BLOCK,
+}
+
+
+def log_kind(event) -> Optional[str]:
+    """
+    View kind of a classify_line() result (None for plain lines).
+    """
+    return None if event is None else _KIND_OF_EVENT.get(event.kind)
+
+
+class LogStore:
+    """
+    Bounded, thread-safe ring buffer of miner log lines.
+
+    Every appended line gets a sequence number, so a view can ask only for
+    what it has not shown yet instead of re-reading the whole buffer.
+
+    Lines passed with their classify_line() events are also indexed by kind:
+    one sorted array of sequence numbers per LOG_* kind, so filtering and
+    jumping cost O(log n + matches) instead of a scan of the buffer.
+
+    `sink(lines)`, if given, also receives every batch (e.g. LogArchive.write).
+    """
+
+    def __init__(self, maxlen: int = 200, sink=None):
+        self.maxlen = maxlen
+        self._ring: List[Optional[str]] = [None] * maxlen
+        self._lock = threading.Lock()
+        self._next_seq = 0  # sequence number the next line will get
+        self._index: Dict[str, array] = {kind: array("Q") for kind in LOG_KINDS}
+        self.sink = sink
+
+    def extend(self, lines, events=None):
+        """
+        Append `lines`; `events` (same length, classify_line() results or
+        None) feeds the per-kind index.
+        """
+        with self._lock:
+            ring, size = self._ring, self.maxlen
+            seq = self._next_seq
+            for i, line in enumerate(lines[-size:], seq + max(0, len(lines) - size)):
+                ring[i % size] = line
+            if events is not None:
+                index = self._index
+                for i, ev in enumerate(events):
+                    if ev is not None:
+                        kind = _KIND_OF_EVENT.get(ev.kind)
+                        if kind is not None:
+                            index[kind].append(seq + i)
+            self._next_seq = seq + len(lines)
+            self._trim_index()
+        if self.sink is not None:
+            self.sink(lines)
+
+    def _trim_index(self):
+        # Drop evicted positions once they make up half an array; amortized O(1).
+        first = self._next_seq - self.maxlen
+        for kind, positions in self._index.items():
+            if len(positions) > 64 and positions[len(positions) // 2] < first:
+                self._index[kind] = positions[bisect_left(positions, first):]
+
+    @property
+    def first_seq(self) -> int:
+        """
+        Sequence number of the oldest line still buffered.
+        """
+        return max(0, self._next_seq - self.maxlen)
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    def since(self, seq: int):
+        """
+        Return (next_seq, lines) for every buffered line with a sequence
+        number >= seq. Lines already evicted from the buffer are skipped.
+        """
+        with self._lock:
+            next_seq = self._next_seq
+            return next_seq, self._range(max(seq, next_seq - self.maxlen, 0), next_seq)
+
+    def range(self, start: int, end: int) -> List[Tuple[int, str]]:
+        """
+        (seq, line) for buffered lines with start <= seq < end.
+        """
+        with self._lock:
+            start = max(start, self._next_seq - self.maxlen, 0)
+            end = min(end, self._next_seq)
+            return list(zip(range(start, end), self._range(start, end)))
+
+    def _range(self, start: int, end: int) -> List[str]:
+        if end <= start:
+            return []
+        size = self.maxlen
+        a, b = start % size, end % size
+        if a < b:
+            return self._ring[a:b]
+        return self._ring[a:] + self._ring[:b]
+
+    # ---------- Index ----------
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            positions = self._index[kind]
+            return len(positions) - bisect_left(positions, self.first_seq)
+
+    def matches(self, kind: str, start: int = 0, end: Optional[int] = None,
+                limit: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        (seq, line) of buffered `kind` lines with start <= seq < end, oldest
+        first; with `limit`, only the newest `limit` of them.
+        """
+        with self._lock:
+            positions = self._index[kind]
+            lo = bisect_left(positions, max(start, self._next_seq - self.maxlen, 0))
+            hi = len(positions) if end is None else bisect_left(positions, end, lo)
+            if limit is not None:
+                lo = max(lo, hi - limit)
+            ring, size = self._ring, self.maxlen
+            return [(s, ring[s % size]) for s in positions[lo:hi]]
+
+    def next_of(self, kind: str, seq: int) -> Optional[int]:
+        """
+        First buffered line of `kind` after `seq`, or None.
+        """
+        with self._lock:
+            positions = self._index[kind]
+            i = bisect_right(positions, max(seq, self._next_seq - self.maxlen - 1))
+            return positions[i] if i < len(positions) else None
+
+    def prev_of(self, kind: str, seq: int) -> Optional[int]:
+        """
+        Last buffered line of `kind` before `seq`, or None.
+        """
+        with self._lock:
+            positions = self._index[kind]
+            i = bisect_left(positions, seq) - 1
+            if i >= 0 and positions[i] >= self._next_seq - self.maxlen:
+                return positions[i]
+            return None
@@ -0,0 +1,150 @@
+"""
+Prometheus / OpenMetrics exporter.
+
+    exporter = MetricsExporter(stats, port=9877)
+    exporter.start()          # serves GET /metrics on its own thread
+    exporter.stop()
+
+Scrapes never touch the miner: the page is rendered from a StatsSnapshot
+(a lock-free read) at most once per `max_age` seconds and the same bytes
+are handed to every collector that asks in between. Clients that accept
+application/openmetrics-text get OpenMetrics, everyone else the classic
+Prometheus text format.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+from .config import APP_VERSION
+from .stats import MinerStats, StatsSnapshot
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9877
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (name, type, help, [(labels, value)])
+Family = Tuple[str, str, str, List[Tuple[str, float]]]
+
+
+def _families(snap: StatsSnapshot, now: float) -> List[Family]:
+    return [
+        ("madgood_info", "gauge", "Miner build information.",
+         [(f'version="{APP_VERSION}"', 1)]),
+        ("madgood_mining", "gauge", "1 while cpuminer is running.",
+         [("", int(snap.mining))]),
+        ("madgood_pool_connected", "gauge", "1 while the pool connection is up.",
+         [("", int(snap.connected))]),
+        ("madgood_hashrate_hashes_per_second", "gauge", "Current hashrate.",
+         [("", snap.hashrate)]),
+        ("madgood_thread_hashrate_hashes_per_second", "gauge", "Hashrate per cpuminer thread.",
+         [(f'thread="{i}"', rate) for i, rate in enumerate(snap.thread_hashrates)]),
+        ("madgood_hashes", "counter", "Hashes computed since the app started.",
+         [("", snap.hashes_at(now))]),
+        ("madgood_jobs_received", "counter", "Stratum jobs (block templates) received.",
+         [("", snap.block_attempts)]),
+        ("madgood_shares", "counter", "Shares submitted, by pool verdict.",
+         [('result="accepted"', snap.shares_accepted),
+          ('result="rejected"', snap.shares_rejected)]),
+        ("madgood_share_difficulty", "gauge", "Current share difficulty.",
+         [("", snap.share_difficulty)]),
+        ("madgood_blocks_found", "counter", "Blocks found.",
+         [("", snap.blocks_found)]),
+        ("madgood_uptime_seconds", "gauge", "Seconds since mining started.",
+         [("", snap.uptime_at(now))]),
+        ("madgood_cpuminer_restarts", "counter", "cpuminer launches after the first.",
+         [("", max(0, snap.miner_starts - 1))]),
+        ("madgood_block_height", "gauge", "Latest known block height.",
+         [("", snap.block_height)]),
+        ("madgood_btc_price_usd", "gauge", "BTC price in USD.",
+         [("", snap.btc_price_usd)]),
+    ]
+
+
+def _value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def render(snap: StatsSnapshot, now: Optional[float] = None, openmetrics: bool = True) -> bytes:
+    now = time.time() if now is None else now
+    out = []
+    for name, kind, help_text, samples in _families(snap, now):
+        # OpenMetrics names the counter family without _total; the classic
+        # format wants TYPE to match the sample name.
+        sample_name = name + "_total" if kind == "counter" else name
+        family = name if openmetrics else sample_name
+        out.append(f"# HELP {family} {help_text}")
+        out.append(f"# TYPE {family} {kind}")
+        for labels, value in samples:
+            label_text = f"{{{labels}}}" if labels else ""
+            out.append(f"{sample_name}{label_text} {_value(value)}")
+    if openmetrics:
+        out.append("# EOF")
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    exporter: "MetricsExporter" = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.exporter.page(openmetrics)
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood stdout
+
+
+class MetricsExporter:
+    def __init__(self, stats: MinerStats, port: int = DEFAULT_METRICS_PORT,
+                 host: str = DEFAULT_METRICS_HOST, max_age: float = 1.0):
+        self.stats = stats
+        self.host = host
+        self.port = port
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._cache = {}  # openmetrics flag -> (rendered_at, bytes)
+        self._server = None
+        self._thread = None
+
+    def page(self, openmetrics: bool = True) -> bytes:
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(openmetrics)
+            if cached is None or now - cached[0] >= self.max_age:
+                cached = (now, render(self.stats.snapshot(), now, openmetrics))
+                self._cache[openmetrics] = cached
+            return cached[1]
+
+    def start(self):
+        """
+        Bind and serve in the background. Raises OSError if the port is taken.
+        """
+        if self._server is not None:
+            return
+        handler = type("MetricsHandler", (_Handler,), {"exporter": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.5}, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread.join(timeout=2)
+        self._thread = None
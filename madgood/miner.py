@@ -0,0 +1,237 @@
+import asyncio
+import os
+import subprocess
+from typing import Dict, List, Optional
+
+from .config import CPUMINER_PATH, POOL_HOST, POOL_PORT
+from .events import (
+    BUS_BLOCK,
+    BUS_CONNECTION,
+    BUS_HASHRATE,
+    BUS_JOB,
+    BUS_SHARE,
+    BUS_STATUS,
+    EventBus,
+)
+from .logstore import LogStore
+from .parsing import (
+    EVENT_BLOCK_FOUND,
+    EVENT_CONN_FAILED,
+    EVENT_CONNECTED,
+    EVENT_CONNECTING,
+    EVENT_EXTRANONCE,
+    EVENT_HASHRATE,
+    EVENT_JOB,
+    EVENT_REJECT,
+    EVENT_SHARE,
+    aiter_pipe_lines,
+    classify_line,
+    iter_pipe_lines,
+)
+from .stats import MinerStats
+
+POWER_MODES = ("high", "medium", "low")
+
+
+def get_threads_for_power(mode: str = "high") -> int:
+    """
+    Map power mode -> number of CPU threads.
+    High   = all cores
+    Medium = half the cores (rounded up)
+    Low    = 1 core
+    """
+    cores = os.cpu_count() or 1
+    if mode == "high":
+        return max(1, cores)
+    elif mode == "medium":
+        return max(1, (cores + 1) // 2)
+    else:
+        return 1  # low
+
+
+def build_miner_command(
+    wallet: str,
+    threads: int,
+    pool_host: str = POOL_HOST,
+    pool_port: int = POOL_PORT,
+    binary: str = CPUMINER_PATH,
+    extra_args: Optional[List[str]] = None,
+    api_port: Optional[int] = None,
+) -> List[str]:
+    cmd = [
+        binary,
+        "-a", "sha256d",
+        "-o", f"stratum+tcp://{pool_host}:{pool_port}",
+        "-u", wallet,
+        "-p", "x",
+        "-t", str(threads),
+        "--no-color",
+    ]
+    if api_port:
+        # Local only; cpuminer-opt refuses remote control unless --api-remote.
+        cmd += ["--api-bind", f"127.0.0.1:{api_port}"]
+    if extra_args:
+        cmd.extend(extra_args)
+    return cmd
+
+
+def terminate_miner(proc: subprocess.Popen, timeout: float = 5.0):
+    # Synchronous: autotune's benchmark processes are plain Popen objects.
+    try:
+        proc.terminate()
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    except Exception:
+        pass
+
+
+def handle_miner_lines(
+    batch: List[str], stats: MinerStats, bus: EventBus, log_store: LogStore,
+    api=None,
+) -> bool:
+    """
+    Feed one batch of cpuminer lines to the log store, the stats object and
+    the event bus.
+
+    `api` is an optional ApiPoller. While it is healthy it owns hashrate
+    and share counts, and those log lines only drive the event bus.
+
+    Returns True if the pool connection failed; the caller stops the miner.
+    """
+    publish = bus.publish
+    events = [classify_line(line) for line in batch]
+    # Save log (the events feed the per-kind index of the log view)
+    log_store.extend(batch, events)
+
+    for ev in events:
+        if ev is None:
+            continue
+        kind = ev.kind
+        from_log = api is None or not api.healthy
+
+        if kind == EVENT_HASHRATE:
+            if ev.value > 0 and from_log:
+                stats.set_hashrate(ev.value)
+                publish(BUS_HASHRATE, ev.value)
+
+        elif kind == EVENT_JOB:
+            # Job / block attempts
+            if not stats.snapshot().connected:
+                publish(BUS_CONNECTION, True)
+                publish(BUS_STATUS, "Connected to CKPool, mining...")
+            stats.record_job(ev.value)
+            publish(BUS_JOB, ev.value)
+
+        elif kind == EVENT_SHARE:
+            if from_log:
+                if ev.value > 0:
+                    stats.set_hashrate(ev.value)
+                    publish(BUS_HASHRATE, ev.value)
+                stats.record_share(True)
+            publish(BUS_SHARE, True)
+
+        elif kind == EVENT_REJECT:
+            if from_log:
+                stats.record_share(False)
+            publish(BUS_SHARE, False)
+
+        elif kind == EVENT_BLOCK_FOUND:
+            stats.record_block_found()
+            publish(BUS_BLOCK)
+            publish(BUS_STATUS, "BLOCK FOUND! Check CKPool / wallet.")
+
+        elif kind == EVENT_EXTRANONCE:
+            # Extranonce (used as pseudo user-id)
+            stats.update(ckpool_user_id=ev.value)
+
+        elif kind == EVENT_CONNECTED:
+            stats.update(connected=True)
+            publish(BUS_CONNECTION, True)
+            publish(BUS_STATUS, "Connected to CKPool, mining...")
+
+        elif kind == EVENT_CONNECTING:
+            stats.update(connected=False)
+            publish(BUS_CONNECTION, False)
+            publish(BUS_STATUS, "Connecting to CKPool...")
+
+        elif kind == EVENT_CONN_FAILED:
+            stats.stop()
+            publish(BUS_CONNECTION, False)
+            publish(BUS_STATUS, "CKPool connection failed. Miner stopped.")
+            return True
+
+        # Block height from miner output (optional)
+        if ev.height > 0:
+            stats.record_block_height(ev.height)
+
+    return False
+
+
+def process_miner_output(
+    proc: subprocess.Popen, stats: MinerStats, bus: EventBus, log_store: LogStore,
+    api=None,
+) -> bool:
+    """
+    Consume cpuminer output until the pipe closes (see handle_miner_lines()).
+    Blocking; the miners themselves go through process_miner_output_async(),
+    this is what --replay drives with a recorded log.
+
+    Returns True if the pool connection failed and the miner was told to stop.
+    """
+    for batch in iter_pipe_lines(proc.stdout):
+        if handle_miner_lines(batch, stats, bus, log_store, api):
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+            return True
+    return False
+
+
+# ---------------- ASYNCIO ----------------
+
+async def launch_miner_async(cmd: List[str], env: Optional[Dict[str, str]] = None):
+    """
+    Start cpuminer with stdout+stderr on one pipe, as an asyncio subprocess;
+    must run on the event loop that will read its output (see madgood/aio.py).
+    `env` replaces the inherited environment when given.
+    """
+    return await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        env=env,
+    )
+
+
+async def terminate_miner_async(proc, timeout: float = 5.0):
+    try:
+        proc.terminate()
+    except ProcessLookupError:
+        return
+    try:
+        await asyncio.wait_for(proc.wait(), timeout)
+    except asyncio.TimeoutError:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+
+
+async def process_miner_output_async(
+    proc, stats: MinerStats, bus: EventBus, log_store: LogStore, api=None,
+) -> bool:
+    """
+    process_miner_output() for an asyncio subprocess.
+    """
+    async for batch in aiter_pipe_lines(proc.stdout):
+        if handle_miner_lines(batch, stats, bus, log_store, api):
+            try:
+                proc.terminate()
+            except ProcessLookupError:
+                pass
+            return True
+    return False
@@ -0,0 +1,276 @@
+"""
+Local mock of a CKPool-style Stratum v1 server, for offline runs.
+
+Accepts any username, hands out jobs on a timer (a new block every
+`block_interval`), and accepts every submitted share except each
+`reject_every`-th. `drop_every` closes all connections periodically to
+exercise reconnects.
+
+    python3 -m madgood.mockpool --port 3333
+    MADGOOD_POOL_HOST=127.0.0.1 MADGOOD_POOL_PORT=3333 python3 -m madgood --wallet x
+
+or in-process:
+
+    pool = MockPool()
+    host, port = pool.start_background()
+    ...
+    pool.stop()
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+
+class MockPoolStats(NamedTuple):
+    connections: int     # accepted so far
+    clients: int         # connected now
+    jobs: int
+    submits: int
+    accepted: int
+    rejected: int
+
+
+def _line(obj) -> bytes:
+    return json.dumps(obj).encode() + b"\n"
+
+
+def _coinb1(height: int, extranonce_size: int) -> str:
+    # version, 1 input, null prevout, script length, BIP34 height push, tag;
+    # the extranonces that follow are part of the script too.
+    script = "03" + height.to_bytes(3, "little").hex() + b"/mockpool/".hex()
+    return ("01000000" + "01" + "00" * 32 + "ffffffff"
+            + f"{len(script) // 2 + extranonce_size:02x}" + script)
+
+
+class _Client:
+    __slots__ = ("writer", "extranonce1", "authorized")
+
+    def __init__(self, writer, extranonce1: str):
+        self.writer = writer
+        self.extranonce1 = extranonce1
+        self.authorized = False
+
+    def send(self, data: bytes):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+class MockPool:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        difficulty: float = 1.0,
+        job_interval: float = 30.0,
+        block_interval: float = 600.0,
+        height: int = 930000,
+        extranonce2_size: int = 8,
+        reject_every: int = 0,
+        drop_every: float = 0.0,
+    ):
+        self.host = host
+        self.port = port
+        self.difficulty = difficulty
+        self.job_interval = job_interval
+        self.block_interval = block_interval
+        self.height = height
+        self.extranonce2_size = extranonce2_size
+        self.reject_every = reject_every
+        self.drop_every = drop_every
+
+        self.connections = 0
+        self.jobs = 0
+        self.submits = 0
+        self.accepted = 0
+        self.rejected = 0
+        self._clients: Dict[int, _Client] = {}
+        self._prevhash = os.urandom(32).hex()
+        self._job_id = 0
+        self._notify: Optional[bytes] = None
+        self._server = None
+        self._tasks = []
+        self._loop = None
+        self._thread = None
+
+    def stats(self) -> MockPoolStats:
+        return MockPoolStats(self.connections, len(self._clients), self.jobs,
+                             self.submits, self.accepted, self.rejected)
+
+    # ---------- Jobs ----------
+
+    def _new_job(self, new_block: bool):
+        if new_block:
+            self.height += 1
+            self._prevhash = os.urandom(32).hex()
+        self._job_id += 1
+        self.jobs += 1
+        self._notify = _line({"id": None, "method": "mining.notify", "params": [
+            f"{self._job_id:x}", self._prevhash, _coinb1(self.height, 4 + self.extranonce2_size),
+            "ffffffff0100f2052a010000001976a914" + "00" * 20 + "88ac00000000",
+            [], "20000000", "1703a30c", f"{int(time.time()):08x}", new_block,
+        ]})
+        for client in self._clients.values():
+            if client.authorized:
+                client.send(self._notify)
+
+    async def _job_loop(self):
+        next_block = time.time() + self.block_interval
+        while True:
+            await asyncio.sleep(self.job_interval)
+            block = time.time() >= next_block
+            if block:
+                next_block = time.time() + self.block_interval
+            self._new_job(block)
+
+    async def _drop_loop(self):
+        while True:
+            await asyncio.sleep(self.drop_every)
+            for client in list(self._clients.values()):
+                client.writer.close()
+
+    # ---------- Lifecycle ----------
+
+    async def start(self):
+        self._new_job(False)
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._tasks.append(asyncio.ensure_future(self._job_loop()))
+        if self.drop_every > 0:
+            self._tasks.append(asyncio.ensure_future(self._drop_loop()))
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        server, self._server = self._server, None
+        for client in list(self._clients.values()):
+            client.writer.close()
+        self._clients.clear()
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    def start_background(self) -> Tuple[str, int]:
+        """
+        Run on a private event loop in a daemon thread; returns (host, port)
+        once it is listening.
+        """
+        ready = threading.Event()
+        error = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.start())
+            except OSError as e:
+                error.append(e)
+                ready.set()
+                return
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.close())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        if error:
+            raise error[0]
+        return self.host, self.port
+
+    def stop(self):
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ---------- Clients ----------
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        key = self.connections
+        client = _Client(writer, f"{key:08x}")
+        self._clients[key] = client
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                self._handle(client, msg)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.pop(key, None)
+            writer.close()
+
+    def _handle(self, client: _Client, msg: dict):
+        msg_id = msg.get("id")
+        method = msg.get("method")
+
+        def reply(result, error=None):
+            client.send(_line({"id": msg_id, "result": result, "error": error}))
+
+        if method == "mining.subscribe":
+            sid = client.extranonce1
+            reply([[["mining.set_difficulty", sid], ["mining.notify", sid]],
+                   client.extranonce1, self.extranonce2_size])
+        elif method == "mining.authorize":
+            client.authorized = True
+            reply(True)
+            client.send(_line({"id": None, "method": "mining.set_difficulty",
+                               "params": [self.difficulty]}))
+            client.send(self._notify)
+        elif method in ("mining.extranonce.subscribe", "mining.suggest_difficulty"):
+            reply(True)
+        elif method == "mining.configure":
+            reply({})
+        elif method == "mining.submit":
+            self.submits += 1
+            if self.reject_every and self.submits % self.reject_every == 0:
+                self.rejected += 1
+                reply(False, [23, "Low difficulty share", None])
+            else:
+                self.accepted += 1
+                reply(True)
+        else:
+            reply(None, [20, f"Unsupported method {method!r}", None])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m madgood.mockpool",
+                                     description="Local mock Stratum pool")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3333)
+    parser.add_argument("--difficulty", type=float, default=1.0)
+    parser.add_argument("--job-interval", type=float, default=30.0)
+    parser.add_argument("--block-interval", type=float, default=600.0)
+    parser.add_argument("--reject-every", type=int, default=0)
+    parser.add_argument("--drop-every", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    pool = MockPool(args.host, args.port, args.difficulty, args.job_interval,
+                    args.block_interval, reject_every=args.reject_every,
+                    drop_every=args.drop_every)
+    host, port = pool.start_background()
+    print(f"Mock pool listening on {host}:{port}", flush=True)
+    try:
+        while True:
+            time.sleep(60)
+            print(pool.stats(), flush=True)
+    except KeyboardInterrupt:
+        pass
+    pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,209 @@
+"""
+Block height and BTC price from public HTTP APIs.
+
+Providers are queried concurrently over one keep-alive requests.Session.
+Each has its own TTL; responses carrying an ETag or Last-Modified are
+revalidated with If-None-Match / If-Modified-Since, so an unchanged value
+costs a 304. A failing provider backs off exponentially with jitter while
+the others carry on. Block height is not polled at all while the miner log
+keeps reporting it.
+"""
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .config import APP_VERSION, BLOCK_HEIGHT_URL, BTC_PRICE_URL
+from .stats import MinerStats, StatsSnapshot
+
+
+def _parse_height(response) -> int:
+    return int(response.text.strip())
+
+
+def _parse_coingecko_price(response) -> float:
+    return float(response.json()["bitcoin"]["usd"])
+
+
+def _height_from_log(snap: StatsSnapshot, now: float, ttl: float) -> bool:
+    return snap.block_height_at > 0 and now - snap.block_height_at < ttl
+
+
+class Provider(NamedTuple):
+    name: str
+    url: str
+    field: str                      # StatsSnapshot field to update
+    parse: Callable                 # requests.Response -> value
+    ttl: float                      # seconds a good value stays fresh
+    skip: Optional[Callable] = None  # (snapshot, now, ttl) -> True to skip this round
+
+
+DEFAULT_PROVIDERS = (
+    Provider("block height", BLOCK_HEIGHT_URL, "block_height", _parse_height,
+             ttl=120.0, skip=_height_from_log),
+    Provider("btc price", BTC_PRICE_URL, "btc_price_usd", _parse_coingecko_price,
+             ttl=300.0),
+)
+
+
+class _ProviderState:
+    __slots__ = ("etag", "last_modified", "value", "next_at", "failures", "error")
+
+    def __init__(self):
+        self.etag = None
+        self.last_modified = None
+        self.value = None
+        self.next_at = 0.0
+        self.failures = 0
+        self.error = None
+
+
+class NetworkFetcher:
+    """
+        fetcher = NetworkFetcher(stats)
+        await fetcher.run_once_async()   # fetch whatever is due, update stats
+        fetcher.seconds_until_due()
+    """
+
+    def __init__(
+        self,
+        stats: MinerStats,
+        providers: Optional[List[Provider]] = None,
+        session=None,
+        timeout: float = 5.0,
+        backoff_base: float = 5.0,
+        backoff_max: float = 600.0,
+    ):
+        self.stats = stats
+        self.providers = list(providers or DEFAULT_PROVIDERS)
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.state: Dict[str, _ProviderState] = {p.name: _ProviderState() for p in self.providers}
+        self._session = session
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, len(self.providers)), thread_name_prefix="netinfo"
+        )
+
+    @property
+    def session(self):
+        if self._session is None:
+            # Imported here so headless startup doesn't pay for requests/urllib3.
+            import requests
+
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=len(self.providers), pool_maxsize=len(self.providers)
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = f"madgood/{APP_VERSION}"
+            self._session = session
+        return self._session
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        if self._session is not None:
+            self._session.close()
+
+    # ---------- Scheduling ----------
+
+    def _backoff(self, failures: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (failures - 1)))
+        return delay * random.uniform(0.5, 1.5)
+
+    def due(self, now: Optional[float] = None) -> List[Provider]:
+        now = time.time() if now is None else now
+        snap = self.stats.snapshot()
+        due = []
+        for p in self.providers:
+            st = self.state[p.name]
+            if now < st.next_at:
+                continue
+            if p.skip is not None and p.skip(snap, now, p.ttl):
+                st.next_at = now + p.ttl
+                continue
+            due.append(p)
+        return due
+
+    def seconds_until_due(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        return max(0.0, min(self.state[p.name].next_at for p in self.providers) - now)
+
+    # ---------- Fetching ----------
+
+    def _fetch(self, p: Provider):
+        st = self.state[p.name]
+        headers = {}
+        if st.etag:
+            headers["If-None-Match"] = st.etag
+        if st.last_modified:
+            headers["If-Modified-Since"] = st.last_modified
+        r = self.session.get(p.url, headers=headers, timeout=self.timeout)
+        if r.status_code == 304 and st.value is not None:
+            return st.value, False
+        r.raise_for_status()
+        value = p.parse(r)
+        st.etag = r.headers.get("ETag")
+        st.last_modified = r.headers.get("Last-Modified")
+        return value, True
+
+    async def run_once_async(self, now: Optional[float] = None) -> bool:
+        """
+        Fetch every due provider in parallel and write new values to stats.
+        Returns True if any stats field changed. requests is blocking, so the
+        fetches go to the worker pool and the loop is never held up.
+        """
+        due = self.due(now)
+        if not due:
+            return False
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(self._pool, self._fetch, p) for p in due]
+        done = await asyncio.gather(*futures, return_exceptions=True)
+        done_at = time.time()
+        return self._apply([(p, r, done_at) for p, r in zip(due, done)])
+
+    def _apply(self, results) -> bool:
+        # results: (provider, (value, fresh) or the exception, finished at)
+        updates = {}
+        for p, result, done_at in results:
+            st = self.state[p.name]
+            if isinstance(result, BaseException):
+                st.failures += 1
+                st.error = str(result) or type(result).__name__
+                st.next_at = done_at + self._backoff(st.failures)
+                continue
+            value, fresh = result
+            st.failures = 0
+            st.error = None
+            st.next_at = done_at + p.ttl
+            if fresh or st.value != value:
+                st.value = value
+                updates[p.field] = value
+
+        snap = self.stats.snapshot()
+        # A height from the log may have arrived while we were fetching.
+        if "block_height" in updates and snap.block_height > updates["block_height"]:
+            del updates["block_height"]
+        changed = {k: v for k, v in updates.items() if getattr(snap, k) != v}
+        if changed:
+            self.stats.update(**changed)
+        return bool(changed)
+
+
+async def network_status_task(stats: MinerStats, ui_update_callback,
+                              providers: Optional[List[Provider]] = None):
+    """
+    Keep block height / BTC price in `stats` fresh until cancelled; runs on
+    the shared loop (madgood/aio.py) next to the miners.
+    """
+    fetcher = NetworkFetcher(stats, providers)
+    try:
+        while True:
+            if await fetcher.run_once_async():
+                ui_update_callback()
+            # Re-check at least once a minute so a stalled log is noticed.
+            await asyncio.sleep(min(60.0, max(1.0, fetcher.seconds_until_due())))
+    finally:
+        fetcher.close()
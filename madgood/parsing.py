@@ -0,0 +1,326 @@
+import re
+import time
+from typing import List, NamedTuple
+
+# ---------------- PARSERS ----------------
+
+_HASHRATE_PAREN_RE = re.compile(r"\(([\d.]+)\s*([kKmMgG])h/s\)")
+_HASHRATE_TTF_RE = re.compile(r"TTF @\s*([\d.]+)\s*([kKmMgG]?)[hH]/s")
+_HASHRATE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([kKmMgG]?)[hH]/s")
+_BLOCK_HEIGHT_RE = re.compile(r"Block\s+(\d+)")
+_EXTRANONCE_RE = re.compile(r"stratum extranonce1\s+0x([0-9a-fA-F]+)", re.IGNORECASE)
+_JOB_RE = re.compile(r"Job\s+([0-9a-fA-F]+)")
+
+_UNIT_MULTIPLIERS = {"": 1.0, "k": 1e3, "m": 1e6, "g": 1e9}
+
+
+def _to_hps(val: str, unit: str) -> float:
+    try:
+        return float(val) * _UNIT_MULTIPLIERS.get(unit.strip().lower(), 1.0)
+    except ValueError:
+        return 0.0
+
+
+def parse_hashrate_from_line(line: str) -> float:
+    """
+    Extract hashrate from cpuminer log output.
+
+    Handles:
+      - Periodic report lines: "Hash rate ... (13.16Mh/s)"
+      - TTF lines: "TTF @ 80.00 h/s" or "TTF @ 13.79 Mh/s"
+      - Generic "123.45 kH/s", "12.3 MH/s", etc.
+
+    Returns hashrate in H/s.
+    """
+    # Periodic report style: "Hash rate ... (13.16Mh/s)"
+    m = _HASHRATE_PAREN_RE.search(line)
+    if m:
+        return _to_hps(m.group(1), m.group(2))
+
+    lower = line.lower()
+
+    # TTF lines: "TTF @ 80.00 h/s" or "TTF @ 13.79 Mh/s"
+    if "ttf" in lower:
+        m = _HASHRATE_TTF_RE.search(line)
+        if m:
+            return _to_hps(m.group(1), m.group(2))
+        return 0.0
+
+    # Generic "xxx H/s" somewhere in the line (not TTF)
+    if "h/s" in lower:
+        m = _HASHRATE_RE.search(line)
+        if m:
+            return _to_hps(m.group(1), m.group(2))
+
+    return 0.0
+
+
+def parse_block_height_from_line(line: str):
+    m = _BLOCK_HEIGHT_RE.search(line)
+    return int(m.group(1)) if m else None
+
+
+def parse_extranonce_from_line(line: str):
+    m = _EXTRANONCE_RE.search(line)
+    return m.group(1) if m else None
+
+
+def parse_job_from_line(line: str):
+    m = _JOB_RE.search(line)
+    return m.group(1) if m else None
+
+
+# ---------------- CLASSIFIER ----------------
+
+# Event kinds produced by classify_line()
+EVENT_HASHRATE = "hashrate"        # value = H/s
+EVENT_JOB = "job"                  # value = job id, height = block (or 0)
+EVENT_SUBMIT = "submit"            # value = job id, height = block (or 0)
+EVENT_SHARE = "share"              # value = H/s if the line carried one, else 0.0
+EVENT_REJECT = "reject"
+EVENT_BLOCK_FOUND = "block_found"
+EVENT_HEIGHT = "height"            # height = block
+EVENT_EXTRANONCE = "extranonce"    # value = extranonce1 hex
+EVENT_CONNECTING = "connecting"
+EVENT_CONNECTED = "connected"
+EVENT_CONN_FAILED = "conn_failed"
+EVENT_ERROR = "error"              # any other error/failure line
+
+
+class LogEvent(NamedTuple):
+    kind: str
+    line: str
+    value: object = None
+    height: int = 0
+
+
+# Keyword scan over the lower-cased line. Every event starts at one of these
+# literals, so lines without any of them (the bulk of debug output) are
+# rejected after a single C-level search; otherwise the first keyword that
+# resolves decides the event kind.
+_CLASSIFIER_RE = re.compile(
+    r"stratum |yay!!!|block|accepted|rejected|new |submitted diff|ttf @|h/s"
+    r"|error|fail|fault|abort"
+)
+_STRATUM_RE = re.compile(
+    r"(?:(authentication failed|connection failed)|(connection established)"
+    r"|(connect)|extranonce1\s+0x([0-9a-f]+))"
+)
+_NEW_WORK_RE = re.compile(r"stratum diff|work|job|block")
+_FOUND_RE = re.compile(r" (?:found|solved)")
+_HEIGHT_RE = re.compile(r"\s+(\d+)")
+_TTF_RE = re.compile(r"\s*(\d+(?:\.\d+)?)\s*([kmg]?)h/s")
+_RATE_BEFORE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([kmg]?)$")
+_JOB_ANYCASE_RE = re.compile(r"job\s+([0-9a-f]+)", re.IGNORECASE)
+_BLOCK_ANYCASE_RE = re.compile(r"block\s+(\d+)", re.IGNORECASE)
+
+
+def _job_and_height(line: str):
+    m = _JOB_ANYCASE_RE.search(line)
+    job_id = m.group(1) if m else None
+    m = _BLOCK_ANYCASE_RE.search(line)
+    return job_id, (int(m.group(1)) if m else 0)
+
+
+def classify_line(line: str):
+    """
+    Turn one cpuminer log line into a single LogEvent, or None when the line
+    carries nothing the app tracks (it still goes to the log view).
+    """
+    lower = line.lower()
+    search = _CLASSIFIER_RE.search
+    m = search(lower)
+    while m is not None:
+        key = m.group()
+        end = m.end()
+
+        if key == "h/s":
+            r = _RATE_BEFORE_RE.search(lower, max(0, m.start() - 24), m.start())
+            if r is None:
+                m = search(lower, end)
+                continue
+            if "(" in lower:
+                # Periodic report: the bracketed figure is the one we display.
+                p = _HASHRATE_PAREN_RE.search(line)
+                if p:
+                    return LogEvent(EVENT_HASHRATE, line, _to_hps(p.group(1), p.group(2)))
+            return LogEvent(EVENT_HASHRATE, line, _to_hps(r.group(1), r.group(2)))
+
+        if key == "new ":
+            if _NEW_WORK_RE.match(lower, end) is None:
+                m = search(lower, end)
+                continue
+            job_id, height = _job_and_height(line)
+            if job_id:
+                return LogEvent(EVENT_JOB, line, job_id, height)
+            return LogEvent(EVENT_CONNECTED, line, None, height)
+
+        if key == "stratum ":
+            r = _STRATUM_RE.match(lower, end)
+            if r is None:
+                m = search(lower, end)
+                continue
+            if r.group(1):
+                return LogEvent(EVENT_CONN_FAILED, line)
+            if r.group(2):
+                return LogEvent(EVENT_CONNECTED, line)
+            if r.group(3):
+                return LogEvent(EVENT_CONNECTING, line)
+            return LogEvent(EVENT_EXTRANONCE, line, r.group(4))
+
+        if key == "accepted":
+            if m.start() == 0:
+                return None  # "Accepted  12  12  100.0%" row of a periodic report
+            if "block found" in lower or "yay!!!" in lower:
+                return LogEvent(EVENT_BLOCK_FOUND, line)
+            if "block" in lower:
+                return None
+            r = _HASHRATE_RE.search(lower, end)
+            return LogEvent(EVENT_SHARE, line, _to_hps(r.group(1), r.group(2)) if r else 0.0)
+
+        if key == "block":
+            if _FOUND_RE.match(lower, end):
+                return LogEvent(EVENT_BLOCK_FOUND, line)
+            r = _HEIGHT_RE.match(lower, end)
+            if r:
+                return LogEvent(EVENT_HEIGHT, line, None, int(r.group(1)))
+            m = search(lower, end)
+            continue
+
+        if key == "ttf @":
+            r = _TTF_RE.match(lower, end)
+            if r:
+                return LogEvent(EVENT_HASHRATE, line, _to_hps(r.group(1), r.group(2)))
+            return None
+
+        if key == "submitted diff":
+            job_id, height = _job_and_height(line)
+            return LogEvent(EVENT_SUBMIT, line, job_id, height)
+
+        if key == "rejected":
+            if m.start() == 0:
+                return None
+            return LogEvent(EVENT_REJECT, line)
+
+        if key == "yay!!!":
+            return LogEvent(EVENT_BLOCK_FOUND, line)
+
+        # "error", "fail", "fault", "abort"
+        return LogEvent(EVENT_ERROR, line)
+
+    return None
+
+
+_ANSI_ESCAPE_RE = re.compile(rb"\x1b\[[0-9;]*[A-Za-z]")
+
+
+class PipeLineSplitter:
+    """
+    Turn raw chunks of miner output into lists of decoded, non-empty lines.
+
+    A partial trailing line is carried over to the next chunk; finish()
+    returns it once the pipe has closed.
+    """
+
+    __slots__ = ("pending",)
+
+    def __init__(self):
+        self.pending = b""
+
+    def feed(self, chunk: bytes) -> List[str]:
+        if self.pending:
+            chunk = self.pending + chunk
+        cut = chunk.rfind(b"\n")
+        if cut < 0:
+            self.pending = chunk
+            return []
+        self.pending = chunk[cut + 1:]
+        data = chunk[:cut]
+        if b"\x1b" in data:
+            data = _ANSI_ESCAPE_RE.sub(b"", data)
+        lines = [ln.strip() for ln in data.decode("utf-8", "replace").splitlines()]
+        return [ln for ln in lines if ln]
+
+    def finish(self) -> List[str]:
+        pending, self.pending = self.pending, b""
+        line = _ANSI_ESCAPE_RE.sub(b"", pending).decode("utf-8", "replace").strip()
+        return [line] if line else []
+
+
+def iter_pipe_lines(stream, chunk_size: int = 65536):
+    """
+    Read a binary pipe in bulk and yield lists of decoded, non-empty lines.
+
+    Each read1() call returns whatever the pipe already holds (up to
+    chunk_size), so a burst of output is handled as one batch instead of one
+    Python-level iteration per line.
+    """
+    splitter = PipeLineSplitter()
+    feed = splitter.feed
+    read = stream.read1
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        lines = feed(chunk)
+        if lines:
+            yield lines
+
+    lines = splitter.finish()
+    if lines:
+        yield lines
+
+
+async def aiter_pipe_lines(reader, chunk_size: int = 65536):
+    """
+    iter_pipe_lines() for an asyncio StreamReader (asyncio subprocess stdout).
+    """
+    splitter = PipeLineSplitter()
+    while True:
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            break
+        lines = splitter.feed(chunk)
+        if lines:
+            yield lines
+
+    lines = splitter.finish()
+    if lines:
+        yield lines
+
+
+SAMPLE_MINER_LOG = (
+    "[2025-01-01 12:00:00] 4 of 4 miner threads started using 'sha256d' algorithm",
+    "[2025-01-01 12:00:00] Stratum connection established",
+    "[2025-01-01 12:00:00] Stratum extranonce1 0x1a2b3c4d, extranonce2 size 8",
+    "[2025-01-01 12:00:01] New Stratum Diff 1, Block 876543, Tx 3120, Job 67a1b2c3000001",
+    "[2025-01-01 12:00:01] Miner TTF @ 13.79 Mh/s 4.00m, Net TTF @ 600.00 Eh/s 9.99y",
+    "[2025-01-01 12:00:05] Total: 13784.22 kH/s, Temp: 0C, Freq: 0.000/0.000 GHz",
+    "[2025-01-01 12:00:30] New Block 876544, Tx 2871, Net Diff 1.1e+14, Job 67a1b2c3000002",
+    "[2025-01-01 12:00:31] 1 Submitted Diff 1.2, Block 876544, Job 67a1b2c3000002",
+    "[2025-01-01 12:00:31] 1 Accepted 1 S0 R0 B0, 0.210 sec (35ms)",
+    "[2025-01-01 12:05:00] Periodic Report     5m00s    4m59s",
+    "Hash rate         13.16Mh/s     13.22Mh/s   (13.16Mh/s)",
+    "Accepted              1            1    100.0%",
+    "[2025-01-01 12:05:01] Stratum connection interrupted",
+    "CPU #0: 3.29 MH/s",
+)
+
+
+def measure_parser_throughput(lines=SAMPLE_MINER_LOG, seconds: float = 1.0) -> float:
+    """
+    Run classify_line() over `lines` repeatedly for about `seconds` and
+    return the achieved rate in lines/sec.
+    """
+    lines = list(lines)
+    done = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for line in lines:
+            classify_line(line)
+        done += len(lines)
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+    return done / (now - start)
@@ -0,0 +1,384 @@
+"""
+Local Stratum v1 proxy.
+
+Many cpuminer processes (or boxes) connect here; the proxy keeps a single
+upstream session to the pool. Each downstream is handed extranonce1 =
+upstream extranonce1 + a per-connection prefix and a correspondingly
+smaller extranonce2, so their search spaces never overlap and every share
+is valid for the one upstream subscription. Jobs are encoded once and
+written to every downstream.
+
+    python3 -m madgood --wallet <BTC address> --proxy 0.0.0.0:3334
+    python3 -m madgood --wallet <BTC address> --pool proxy-box:3334   # on each miner
+"""
+import asyncio
+import json
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+from .config import POOL_HOST, POOL_PORT
+from .stratum import StratumClient, StratumError
+
+DEFAULT_PROXY_PORT = 3334
+
+
+class ProxyStats(NamedTuple):
+    upstream_connected: bool
+    upstream_connects: int
+    downstreams: int
+    jobs: int
+    shares_accepted: int
+    shares_rejected: int
+
+
+class _Downstream:
+    __slots__ = ("writer", "slot", "peer", "authorized", "extranonce_subscribed")
+
+    def __init__(self, writer, slot: int):
+        self.writer = writer
+        self.slot = slot
+        self.peer = writer.get_extra_info("peername")
+        self.authorized = False
+        self.extranonce_subscribed = False
+
+    def send(self, data: bytes):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+def _line(obj) -> bytes:
+    return json.dumps(obj).encode() + b"\n"
+
+
+def _notify_params(job):
+    return [job.job_id, job.prevhash, job.coinb1, job.coinb2, list(job.merkle_branch),
+            job.version, job.nbits, job.ntime, job.clean_jobs]
+
+
+class StratumProxy:
+    """
+    Upstream: one StratumClient authorized as `username`. Downstream
+    usernames are accepted as-is and not forwarded.
+
+    `prefix_size` bytes of the upstream extranonce2 identify the downstream
+    connection, so up to 256 ** prefix_size miners can be attached.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str = "x",
+        upstream_host: str = POOL_HOST,
+        upstream_port: int = POOL_PORT,
+        listen_host: str = "127.0.0.1",
+        listen_port: int = DEFAULT_PROXY_PORT,
+        prefix_size: int = 1,
+        on_status: Optional[Callable[[str], None]] = None,
+    ):
+        self.username = username
+        self.password = password
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.prefix_size = prefix_size
+        self.on_status = on_status
+
+        self.upstream: Optional[StratumClient] = None
+        self._server = None
+        self._ready = None
+        self._lost = None
+        self._stop = None
+        self._stopping = False
+        self._downstreams: Dict[int, _Downstream] = {}
+        self._last_difficulty = None
+        self._last_notify = None
+
+        self.upstream_connects = 0
+        self.jobs = 0
+        self.shares_accepted = 0
+        self.shares_rejected = 0
+
+    # ---------- Status ----------
+
+    def _status(self, msg: str):
+        if self.on_status:
+            self.on_status(msg)
+
+    def stats(self) -> ProxyStats:
+        return ProxyStats(
+            upstream_connected=bool(self.upstream and self.upstream.connected),
+            upstream_connects=self.upstream_connects,
+            downstreams=len(self._downstreams),
+            jobs=self.jobs,
+            shares_accepted=self.shares_accepted,
+            shares_rejected=self.shares_rejected,
+        )
+
+    @property
+    def extranonce2_size(self) -> int:
+        return self.upstream.extranonce2_size - self.prefix_size
+
+    def _extranonce1_for(self, down: _Downstream) -> str:
+        return self.upstream.extranonce1 + down.slot.to_bytes(self.prefix_size, "big").hex()
+
+    # ---------- Lifecycle ----------
+
+    async def start(self):
+        """
+        Start listening; downstreams that subscribe before the upstream is
+        ready wait for it.
+        """
+        self._ready = asyncio.Event()
+        self._lost = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self._serve_downstream, self.listen_host, self.listen_port
+        )
+        self.listen_port = self._server.sockets[0].getsockname()[1]
+        self._status(f"Proxy listening on {self.listen_host}:{self.listen_port}")
+
+    async def run(self, retry_delay: float = 1.0, max_retry_delay: float = 60.0):
+        """
+        Keep the upstream session alive until close() is called.
+        """
+        if self._server is None:
+            await self.start()
+        delay = retry_delay
+        while not self._stopping:
+            client = StratumClient(
+                self.username, self.password,
+                host=self.upstream_host, port=self.upstream_port,
+                on_job=self._on_job,
+                on_difficulty=self._on_difficulty,
+                on_extranonce=self._on_extranonce,
+                on_disconnect=lambda exc: self._lost.set(),
+            )
+            self._lost.clear()
+            try:
+                await client.connect()
+            except (OSError, StratumError, asyncio.TimeoutError) as e:
+                self._status(f"Upstream {self.upstream_host}:{self.upstream_port} failed: {e}")
+                await client.close()
+                await self._sleep(delay)
+                delay = min(delay * 2, max_retry_delay)
+                continue
+
+            if client.extranonce2_size <= self.prefix_size:
+                await client.close()
+                raise StratumError(
+                    f"pool extranonce2 size {client.extranonce2_size} leaves no "
+                    f"room for a {self.prefix_size}-byte proxy prefix"
+                )
+
+            self.upstream = client
+            self.upstream_connects += 1
+            delay = retry_delay
+            self._ready.set()
+            self._status(f"Upstream connected to {self.upstream_host}:{self.upstream_port}")
+
+            await self._lost.wait()
+
+            self._ready.clear()
+            await client.close()
+            self._last_notify = None
+            # Their extranonce1 belonged to the old session.
+            self._drop_downstreams()
+            if not self._stopping:
+                self._status("Upstream connection lost, reconnecting...")
+                await self._sleep(delay)
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def close(self):
+        self._stopping = True
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        self._drop_downstreams()
+        if self._stop is not None:
+            self._stop.set()
+            self._lost.set()
+        if server is not None:
+            await server.wait_closed()
+        if self.upstream is not None:
+            await self.upstream.close()
+
+    def _drop_downstreams(self):
+        for down in list(self._downstreams.values()):
+            down.writer.close()
+        self._downstreams.clear()
+
+    # ---------- Upstream -> downstream ----------
+
+    def _broadcast(self, data: bytes):
+        for down in self._downstreams.values():
+            if down.authorized:
+                down.send(data)
+
+    def _on_job(self, job):
+        self.jobs += 1
+        self._last_notify = _line(
+            {"id": None, "method": "mining.notify", "params": _notify_params(job)}
+        )
+        self._broadcast(self._last_notify)
+
+    def _on_difficulty(self, difficulty: float):
+        self._last_difficulty = _line(
+            {"id": None, "method": "mining.set_difficulty", "params": [difficulty]}
+        )
+        self._broadcast(self._last_difficulty)
+
+    def _on_extranonce(self, extranonce1: str, extranonce2_size: int):
+        for down in list(self._downstreams.values()):
+            if down.extranonce_subscribed and self.extranonce2_size > 0:
+                down.send(_line({
+                    "id": None, "method": "mining.set_extranonce",
+                    "params": [self._extranonce1_for(down), self.extranonce2_size],
+                }))
+            else:
+                down.writer.close()
+
+    # ---------- Downstream -> upstream ----------
+
+    def _allocate_slot(self) -> Optional[int]:
+        for slot in range(256 ** self.prefix_size):
+            if slot not in self._downstreams:
+                return slot
+        return None
+
+    async def _serve_downstream(self, reader, writer):
+        slot = self._allocate_slot()
+        if slot is None:
+            writer.close()
+            return
+        down = _Downstream(writer, slot)
+        self._downstreams[slot] = down
+        self._status(f"Miner connected from {down.peer} (slot {slot})")
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                if not isinstance(msg, dict):
+                    continue
+                await self._handle_downstream(down, msg)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if self._downstreams.get(slot) is down:
+                del self._downstreams[slot]
+            writer.close()
+            self._status(f"Miner disconnected from {down.peer} (slot {slot})")
+
+    async def _handle_downstream(self, down: _Downstream, msg: dict):
+        msg_id = msg.get("id")
+        method = msg.get("method")
+        params = msg.get("params") or []
+
+        def reply(result, error=None):
+            down.send(_line({"id": msg_id, "result": result, "error": error}))
+
+        if method == "mining.subscribe":
+            try:
+                await asyncio.wait_for(self._ready.wait(), 30)
+            except asyncio.TimeoutError:
+                reply(None, [20, "Upstream pool unavailable", None])
+                return
+            sid = f"{down.slot:x}"
+            reply([[["mining.set_difficulty", sid], ["mining.notify", sid]],
+                   self._extranonce1_for(down), self.extranonce2_size])
+
+        elif method == "mining.extranonce.subscribe":
+            down.extranonce_subscribed = True
+            reply(True)
+
+        elif method == "mining.authorize":
+            down.authorized = True
+            reply(True)
+            if self._last_difficulty:
+                down.send(self._last_difficulty)
+            if self._last_notify:
+                down.send(self._last_notify)
+
+        elif method == "mining.submit":
+            # Answer out of order so one slow share doesn't stall the reader.
+            asyncio.ensure_future(self._submit(down, msg_id, params))
+
+        else:
+            reply(None, [20, f"Unsupported method {method!r}", None])
+
+    async def _submit(self, down: _Downstream, msg_id, params):
+        def reply(result, error=None):
+            down.send(_line({"id": msg_id, "result": result, "error": error}))
+
+        try:
+            _, job_id, extranonce2, ntime, nonce = params[:5]
+        except (TypeError, ValueError):
+            reply(None, [20, "Bad submit params", None])
+            return
+        # _ready first: extranonce2_size needs the upstream session.
+        if (not self._ready.is_set() or not isinstance(extranonce2, str)
+                or len(extranonce2) != 2 * self.extranonce2_size):
+            reply(None, [20, "Stale or malformed share", None])
+            return
+
+        prefix = down.slot.to_bytes(self.prefix_size, "big").hex()
+        try:
+            share = await self.upstream.submit(job_id, prefix + extranonce2, ntime, nonce)
+        except (StratumError, asyncio.TimeoutError, ConnectionError) as e:
+            reply(None, [20, f"Upstream error: {e}", None])
+            return
+        if share.accepted:
+            self.shares_accepted += 1
+            reply(True)
+        else:
+            self.shares_rejected += 1
+            reply(False, [23, share.error or "Rejected", None])
+
+
+def run_proxy(proxy: StratumProxy, stats_interval: float = 60.0,
+              on_stats: Optional[Callable[[ProxyStats], None]] = None):
+    """
+    Blocking entry point: run the proxy until SIGINT/SIGTERM.
+    """
+    import signal
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C still raises KeyboardInterrupt
+
+        await proxy.start()
+        runner = asyncio.ensure_future(proxy.run())
+        next_stats = time.time() + stats_interval
+        try:
+            while not stop.is_set() and not runner.done():
+                try:
+                    await asyncio.wait_for(stop.wait(), 0.5)
+                except asyncio.TimeoutError:
+                    pass
+                if on_stats and stats_interval > 0 and time.time() >= next_stats:
+                    on_stats(proxy.stats())
+                    next_stats = time.time() + stats_interval
+        finally:
+            await proxy.close()
+            try:
+                await asyncio.wait_for(runner, 5)  # surfaces a fatal StratumError
+            except asyncio.TimeoutError:
+                pass
+
+    asyncio.run(_main())
@@ -0,0 +1,276 @@
+"""
+Streaming hashrate statistics in constant memory.
+
+Every hashrate the miner reports (log line or API poll) is folded into:
+
+  - a time-decayed EWMA, so irregular report intervals weigh correctly;
+  - rolling 1 min / 15 min / 1 h windows with count, mean, min, max and
+    p50 / p95.
+
+Each window is a ring of fixed-span buckets. A bucket keeps count, sum,
+min, max and two P² quantile estimators (Jain & Chlamtac, 1985; five
+markers each). A window's quantile merges its buckets' estimators by
+treating their markers as piecewise-linear CDFs, so nothing grows with
+the number of samples and old samples fall out a bucket at a time.
+
+    rates = RateStats()
+    rates.add(5.1e6, now)
+    s = rates.summary(now)
+    s.ewma, s.windows[0].p95
+"""
+import math
+import threading
+import time
+from bisect import bisect_right, insort
+from typing import List, NamedTuple, Optional, Tuple
+
+# (name, window seconds, buckets)
+WINDOWS = (("1m", 60.0, 12), ("15m", 900.0, 15), ("1h", 3600.0, 12))
+EWMA_TAU = 30.0  # seconds; a sample's weight falls to 1/e after this long
+
+
+class P2Quantile:
+    """
+    P² estimate of the `p` quantile: five marker heights and positions,
+    adjusted with a parabolic formula as samples arrive.
+    """
+    __slots__ = ("p", "n", "q", "pos", "want", "step")
+
+    def __init__(self, p: float):
+        self.p = p
+        self.n = 0
+        self.q: List[float] = []  # sorted samples until there are 5, then marker heights
+        self.pos = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.want = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self.step = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def add(self, x: float):
+        self.n += 1
+        q = self.q
+        if self.n <= 5:
+            insort(q, x)
+            return
+        pos = self.pos
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect_right(q, x, 1, 4) - 1
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        want, step = self.want, self.step
+        for i in range(5):
+            want[i] += step[i]
+
+        for i in (1, 2, 3):
+            d = want[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                d = 1.0 if d > 0 else -1.0
+                qp = q[i] + d / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + d) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - d) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    j = i + int(d)
+                    qp = q[i] + d * (q[j] - q[i]) / (pos[j] - pos[i])
+                q[i] = qp
+                pos[i] += d
+
+    def points(self) -> List[Tuple[float, float]]:
+        """
+        (value, samples <= value) at the markers; exact() tells whether
+        these are the samples themselves (fewer than six seen).
+        """
+        if self.exact():
+            return [(v, i + 1.0) for i, v in enumerate(self.q)]
+        return list(zip(self.q, self.pos))
+
+    def exact(self) -> bool:
+        return self.n <= 5
+
+    def value(self) -> float:
+        return merged_quantile([self], self.p)
+
+
+def _cdf(sketch: P2Quantile, points: List[Tuple[float, float]], x: float) -> float:
+    if sketch.exact():
+        return float(bisect_right(sketch.q, x))
+    if x < points[0][0]:
+        return 0.0
+    for (v0, c0), (v1, c1) in zip(points, points[1:]):
+        if x < v1:
+            return c0 + (c1 - c0) * (x - v0) / (v1 - v0) if v1 > v0 else c0
+    return points[-1][1]
+
+
+def merged_quantile(sketches, p: float) -> float:
+    """
+    The `p` quantile of the union of several sketches' samples. While every
+    sketch still holds its samples the answer is exact (interpolated like
+    numpy.percentile); otherwise exact samples count as steps, P² markers
+    as a piecewise-linear CDF, and the answer interpolates between the two
+    candidate values around the rank.
+    """
+    curves = [(s, s.points()) for s in sketches if s.n]
+    if not curves:
+        return 0.0
+    if all(s.exact() for s, _ in curves):
+        values = sorted(v for s, _ in curves for v in s.q)
+        h = p * (len(values) - 1)
+        i = int(h)
+        if i + 1 >= len(values):
+            return values[-1]
+        return values[i] + (h - i) * (values[i + 1] - values[i])
+    total = sum(c[-1][1] for _, c in curves)
+    rank = 1 + p * (total - 1)
+    prev_v = prev_t = None
+    for v in sorted({v for _, c in curves for v, _ in c}):
+        t = sum(_cdf(s, c, v) for s, c in curves)
+        if t >= rank:
+            if prev_v is None or t == prev_t:
+                return v
+            return prev_v + (rank - prev_t) / (t - prev_t) * (v - prev_v)
+        prev_v, prev_t = v, t
+    return prev_v
+
+
+class _Bucket:
+    __slots__ = ("epoch", "count", "total", "low", "high", "p50", "p95")
+
+    def __init__(self, epoch: int):
+        self.epoch = epoch
+        self.count = 0
+        self.total = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+        self.p50 = P2Quantile(0.5)
+        self.p95 = P2Quantile(0.95)
+
+    def add(self, x: float):
+        self.count += 1
+        self.total += x
+        if x < self.low:
+            self.low = x
+        if x > self.high:
+            self.high = x
+        self.p50.add(x)
+        self.p95.add(x)
+
+
+class WindowStats(NamedTuple):
+    name: str
+    seconds: float
+    count: int
+    mean: float
+    low: float
+    high: float
+    p50: float
+    p95: float
+
+
+class RollingWindow:
+    """
+    The last `seconds` of samples as `buckets` equal spans; the oldest
+    span is dropped whole, so the window covers between
+    seconds - seconds/buckets and seconds.
+    """
+
+    def __init__(self, name: str, seconds: float, buckets: int):
+        self.name = name
+        self.seconds = seconds
+        self.span = seconds / buckets
+        self.ring: List[Optional[_Bucket]] = [None] * buckets
+
+    def add(self, x: float, now: float):
+        epoch = int(now // self.span)
+        i = epoch % len(self.ring)
+        b = self.ring[i]
+        if b is None or b.epoch != epoch:
+            b = self.ring[i] = _Bucket(epoch)
+        b.add(x)
+
+    def stats(self, now: float) -> WindowStats:
+        oldest = int(now // self.span) - len(self.ring) + 1
+        live = [b for b in self.ring if b is not None and b.epoch >= oldest and b.count]
+        count = sum(b.count for b in live)
+        if not count:
+            return WindowStats(self.name, self.seconds, 0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        return WindowStats(
+            self.name, self.seconds, count,
+            mean=sum(b.total for b in live) / count,
+            low=min(b.low for b in live),
+            high=max(b.high for b in live),
+            p50=merged_quantile([b.p50 for b in live], 0.5),
+            p95=merged_quantile([b.p95 for b in live], 0.95),
+        )
+
+
+class RateSummary(NamedTuple):
+    ewma: float
+    samples: int  # since the last reset
+    windows: Tuple[WindowStats, ...]
+
+    def window(self, name: str) -> Optional[WindowStats]:
+        return next((w for w in self.windows if w.name == name), None)
+
+
+class RateStats:
+    """
+    Thread-safe: the parser / API poller add(), the UI reads summary().
+    Non-positive rates (miner stopped or not reporting yet) are ignored.
+    """
+
+    def __init__(self, tau: float = EWMA_TAU, windows=WINDOWS):
+        self.tau = tau
+        self._spec = windows
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._ewma = 0.0
+            self._last = None
+            self._samples = 0
+            self._windows = [RollingWindow(*w) for w in self._spec]
+
+    def add(self, rate: float, now: Optional[float] = None):
+        if rate <= 0:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._last is None:
+                self._ewma = rate
+            else:
+                a = 1.0 - math.exp(-max(0.0, now - self._last) / self.tau)
+                self._ewma += a * (rate - self._ewma)
+            self._last = now
+            self._samples += 1
+            for w in self._windows:
+                w.add(rate, now)
+
+    def summary(self, now: Optional[float] = None) -> RateSummary:
+        now = time.time() if now is None else now
+        with self._lock:
+            return RateSummary(self._ewma, self._samples,
+                               tuple(w.stats(now) for w in self._windows))
+
+
+def rate_unit(hps: float) -> Tuple[str, float]:
+    """
+    The unit to show `hps` in: 5131356.49 -> ("MH/s", 1e6).
+    """
+    for unit, scale in (("TH/s", 1e12), ("GH/s", 1e9), ("MH/s", 1e6), ("kH/s", 1e3)):
+        if hps >= scale:
+            return unit, scale
+    return "H/s", 1.0
+
+
+def format_rate(hps: float) -> str:
+    """
+    5131356.49 -> "5.13 MH/s".
+    """
+    unit, scale = rate_unit(hps)
+    return f"{hps / scale:.2f} {unit}"
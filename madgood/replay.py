@@ -0,0 +1,438 @@
+"""
+Log-replay benchmark for the cpuminer output pipeline.
+
+Replays a cpuminer-opt log through the same path a live miner takes -
+pipe -> iter_pipe_lines() -> process_miner_output() -> MinerStats /
+EventBus - while a consumer thread plays the Tk side: it drains the bus
+every UI frame and re-renders when something changed, like
+MadGoodMinerApp.pump_events() / refresh_ui().
+
+Logs come from built-in scenarios modelled on cpuminer-opt 25.6 output or
+from captured log files. Lines are written in timestamp bursts at
+`speed` times real time (0 = as fast as the pipe takes them).
+
+    python3 -m madgood --replay all --replay-speed 50 --replay-out before.json
+    python3 -m madgood --replay steady my-capture.log --replay-compare before.json
+"""
+import json
+import os
+import platform
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import APP_VERSION
+from .events import BUS_CONNECTION, EventBus
+from .logstore import LogStore
+from .miner import process_miner_output
+from .parsing import classify_line
+from .stats import MinerStats
+
+Timed = Tuple[float, str]  # (seconds from start of log, line)
+
+_START = datetime(2026, 1, 1, 12, 0, 0).timestamp()
+_TS_RE = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\]")
+
+
+def _ts(t: float) -> str:
+    return time.strftime("[%Y-%m-%d %H:%M:%S]", time.localtime(_START + t))
+
+
+# ---------------- SCENARIOS ----------------
+
+def _job(n: int) -> str:
+    return f"69a1b2c3{n:06x}"
+
+
+def scenario_startup(threads: int = 16) -> Iterator[Timed]:
+    """
+    Banner, CPU probing, threads starting, first connect and job.
+    """
+    yield 0.0, "         **********  cpuminer-opt 25.6  ***********"
+    yield 0.0, "     A CPU miner with multi algo support and optimized hash functions"
+    yield 0.0, "CPU: AMD Ryzen 9 7950X 16-Core Processor"
+    yield 0.0, "SW built on Jan 10 2026 with GCC 13.3.0"
+    yield 0.0, "CPU features: AVX2 AVX512 SHA256 VAES"
+    yield 0.0, "SW  features: AVX2 AVX512 SHA256 VAES"
+    yield 0.0, "Algo features: AVX2 AVX512 SHA256"
+    yield 0.0, f"{_ts(0)} Starting Stratum on stratum+tcp://solo.ckpool.org:3333"
+    for i in range(threads):
+        yield 0.01 * i, f"{_ts(0)} CPU #{i} bound to CPU {i}"
+    yield 0.2, f"{_ts(0)} {threads} of {threads} miner threads started using 'sha256d' algorithm"
+    yield 0.4, f"{_ts(0)} Stratum connection established"
+    yield 0.4, f"{_ts(0)} Stratum extranonce1 0x1a2b3c4d, extranonce2 size 8"
+    yield 0.5, f"{_ts(0)} New Stratum Diff 10000, Block 930001, Tx 3120, Job {_job(1)}"
+    yield 0.5, f"{_ts(0)} Miner TTF @ 80.00 Mh/s 8.2y, Net TTF @ 900.00 Eh/s 10.0m"
+    for k in range(1, 4):
+        t = 5.0 * k
+        yield t, f"{_ts(t)} Total: {80000 + k * 150:.2f} kH/s, Temp: 62C, Freq: 4.95/5.10 GHz"
+
+
+def scenario_steady(minutes: int = 240, threads: int = 16, seed: int = 1) -> Iterator[Timed]:
+    """
+    Steady mining: hashrate every 5 s, a job about every 30 s, a new block
+    about every 10 min, occasional shares and a periodic report every 5 min.
+    """
+    rnd = random.Random(seed)
+    job = 1
+    height = 930001
+    yield 0.0, f"{_ts(0)} New Stratum Diff 10000, Block {height}, Tx 3120, Job {_job(job)}"
+    t = 0.0
+    end = minutes * 60.0
+    next_job = rnd.uniform(20, 40)
+    next_block = rnd.uniform(300, 900)
+    next_report = 300.0
+    while t < end:
+        t += 5.0
+        rate = 80000 + rnd.uniform(-800, 800)
+        yield t, f"{_ts(t)} Total: {rate:.2f} kH/s, Temp: {rnd.randint(60, 70)}C, Freq: 4.95/5.10 GHz"
+        if t >= next_job:
+            job += 1
+            next_job = t + rnd.uniform(20, 40)
+            yield t, f"{_ts(t)} New Stratum Diff 10000, Block {height}, Tx {rnd.randint(2000, 4000)}, Job {_job(job)}"
+        if t >= next_block:
+            job += 1
+            height += 1
+            next_block = t + rnd.uniform(300, 900)
+            yield t, (f"{_ts(t)} New Block {height}, Tx {rnd.randint(2000, 4000)}, "
+                      f"Net Diff 1.3e+14, Job {_job(job)}")
+        if rnd.random() < 0.01:
+            yield t, f"{_ts(t)} 1 Submitted Diff 12034.5, Block {height}, Job {_job(job)}"
+            yield t + 0.2, f"{_ts(t)} 1 Accepted 1 S0 R0 B0, 0.210 sec (35ms)"
+        if t >= next_report:
+            next_report += 300.0
+            yield t, f"{_ts(t)} Periodic Report     5m00s    {int(t // 60)}m00s"
+            yield t, f"Hash rate         {rate / 1000:.2f}Mh/s     {rate / 1000:.2f}Mh/s   ({rate / 1000:.2f}Mh/s)"
+            yield t, "Accepted              1            1    100.0%"
+
+
+def scenario_reconnect_storm(cycles: int = 1000, seed: int = 2) -> Iterator[Timed]:
+    """
+    A flapping pool: interrupt, reconnect, fresh extranonce and job, every
+    second or so, with hashrate lines still arriving in between.
+    """
+    rnd = random.Random(seed)
+    t = 0.0
+    job = 100
+    for i in range(cycles):
+        t += rnd.uniform(0.2, 1.5)
+        yield t, f"{_ts(t)} Stratum connection interrupted"
+        yield t, f"{_ts(t)} Starting Stratum on stratum+tcp://solo.ckpool.org:3333"
+        t += rnd.uniform(0.05, 0.5)
+        yield t, f"{_ts(t)} Stratum connection established"
+        yield t, f"{_ts(t)} Stratum extranonce1 0x{rnd.getrandbits(32):08x}, extranonce2 size 8"
+        job += 1
+        yield t, f"{_ts(t)} New Stratum Diff 10000, Block 930001, Tx 3120, Job {_job(job)}"
+        if i % 3 == 0:
+            yield t, f"{_ts(t)} Total: {80000 + rnd.uniform(-5000, 500):.2f} kH/s, Temp: 64C, Freq: 4.95/5.10 GHz"
+
+
+def scenario_debug(minutes: int = 10, threads: int = 16, seed: int = 3) -> Iterator[Timed]:
+    """
+    `-D -P` verbosity: per-thread hashrate, raw Stratum traffic and
+    diagnostics between the normal lines - mostly text the classifier must
+    reject cheaply.
+    """
+    rnd = random.Random(seed)
+    job = 1
+    t = 0.0
+    while t < minutes * 60.0:
+        t += 1.0
+        for i in range(threads):
+            yield t, f"{_ts(t)} CPU #{i}: {5000 + rnd.uniform(-100, 100):.2f} kH/s"
+        yield t, f"{_ts(t)} DEBUG: hash_count {rnd.getrandbits(40)}, nonce 0x{rnd.getrandbits(32):08x}"
+        yield t, "< {\"id\":null,\"method\":\"mining.ping\",\"params\":[]}"
+        if t % 5 == 0:
+            yield t, f"{_ts(t)} Total: {80000 + rnd.uniform(-800, 800):.2f} kH/s, Temp: 65C, Freq: 4.95/5.10 GHz"
+        if t % 30 == 0:
+            job += 1
+            yield t, ("< {\"params\": [\"" + _job(job) + "\", \"ab01...\", \"01000000...\", "
+                      "[], \"20000000\", \"1703a30c\", \"6751c2a0\", false], "
+                      "\"id\": null, \"method\": \"mining.notify\"}")
+            yield t, f"{_ts(t)} New Stratum Diff 10000, Block 930001, Tx 3120, Job {_job(job)}"
+
+
+SCENARIOS: Dict[str, Callable[[], Iterator[Timed]]] = {
+    "startup": scenario_startup,
+    "steady": scenario_steady,
+    "reconnect": scenario_reconnect_storm,
+    "debug": scenario_debug,
+}
+
+
+def load_capture(path: str) -> List[Timed]:
+    """
+    A captured cpuminer log. Lines starting with "[YYYY-MM-DD HH:MM:SS]"
+    set the clock; the others (report rows, banners) share the last one.
+    """
+    out: List[Timed] = []
+    first = None
+    t = 0.0
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            line = raw.rstrip("\r\n")
+            if not line.strip():
+                continue
+            m = _TS_RE.match(line)
+            if m:
+                stamp = time.mktime(time.strptime(m.group(1), "%Y-%m-%d %H:%M:%S"))
+                first = stamp if first is None else first
+                t = max(t, stamp - first)
+            out.append((t, line))
+    return out
+
+
+def load_log(name: str) -> List[Timed]:
+    if name in SCENARIOS:
+        return list(SCENARIOS[name]())
+    return load_capture(name)
+
+
+# ---------------- REPLAY ----------------
+
+class _ReplayProc:
+    """
+    Just enough of subprocess.Popen for process_miner_output().
+    """
+
+    def __init__(self):
+        r, w = os.pipe()
+        self.stdout = os.fdopen(r, "rb")
+        self.stdin = os.fdopen(w, "wb", buffering=0)
+        self.terminated = threading.Event()
+
+    def terminate(self):
+        self.terminated.set()
+
+    def poll(self):
+        return 0 if self.terminated.is_set() else None
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    n = len(values)
+    return {
+        "count": n,
+        "mean": sum(values) / n,
+        "p50": values[n // 2],
+        "p95": values[min(n - 1, int(n * 0.95))],
+        "max": values[-1],
+    }
+
+
+def _classify_cost(lines: List[str], rounds: int = 5) -> Dict[str, float]:
+    """
+    Mean classify_line() cost per line, in microseconds, by event kind.
+    """
+    by_kind = defaultdict(list)
+    for line in lines:
+        ev = classify_line(line)
+        by_kind[ev.kind if ev else "none"].append(line)
+    cost = {}
+    for kind, group in by_kind.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for line in group:
+                classify_line(line)
+        cost[kind] = (time.perf_counter() - start) / (rounds * len(group)) * 1e6
+    return cost
+
+
+def _render(snap, now: float) -> Tuple[str, ...]:
+    # The string work refresh_ui() does every frame, minus the Tk calls.
+    return (
+        f"{snap.hashrate:,.2f} H/s",
+        f"{int(snap.hashes_at(now)):,}",
+        str(snap.block_height),
+        f"{int(snap.uptime_at(now))}s",
+        snap.current_job_id or "-",
+        str(snap.block_attempts),
+        f"{snap.shares_accepted} / {snap.shares_rejected}",
+    )
+
+
+def replay(log: List[Timed], speed: float = 0.0, frame_ms: float = 100.0) -> Dict:
+    """
+    Push `log` through the pipeline and return measurements.
+    """
+    lines = [line for _, line in log]
+    stats = MinerStats()
+    bus = EventBus()
+    proc = _ReplayProc()
+
+    received: List[Tuple[int, float]] = []  # (lines so far, time)
+    store_extend = LogStore.extend
+
+    class _TimedStore(LogStore):
+        def extend(self, batch, events=None):
+            store_extend(self, batch, events)
+            received.append((len(batch) + (received[-1][0] if received else 0),
+                             time.perf_counter()))
+
+    store = _TimedStore(maxlen=200)
+
+    events = Counter()
+    ui = {"frames": 0, "refreshes": 0, "periodic_refreshes": 0}
+    depth: List[int] = []
+    refresh_cost: List[float] = []
+    dirty = [False]
+
+    def on_events(batch):
+        for ev in batch:
+            events[ev.kind] += 1
+        dirty[0] = True
+
+    bus.subscribe(on_events)
+    done = threading.Event()
+
+    def refresh():
+        start = time.perf_counter()
+        _render(stats.snapshot(), time.time())
+        refresh_cost.append((time.perf_counter() - start) * 1e6)
+        ui["refreshes"] += 1
+
+    def consumer():
+        next_periodic = time.perf_counter() + 1.0
+        while True:
+            finished = done.is_set()
+            depth.append(bus.pending())
+            bus.dispatch()
+            ui["frames"] += 1
+            if dirty[0]:
+                dirty[0] = False
+                refresh()
+            now = time.perf_counter()
+            if now >= next_periodic:
+                ui["periodic_refreshes"] += 1
+                refresh()
+                next_periodic = now + 1.0
+            if finished:
+                break
+            time.sleep(frame_ms / 1000.0)
+
+    written: List[Tuple[int, float]] = []  # (lines so far, time)
+
+    def writer():
+        start = time.perf_counter()
+        i = 0
+        try:
+            while i < len(log) and not proc.terminated.is_set():
+                t0 = log[i][0]
+                j = i
+                while j < len(log) and log[j][0] == t0:
+                    j += 1
+                if speed > 0:
+                    delay = start + t0 / speed - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                chunk = "".join(line + "\n" for _, line in log[i:j]).encode()
+                written.append((j, time.perf_counter()))
+                proc.stdin.write(chunk)
+                i = j
+        except BrokenPipeError:
+            pass
+        finally:
+            proc.stdin.close()
+
+    stats.start()
+    ui_thread = threading.Thread(target=consumer, daemon=True)
+    ui_thread.start()
+    w = threading.Thread(target=writer, daemon=True)
+    start = time.perf_counter()
+    w.start()
+    process_miner_output(proc, stats, bus, store)
+    elapsed = time.perf_counter() - start
+    proc.stdout.close()
+    w.join()
+    done.set()
+    ui_thread.join()
+    stats.stop()
+
+    # Per-line latency: written -> handed to the parser, by event kind.
+    latency = defaultdict(list)
+    wi = ri = 0
+    for n, line in enumerate(lines[:received[-1][0] if received else 0]):
+        while written[wi][0] <= n:
+            wi += 1
+        while received[ri][0] <= n:
+            ri += 1
+        ev = classify_line(line)
+        latency[ev.kind if ev else "none"].append(
+            max(0.0, received[ri][1] - written[wi][1]) * 1e3
+        )
+
+    snap = stats.snapshot()
+    return {
+        "lines": len(lines),
+        "lines_processed": received[-1][0] if received else 0,
+        "log_seconds": log[-1][0] if log else 0.0,
+        "elapsed_seconds": elapsed,
+        "lines_per_sec": (received[-1][0] if received else 0) / elapsed if elapsed else 0.0,
+        "read_batches": len(received),
+        "classify_us": _classify_cost(lines),
+        "latency_ms": {kind: _percentiles(v) for kind, v in latency.items()},
+        "bus_events": dict(events),
+        "connection_changes": events.get(BUS_CONNECTION, 0),
+        "ui": dict(ui, refresh_us=_percentiles(refresh_cost)),
+        "queue_depth": _percentiles([float(d) for d in depth]),
+        "final": {
+            "jobs": snap.block_attempts,
+            "shares": [snap.shares_accepted, snap.shares_rejected],
+            "block_height": snap.block_height,
+        },
+    }
+
+
+# ---------------- SUITE ----------------
+
+def run_suite(names: List[str], speed: float = 0.0, frame_ms: float = 100.0,
+              progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    if names == ["all"]:
+        names = list(SCENARIOS)
+    results = {}
+    for name in names:
+        result = replay(load_log(name), speed, frame_ms)
+        results[name] = result
+        if progress:
+            progress(name, result)
+    return {
+        "version": APP_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": time.time(),
+        "speed": speed,
+        "frame_ms": frame_ms,
+        "results": results,
+    }
+
+
+def save(report: Dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+
+
+def compare(old: Dict, new: Dict) -> List[str]:
+    """
+    One line per scenario present in both reports: throughput and tail
+    latency of the new run relative to the old one.
+    """
+    rows = []
+    if old.get("speed") != new.get("speed"):
+        rows.append(f"note: replay speed differs ({old.get('speed')} vs {new.get('speed')})")
+    for name, n in new["results"].items():
+        o = old.get("results", {}).get(name)
+        if o is None:
+            continue
+        ratio = n["lines_per_sec"] / o["lines_per_sec"] if o["lines_per_sec"] else 0.0
+        rows.append(
+            f"{name:<10} lines/sec {o['lines_per_sec']:>12,.0f} -> {n['lines_per_sec']:>12,.0f} "
+            f"({ratio:.2f}x)  queue p95 {o['queue_depth'].get('p95', 0):g} -> "
+            f"{n['queue_depth'].get('p95', 0):g}"
+        )
+    return rows
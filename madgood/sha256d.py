@@ -0,0 +1,278 @@
+"""
+In-process sha256d nonce scanner.
+
+The first 64 bytes of an 80-byte block header never change while the nonce
+is scanned, so their SHA-256 compression (the "midstate") is computed once
+per job. Each nonce then costs one compression for the header tail plus one
+for the second SHA-256.
+
+Two engines:
+  - "numpy":   evaluates a whole batch of nonces per call as uint32 arrays
+  - "hashlib": copies a hashlib object primed with the first 64 bytes
+NumPy is optional; get_engine("auto") measures both and falls back to
+hashlib without it.
+"""
+import hashlib
+import struct
+import time
+from typing import List, NamedTuple, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+# Share target at pool difficulty 1 (bdiff).
+DIFF1_TARGET = 0x00000000FFFF0000000000000000000000000000000000000000000000000000
+
+_IV = (
+    0x6A09E667, 0xBB67AE85, 0x3C6EF372, 0xA54FF53A,
+    0x510E527F, 0x9B05688C, 0x1F83D9AB, 0x5BE0CD19,
+)
+
+_K = (
+    0x428A2F98, 0x71374491, 0xB5C0FBCF, 0xE9B5DBA5, 0x3956C25B, 0x59F111F1,
+    0x923F82A4, 0xAB1C5ED5, 0xD807AA98, 0x12835B01, 0x243185BE, 0x550C7DC3,
+    0x72BE5D74, 0x80DEB1FE, 0x9BDC06A7, 0xC19BF174, 0xE49B69C1, 0xEFBE4786,
+    0x0FC19DC6, 0x240CA1CC, 0x2DE92C6F, 0x4A7484AA, 0x5CB0A9DC, 0x76F988DA,
+    0x983E5152, 0xA831C66D, 0xB00327C8, 0xBF597FC7, 0xC6E00BF3, 0xD5A79147,
+    0x06CA6351, 0x14292967, 0x27B70A85, 0x2E1B2138, 0x4D2C6DFC, 0x53380D13,
+    0x650A7354, 0x766A0ABB, 0x81C2C92E, 0x92722C85, 0xA2BFE8A1, 0xA81A664B,
+    0xC24B8B70, 0xC76C51A3, 0xD192E819, 0xD6990624, 0xF40E3585, 0x106AA070,
+    0x19A4C116, 0x1E376C08, 0x2748774C, 0x34B0BCB5, 0x391C0CB3, 0x4ED8AA4A,
+    0x5B9CCA4F, 0x682E6FF3, 0x748F82EE, 0x78A5636F, 0x84C87814, 0x8CC70208,
+    0x90BEFFFA, 0xA4506CEB, 0xBEF9A3F7, 0xC67178F2,
+)
+
+_M32 = 0xFFFFFFFF
+
+
+class ScanResult(NamedTuple):
+    nonce: int
+    hash: bytes  # sha256d digest as bytes (little-endian number)
+
+
+# ---------------- TARGETS ----------------
+
+def target_from_difficulty(difficulty: float) -> int:
+    if difficulty <= 0:
+        return (1 << 256) - 1
+    return min((1 << 256) - 1, int(DIFF1_TARGET / difficulty))
+
+
+def target_from_nbits(nbits: int) -> int:
+    exponent = nbits >> 24
+    mantissa = nbits & 0x007FFFFF
+    if exponent <= 3:
+        return mantissa >> (8 * (3 - exponent))
+    return mantissa << (8 * (exponent - 3))
+
+
+def hash_meets_target(digest: bytes, target: int) -> bool:
+    return int.from_bytes(digest, "little") <= target
+
+
+def sha256d(data: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+# ---------------- MIDSTATE ----------------
+
+def _rotr(x: int, n: int) -> int:
+    return ((x >> n) | (x << (32 - n))) & _M32
+
+
+def _compress(state, words, rounds: int = 64):
+    """
+    Plain-Python SHA-256 compression. With rounds < 64 it returns the
+    working variables after that many rounds (no feed-forward).
+    """
+    w = list(words)
+    for i in range(16, 64):
+        s0 = _rotr(w[i - 15], 7) ^ _rotr(w[i - 15], 18) ^ (w[i - 15] >> 3)
+        s1 = _rotr(w[i - 2], 17) ^ _rotr(w[i - 2], 19) ^ (w[i - 2] >> 10)
+        w.append((w[i - 16] + s0 + w[i - 7] + s1) & _M32)
+
+    a, b, c, d, e, f, g, h = state
+    for i in range(rounds):
+        s1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+        ch = (e & f) ^ (~e & g)
+        t1 = (h + s1 + ch + _K[i] + w[i]) & _M32
+        s0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        h, g, f, e = g, f, e, (d + t1) & _M32
+        d, c, b, a = c, b, a, (t1 + s0 + maj) & _M32
+    if rounds < 64:
+        return (a, b, c, d, e, f, g, h)
+    return tuple((x + y) & _M32 for x, y in zip(state, (a, b, c, d, e, f, g, h)))
+
+
+def midstate(header: bytes):
+    """
+    SHA-256 state after the first 64 bytes of an 80-byte header.
+    """
+    return _compress(_IV, struct.unpack(">16I", header[:64]))
+
+
+# ---------------- HASHLIB ENGINE ----------------
+
+def scan_hashlib(header: bytes, start: int, count: int, target: int) -> List[ScanResult]:
+    """
+    Try nonces [start, start + count) and return every one that meets target.
+    """
+    prefix = hashlib.sha256(header[:64])
+    tail = header[64:76]
+    sha256 = hashlib.sha256
+    pack = struct.Struct("<I").pack
+    found = []
+    for nonce in range(start, min(start + count, 1 << 32)):
+        h = prefix.copy()
+        h.update(tail + pack(nonce))
+        digest = sha256(h.digest()).digest()
+        # Top 32 bits of the little-endian number live in the last 4 bytes.
+        if digest[28:32] == b"\0\0\0\0" or target >> 224:
+            if int.from_bytes(digest, "little") <= target:
+                found.append(ScanResult(nonce, digest))
+    return found
+
+
+# ---------------- NUMPY ENGINE ----------------
+
+if np is not None:
+    _K_NP = np.array(_K, dtype=np.uint32)
+    _IV_NP = tuple(np.uint32(x) for x in _IV)
+
+    def _rotr_np(x, n):
+        return (x >> np.uint32(n)) | (x << np.uint32(32 - n))
+
+    def _compress_np(state, w, first_round: int = 0, init=None, h7_only=False):
+        """
+        Vectorized compression over arrays (or scalars) of message words.
+        `init` are the working variables after `first_round` rounds. With
+        h7_only, stop after round 60 and return just the last state word,
+        which is all the target pre-check needs.
+        """
+        last = 61 if h7_only else 64
+        w = list(w)
+        for i in range(16, last):
+            x, y = w[i - 15], w[i - 2]
+            s0 = _rotr_np(x, 7) ^ _rotr_np(x, 18) ^ (x >> np.uint32(3))
+            s1 = _rotr_np(y, 17) ^ _rotr_np(y, 19) ^ (y >> np.uint32(10))
+            w.append(w[i - 16] + s0 + w[i - 7] + s1)
+
+        a, b, c, d, e, f, g, h = init if init is not None else state
+        for i in range(first_round, last):
+            s1 = _rotr_np(e, 6) ^ _rotr_np(e, 11) ^ _rotr_np(e, 25)
+            ch = g ^ (e & (f ^ g))
+            t1 = h + s1 + ch + (_K_NP[i] + w[i])
+            if h7_only and i == last - 1:
+                # e of round 60 ends up as h after round 63
+                return state[7] + d + t1
+            s0 = _rotr_np(a, 2) ^ _rotr_np(a, 13) ^ _rotr_np(a, 22)
+            maj = (a & b) | (c & (a | b))
+            h, g, f, e = g, f, e, d + t1
+            d, c, b, a = c, b, a, t1 + s0 + maj
+        return [s + v for s, v in zip(state, (a, b, c, d, e, f, g, h))]
+
+
+def scan_numpy(header: bytes, start: int, count: int, target: int,
+               batch: int = 1 << 14) -> List[ScanResult]:
+    """
+    Batched version of scan_hashlib(). Candidates are filtered on the top
+    32 bits in NumPy and confirmed with hashlib. The default batch keeps
+    the working arrays inside L2 cache, which matters more than batch size.
+    """
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+
+    mid = midstate(header)
+    w0, w1, w2 = struct.unpack(">3I", header[64:76])
+    # Rounds 0-2 only see the constant words, so they are done once per job.
+    pre = _compress(mid, (w0, w1, w2, 0) + (0,) * 12, rounds=3)
+    mid_np = tuple(np.uint32(x) for x in mid)
+    pre_np = tuple(np.uint32(x) for x in pre)
+    const = [np.uint32(x) for x in (w0, w1, w2)]
+    pad1 = [np.uint32(0x80000000)] + [np.uint32(0)] * 10 + [np.uint32(640)]
+    pad2 = [np.uint32(0x80000000)] + [np.uint32(0)] * 6 + [np.uint32(256)]
+    top_target = target >> 224
+
+    found = []
+    end = min(start + count, 1 << 32)
+    pos = start
+    with np.errstate(over="ignore"):
+        while pos < end:
+            n = min(batch, end - pos)
+            nonces = np.arange(pos, pos + n, dtype=np.uint32)
+            w3 = nonces.byteswap()  # nonce is stored little-endian
+            first = _compress_np(mid_np, const + [w3] + pad1, first_round=3, init=pre_np)
+            h7 = _compress_np(_IV_NP, first + pad2, h7_only=True)
+            # Last digest word, byte-swapped, is the top of the LE number.
+            top = h7.byteswap()
+            for idx in np.nonzero(top <= np.uint32(top_target))[0]:
+                nonce = int(nonces[idx])
+                digest = sha256d(header[:76] + struct.pack("<I", nonce))
+                if int.from_bytes(digest, "little") <= target:
+                    found.append(ScanResult(nonce, digest))
+            pos += n
+    return found
+
+
+# ---------------- ENGINE SELECTION ----------------
+
+ENGINES = ("numpy", "hashlib")
+
+_auto_engine = None
+
+
+def pick_engine() -> str:
+    """
+    Name of the faster engine on this machine. With OpenSSL's SHA extensions
+    the hashlib loop can keep up with NumPy, so measure instead of guessing.
+    Cached for the life of the process.
+    """
+    global _auto_engine
+    if _auto_engine is None:
+        if np is None:
+            _auto_engine = "hashlib"
+        else:
+            rates = {name: benchmark(name, seconds=0.2) for name in ENGINES}
+            _auto_engine = max(rates, key=rates.get)
+    return _auto_engine
+
+
+def get_engine(name: str = "auto"):
+    """
+    Return a scan function (header, start, count, target) -> [ScanResult].
+    """
+    if name == "auto":
+        name = pick_engine()
+    if name == "numpy":
+        if np is None:
+            raise RuntimeError("numpy engine requested but numpy is not installed")
+        return scan_numpy
+    if name == "hashlib":
+        return scan_hashlib
+    raise ValueError(f"unknown engine: {name!r}")
+
+
+def benchmark(engine: str = "auto", seconds: float = 5.0,
+              chunk: Optional[int] = None) -> float:
+    """
+    Scan a dummy header on this core for about `seconds`; return H/s.
+    """
+    scan = get_engine(engine)
+    if chunk is None:
+        chunk = 1 << 16 if scan is scan_numpy else 1 << 14
+    header = bytes(range(76)) + b"\0\0\0\0"
+    target = 0  # nothing qualifies; measure pure hashing
+    done = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        scan(header, done & 0xFFFFFFFF, chunk, target)
+        done += chunk
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+    return done / (now - start)
@@ -0,0 +1,103 @@
+"""
+Wall-clock timings of the app's startup phases.
+
+The GUI records every phase of its cold start here whether or not anyone
+asks; `python3 madgood_minerx.py --profile-startup` prints them once the
+window is interactive (and the lazily built parts have been forced once)
+and exits:
+
+    python3 madgood_minerx.py --profile-startup --profile-out before.json
+    python3 madgood_minerx.py --profile-startup --profile-compare before.json
+"""
+import json
+import platform
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .config import APP_VERSION
+
+
+class StartupProfile:
+    """
+        profile = StartupProfile(t0)          # t0: perf_counter() at launch
+        with profile.phase("tk.Tk()"):
+            root = tk.Tk()
+        profile.mark("interactive")           # a milestone, no duration
+        print(profile.report())
+    """
+
+    def __init__(self, t0: Optional[float] = None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.phases: List[Dict] = []   # {"name", "start", "seconds", "deferred"}
+        self.marks: Dict[str, float] = {}
+        self.deferred = False  # phases from now on ran after the window was up
+
+    def add(self, name: str, start: float, seconds: float):
+        self.phases.append({"name": name, "start": start - self.t0,
+                            "seconds": seconds, "deferred": self.deferred})
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter() - start)
+
+    def mark(self, name: str):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.t0
+
+    def as_dict(self) -> Dict:
+        return {
+            "version": APP_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "phases": self.phases,
+            "marks": self.marks,
+        }
+
+    def report(self) -> str:
+        rows = []
+        for title, deferred in (("Until interactive", False), ("Deferred / first use", True)):
+            phases = [p for p in self.phases if p["deferred"] == deferred]
+            if not phases:
+                continue
+            rows.append(title)
+            for p in phases:
+                rows.append(f"  {p['name']:<34} {p['seconds'] * 1e3:9.1f} ms   @ {p['start'] * 1e3:8.1f} ms")
+        if self.marks:
+            rows.append("Milestones")
+            for name, at in sorted(self.marks.items(), key=lambda kv: kv[1]):
+                rows.append(f"  {name:<34} {at * 1e3:9.1f} ms")
+        return "\n".join(rows)
+
+
+def save(profile: StartupProfile, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile.as_dict(), f, indent=1, sort_keys=True)
+
+
+def load(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(old: Dict, new: Dict) -> List[str]:
+    """
+    One line per phase and milestone present in both runs.
+    """
+    rows = []
+    old_phases = {p["name"]: p["seconds"] for p in old.get("phases", [])}
+    for p in new.get("phases", []):
+        before = old_phases.get(p["name"])
+        if before is None:
+            continue
+        rows.append(f"{p['name']:<34} {before * 1e3:9.1f} -> {p['seconds'] * 1e3:9.1f} ms "
+                    f"({(p['seconds'] - before) * 1e3:+.1f})")
+    for name, at in new.get("marks", {}).items():
+        before = old.get("marks", {}).get(name)
+        if before is not None:
+            rows.append(f"{name:<34} {before * 1e3:9.1f} -> {at * 1e3:9.1f} ms")
+    return rows
@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from .ratestats import RateStats
+
+
+class StatsSnapshot(NamedTuple):
+    """
+    Immutable view of one miner's state at a point in time.
+
+    total_hashes holds hashes integrated up to rate_since; hashes_at()
+    extends that with the current rate, so readers never have to write.
+    """
+    mining: bool = False
+    connected: bool = False
+    hashrate: float = 0.0  # H/s
+    rate_since: float = 0.0
+    total_hashes: float = 0.0
+    mining_start_time: Optional[float] = None
+    ckpool_user_id: str = ""
+    current_job_id: str = ""
+    block_attempts: int = 0
+    blocks_found: int = 0
+    shares_accepted: int = 0
+    shares_rejected: int = 0
+    share_difficulty: float = 0.0
+    thread_hashrates: Tuple[float, ...] = ()  # H/s per cpuminer thread (API only)
+    block_height: int = 0
+    block_height_at: float = 0.0  # when the miner log last reported a height
+    btc_price_usd: float = 0.0
+    miner_starts: int = 0  # cpuminer launches this process; > 1 means restarts
+
+    def hashes_at(self, now: float) -> float:
+        if self.hashrate > 0 and now > self.rate_since:
+            return self.total_hashes + self.hashrate * (now - self.rate_since)
+        return self.total_hashes
+
+    def uptime_at(self, now: float) -> float:
+        if self.mining and self.mining_start_time is not None:
+            return max(0.0, now - self.mining_start_time)
+        return 0.0
+
+
+class MinerStats:
+    """
+    Holder for the current StatsSnapshot of one miner.
+
+    Writers serialize on a small lock, build a new snapshot and swap it in
+    with a single attribute store. Readers just call snapshot() and get a
+    consistent set of values without locking.
+
+    Every reported hashrate also goes into `rates` (EWMA, rolling windows,
+    quantiles), which is reset when mining starts.
+    """
+    __slots__ = ("_snap", "_lock", "rates")
+
+    def __init__(self):
+        self._snap = StatsSnapshot()
+        self._lock = threading.Lock()
+        self.rates = RateStats()
+
+    def snapshot(self) -> StatsSnapshot:
+        return self._snap
+
+    def update(self, **fields):
+        with self._lock:
+            self._snap = self._snap._replace(**fields)
+
+    def merge(self, fn: Callable[[StatsSnapshot], StatsSnapshot]):
+        """
+        Swap in fn(current snapshot) under the lock, for writes that depend
+        on the values they replace. `fn` must be quick and must not call
+        back into this object.
+        """
+        with self._lock:
+            self._snap = fn(self._snap)
+
+    def _rate_change(self, snap: StatsSnapshot, hashrate: float, now: float):
+        # Close the interval at the old rate before switching to the new one.
+        return snap._replace(
+            total_hashes=snap.hashes_at(now), hashrate=hashrate, rate_since=now
+        )
+
+    def set_hashrate(self, hashrate: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._snap = self._rate_change(self._snap, hashrate, now)
+        self.rates.add(hashrate, now)
+
+    def record_job(self, job_id: str):
+        with self._lock:
+            snap = self._snap
+            self._snap = snap._replace(
+                connected=True,
+                current_job_id=job_id,
+                block_attempts=snap.block_attempts + 1,
+            )
+
+    def record_share(self, accepted: bool):
+        with self._lock:
+            snap = self._snap
+            if accepted:
+                self._snap = snap._replace(shares_accepted=snap.shares_accepted + 1)
+            else:
+                self._snap = snap._replace(shares_rejected=snap.shares_rejected + 1)
+
+    def record_block_height(self, height: int, now: Optional[float] = None):
+        """
+        Height seen in the miner log; network polling backs off while these
+        keep arriving.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._snap = self._snap._replace(block_height=height, block_height_at=now)
+
+    def record_miner_start(self):
+        with self._lock:
+            self._snap = self._snap._replace(miner_starts=self._snap.miner_starts + 1)
+
+    def record_block_found(self):
+        with self._lock:
+            self._snap = self._snap._replace(blocks_found=self._snap.blocks_found + 1)
+
+    def start(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self.rates.reset()
+        with self._lock:
+            snap = self._rate_change(self._snap, 0.0, now)
+            self._snap = snap._replace(
+                mining=True, connected=False, mining_start_time=now, current_job_id=""
+            )
+
+    def stop(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            snap = self._rate_change(self._snap, 0.0, now)
+            self._snap = snap._replace(
+                mining=False, connected=False, mining_start_time=None
+            )
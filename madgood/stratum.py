@@ -0,0 +1,288 @@
+"""
+Minimal asyncio Stratum v1 client.
+
+Talks to the pool directly instead of scraping cpuminer's log, so jobs,
+difficulty changes and share results arrive as structured data stamped with
+the time they were received.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from .config import APP_VERSION, POOL_HOST, POOL_PORT
+
+log = logging.getLogger(__name__)
+
+
+class StratumError(Exception):
+    pass
+
+
+class StratumJob(NamedTuple):
+    job_id: str
+    prevhash: str
+    coinb1: str
+    coinb2: str
+    merkle_branch: Tuple[str, ...]
+    version: str
+    nbits: str
+    ntime: str
+    clean_jobs: bool
+    received_at: float  # time.time() when mining.notify was read
+    difficulty: float   # share difficulty in force when the job arrived
+
+    @classmethod
+    def from_params(cls, params, received_at: float, difficulty: float):
+        (job_id, prevhash, coinb1, coinb2, branch,
+         version, nbits, ntime, clean_jobs) = params[:9]
+        return cls(
+            job_id, prevhash, coinb1, coinb2, tuple(branch),
+            version, nbits, ntime, bool(clean_jobs), received_at, difficulty,
+        )
+
+
+class ShareResult(NamedTuple):
+    job_id: str
+    extranonce2: str
+    ntime: str
+    nonce: str
+    accepted: bool
+    error: Optional[str]
+    submitted_at: float  # time.time()
+    answered_at: float   # time.time()
+    latency: float       # seconds, from a monotonic clock
+
+
+class StratumClient:
+    """
+    One pool connection: subscribe, authorize, receive work, submit shares.
+
+    Callbacks (all optional) run on the event loop thread:
+      on_job(StratumJob), on_difficulty(float), on_share(ShareResult),
+      on_extranonce(extranonce1, extranonce2_size), on_disconnect(exc_or_None)
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str = "x",
+        host: str = POOL_HOST,
+        port: int = POOL_PORT,
+        user_agent: str = f"madgood/{APP_VERSION}",
+        request_timeout: float = 30.0,
+        on_job: Optional[Callable] = None,
+        on_difficulty: Optional[Callable] = None,
+        on_share: Optional[Callable] = None,
+        on_extranonce: Optional[Callable] = None,
+        on_disconnect: Optional[Callable] = None,
+    ):
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.user_agent = user_agent
+        self.request_timeout = request_timeout
+        self.on_job = on_job
+        self.on_difficulty = on_difficulty
+        self.on_share = on_share
+        self.on_extranonce = on_extranonce
+        self.on_disconnect = on_disconnect
+
+        self.extranonce1 = ""
+        self.extranonce2_size = 0
+        self.difficulty = 1.0
+        self.current_job: Optional[StratumJob] = None
+        self.authorized = False
+
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._next_id = 1
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._job_event = None
+
+    # ---------- Connection ----------
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        """
+        Open the socket, subscribe and authorize. Raises StratumError if the
+        pool refuses either step.
+        """
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port
+        )
+        self._job_event = asyncio.Event()
+        self._read_task = asyncio.ensure_future(self._read_loop())
+        await self.subscribe()
+        await self.authorize()
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        if self._read_task is not None:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._read_task = None
+        self._writer = None
+        self._fail_pending(StratumError("connection closed"))
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---------- Requests ----------
+
+    async def request(self, method: str, params):
+        if not self.connected:
+            raise StratumError("not connected")
+        msg_id = self._next_id
+        self._next_id += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = fut
+        line = json.dumps({"id": msg_id, "method": method, "params": params})
+        self._writer.write(line.encode() + b"\n")
+        await self._writer.drain()
+        try:
+            return await asyncio.wait_for(fut, self.request_timeout)
+        finally:
+            self._pending.pop(msg_id, None)
+
+    async def subscribe(self):
+        result, error = await self.request("mining.subscribe", [self.user_agent])
+        if error or not isinstance(result, list) or len(result) < 3:
+            raise StratumError(f"mining.subscribe failed: {error or result!r}")
+        self.extranonce1 = result[1]
+        self.extranonce2_size = int(result[2])
+        return self.extranonce1, self.extranonce2_size
+
+    async def authorize(self) -> bool:
+        result, error = await self.request(
+            "mining.authorize", [self.username, self.password]
+        )
+        if error or result is not True:
+            raise StratumError(f"mining.authorize failed: {error or result!r}")
+        self.authorized = True
+        return True
+
+    async def submit(self, job_id: str, extranonce2: str, ntime: str,
+                     nonce: str) -> ShareResult:
+        submitted_at = time.time()
+        start = time.perf_counter()
+        result, error = await self.request(
+            "mining.submit", [self.username, job_id, extranonce2, ntime, nonce]
+        )
+        share = ShareResult(
+            job_id, extranonce2, ntime, nonce,
+            accepted=result is True and not error,
+            error=_error_text(error),
+            submitted_at=submitted_at,
+            answered_at=time.time(),
+            latency=time.perf_counter() - start,
+        )
+        if self.on_share:
+            self.on_share(share)
+        return share
+
+    async def wait_for_job(self, known: Optional[StratumJob] = None,
+                           timeout: Optional[float] = None) -> StratumJob:
+        """
+        Return the current job once it differs from `known` (pass the last
+        job you saw, or None to get whatever the pool sent first).
+        """
+        async def _wait():
+            while self.current_job is None or self.current_job is known:
+                self._job_event.clear()
+                await self._job_event.wait()
+            return self.current_job
+
+        return await asyncio.wait_for(_wait(), timeout)
+
+    # ---------- Incoming ----------
+
+    async def _read_loop(self):
+        exc = None
+        try:
+            while True:
+                raw = await self._reader.readline()
+                if not raw:
+                    break
+                try:
+                    msg = json.loads(raw)
+                except ValueError:
+                    continue
+                if not isinstance(msg, dict):
+                    continue
+                # A malformed message or a failing callback costs that one
+                # message, not the session.
+                try:
+                    self._handle(msg)
+                except Exception:
+                    log.warning("Skipped Stratum message %.200r", raw, exc_info=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            exc = e
+        finally:
+            # Closing the writer makes `connected` False, so submit() fails
+            # fast and the owner's reconnect logic can run.
+            if self._writer is not None:
+                self._writer.close()
+            self._fail_pending(StratumError("connection lost"))
+            if self.on_disconnect:
+                self.on_disconnect(exc)
+
+    def _handle(self, msg: dict):
+        method = msg.get("method")
+        if method is None:
+            fut = self._pending.get(msg.get("id"))
+            if fut is not None and not fut.done():
+                fut.set_result((msg.get("result"), msg.get("error")))
+            return
+
+        params = msg.get("params") or []
+        if method == "mining.notify":
+            job = StratumJob.from_params(params, time.time(), self.difficulty)
+            self.current_job = job
+            self._job_event.set()
+            if self.on_job:
+                self.on_job(job)
+        elif method == "mining.set_difficulty":
+            self.difficulty = float(params[0])
+            if self.on_difficulty:
+                self.on_difficulty(self.difficulty)
+        elif method == "mining.set_extranonce":
+            self.extranonce1 = params[0]
+            self.extranonce2_size = int(params[1])
+            if self.on_extranonce:
+                self.on_extranonce(self.extranonce1, self.extranonce2_size)
+
+    def _fail_pending(self, exc: Exception):
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        self._pending.clear()
+
+
+def _error_text(error) -> Optional[str]:
+    # Pools send [code, message, traceback] or a bare string.
+    if not error:
+        return None
+    if isinstance(error, (list, tuple)) and len(error) > 1:
+        return str(error[1])
+    return str(error)
@@ -0,0 +1,265 @@
+"""
+Run one cpuminer per CPU group and present them as a single miner.
+
+Each instance is pinned to its group (cpuminer's --cpu-affinity plus
+sched_setaffinity on Linux) so it stays on one NUMA node / core and its
+memory stays local. Instances log into the shared LogStore and EventBus
+and keep their own MinerStats; the supervisor folds those into the
+dashboard's MinerStats twice a second.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .aio import LoopThread, shared_loop
+from .api import ApiPoller, free_port
+from .config import CPUMINER_PATH, POOL_HOST, POOL_PORT
+from .events import BUS_MINER_EXIT, EventBus
+from .logstore import LogStore
+from .miner import (
+    build_miner_command,
+    launch_miner_async,
+    process_miner_output_async,
+    terminate_miner_async,
+)
+from .stats import MinerStats, StatsSnapshot
+from .topology import affinity_mask, pin_process
+
+
+class MinerInstance:
+    __slots__ = ("cpus", "proc", "stats", "api", "conn_failed")
+
+    def __init__(self, cpus: List[int], proc, stats: MinerStats,
+                 api: Optional[ApiPoller] = None):
+        self.cpus = cpus
+        self.proc = proc  # asyncio.subprocess.Process
+        self.stats = stats
+        self.api = api
+        self.conn_failed = False
+
+
+class MinerSupervisor:
+    """
+        sup = MinerSupervisor(wallet, plan_groups(read_topology(), threads),
+                              stats, bus, log_store)
+        sup.start()
+        conn_failed = sup.wait()   # returns once every instance has exited
+        sup.stop()
+
+    With a single group the instance writes straight into `stats`.
+
+    The processes, their output, their API pollers and the aggregator all
+    run as tasks on one asyncio loop (shared_loop() unless `loop` is given),
+    whatever the number of instances. When the last instance has exited a
+    BUS_MINER_EXIT event carrying the supervisor is published.
+
+    `env`, when given, is the complete environment of every miner process;
+    otherwise they inherit this one.
+    """
+
+    AGGREGATE_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        wallet: str,
+        groups: List[List[int]],
+        stats: MinerStats,
+        bus: EventBus,
+        log_store: LogStore,
+        pool_host: str = POOL_HOST,
+        pool_port: int = POOL_PORT,
+        binary: str = CPUMINER_PATH,
+        pin: Optional[bool] = None,
+        use_api: bool = True,
+        loop: Optional[LoopThread] = None,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        self.wallet = wallet
+        self.groups = groups
+        self.stats = stats
+        self.bus = bus
+        self.log_store = log_store
+        self.pool_host = pool_host
+        self.pool_port = pool_port
+        self.binary = binary
+        # Default: pin only when there is more than one instance.
+        self.pin = len(groups) > 1 if pin is None else pin
+        self.use_api = use_api
+        self.env = env
+        self.loop = loop or shared_loop()
+
+        self.instances: List[MinerInstance] = []
+        self._base = StatsSnapshot()
+        self._done = threading.Event()
+        self._task = None
+
+    @property
+    def threads(self) -> int:
+        return sum(len(g) for g in self.groups)
+
+    def start(self):
+        """
+        Launch every instance. If one fails to start the others are stopped
+        and the exception propagates.
+        """
+        self._done.clear()
+        # Counters carry over from earlier sessions, as with a single miner.
+        self._base = self.stats.snapshot()
+        self.loop.run(self._launch(), timeout=30)
+        self.stats.record_miner_start()
+        self._task = self.loop.submit(self._supervise())
+
+    async def _launch(self):
+        try:
+            for cpus in self.groups:
+                extra = ["--cpu-affinity", affinity_mask(cpus)] if self.pin else None
+                api_port = free_port() if self.use_api else None
+                cmd = build_miner_command(
+                    self.wallet, len(cpus), pool_host=self.pool_host,
+                    pool_port=self.pool_port, binary=self.binary, extra_args=extra,
+                    api_port=api_port,
+                )
+                stats = self.stats if len(self.groups) == 1 else MinerStats()
+                if stats is not self.stats:
+                    stats.start()
+                api = ApiPoller(stats, api_port) if api_port else None
+                proc = await launch_miner_async(cmd, env=self.env)
+                if self.pin:
+                    pin_process(proc.pid, cpus)
+                self.instances.append(MinerInstance(cpus, proc, stats, api))
+        except Exception:
+            await self._terminate_all()
+            raise
+
+    async def _supervise(self):
+        aggregator = None
+        if len(self.instances) > 1:
+            aggregator = asyncio.ensure_future(self._aggregate_loop())
+        try:
+            await asyncio.gather(*(self._run(inst) for inst in self.instances),
+                                 return_exceptions=True)
+        finally:
+            if aggregator is not None:
+                aggregator.cancel()
+            self.aggregate()
+            self._done.set()
+            self.bus.publish(BUS_MINER_EXIT, self)
+
+    async def _run(self, inst: MinerInstance):
+        poller = asyncio.ensure_future(inst.api.run_async()) if inst.api is not None else None
+        try:
+            inst.conn_failed = await process_miner_output_async(
+                inst.proc, inst.stats, self.bus, self.log_store, api=inst.api
+            )
+            await inst.proc.wait()
+        finally:
+            if poller is not None:
+                poller.cancel()
+            if inst.stats is not self.stats:
+                inst.stats.stop()
+        # One instance going away means the miner as a whole is stopping
+        # (pool refused us, binary crashed, or stop() was called).
+        await self._terminate_all()
+
+    async def _terminate_all(self):
+        await asyncio.gather(*(terminate_miner_async(inst.proc) for inst in self.instances))
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until all instances have exited. True if any of them stopped
+        because the pool connection failed.
+        """
+        if self._task is not None:
+            self._done.wait(timeout)
+        return any(inst.conn_failed for inst in self.instances)
+
+    def is_running(self) -> bool:
+        return any(inst.proc.returncode is None for inst in self.instances)
+
+    def pids(self) -> List[int]:
+        return [inst.proc.pid for inst in self.instances if inst.proc.returncode is None]
+
+    def set_active_cpus(self, count: int) -> bool:
+        """
+        Squeeze the running instances onto `count` of their CPUs (taken
+        round-robin across groups so every node keeps some) without
+        restarting them. Each instance keeps at least one CPU. Returns
+        False where affinity can't be changed.
+        """
+        order = []
+        for i in range(max((len(g) for g in self.groups), default=0)):
+            order.extend(g[i] for g in self.groups if i < len(g))
+        active = set(order[:max(1, count)])
+        ok = True
+        for inst in self.instances:
+            cpus = [c for c in inst.cpus if c in active] or inst.cpus[:1]
+            ok = pin_process(inst.proc.pid, cpus) and ok
+        return ok
+
+    def stop(self, wait: bool = True):
+        """
+        Terminate every instance and wait (up to a few seconds) for them to
+        exit. With wait=False only ask: BUS_MINER_EXIT follows once the last
+        one has gone, so a UI thread never blocks on a slow miner.
+        """
+        if not self.instances:
+            return
+        if self.loop.in_loop():
+            asyncio.ensure_future(self._terminate_all())
+            return
+        if not wait:
+            self.loop.submit(self._terminate_all())
+            return
+        try:
+            self.loop.run(self._terminate_all(), timeout=15)
+        except Exception:
+            pass
+
+    # ---------- Stats ----------
+
+    async def _aggregate_loop(self):
+        while True:
+            await asyncio.sleep(self.AGGREGATE_INTERVAL)
+            self.aggregate()
+
+    def aggregate(self, now: Optional[float] = None):
+        """
+        Fold per-instance stats into the shared MinerStats.
+        """
+        if len(self.instances) < 2:
+            return
+        now = time.time() if now is None else now
+        snaps = [inst.stats.snapshot() for inst in self.instances]
+        base = self._base
+        job_snap = max(snaps, key=lambda s: s.block_attempts)
+        hashrate = sum(s.hashrate for s in snaps)
+        sample = []
+
+        def fold(snap: StatsSnapshot) -> StatsSnapshot:
+            # Runs under the stats lock, so a stop() from the UI either
+            # happened before (and its zeroed rate is kept) or comes after.
+            rate = hashrate if snap.mining else 0.0
+            if rate != snap.hashrate and rate > 0:
+                sample.append(rate)  # a new report from some instance
+            return snap._replace(
+                connected=snap.mining and any(s.connected for s in snaps),
+                hashrate=rate,
+                rate_since=now,
+                total_hashes=base.hashes_at(base.rate_since) + sum(s.hashes_at(now) for s in snaps),
+                # Every instance sees the same jobs; count them once.
+                block_attempts=base.block_attempts + job_snap.block_attempts,
+                current_job_id=job_snap.current_job_id,
+                ckpool_user_id=next((s.ckpool_user_id for s in snaps if s.ckpool_user_id), ""),
+                shares_accepted=base.shares_accepted + sum(s.shares_accepted for s in snaps),
+                shares_rejected=base.shares_rejected + sum(s.shares_rejected for s in snaps),
+                share_difficulty=max(s.share_difficulty for s in snaps),
+                thread_hashrates=tuple(r for s in snaps for r in s.thread_hashrates),
+                blocks_found=base.blocks_found + sum(s.blocks_found for s in snaps),
+                block_height=max([snap.block_height] + [s.block_height for s in snaps]),
+                block_height_at=max([snap.block_height_at] + [s.block_height_at for s in snaps]),
+            )
+
+        self.stats.merge(fold)
+        for rate in sample:
+            self.stats.rates.add(rate, now)
@@ -0,0 +1,171 @@
+"""
+CPU topology from sysfs, and how to split miner threads across it.
+
+Only Linux exposes /sys/devices/system/{cpu,node}; elsewhere every CPU is
+reported as its own core on node 0 and the plan degrades to one process.
+"""
+import os
+from typing import Dict, List, NamedTuple
+
+SYSFS_ROOT = "/sys/devices/system"
+
+LAYOUTS = ("auto", "single", "pinned", "node", "core")
+
+
+class CpuInfo(NamedTuple):
+    cpu: int
+    core: int      # core_id, unique within a package
+    package: int   # physical socket
+    node: int      # NUMA node
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """
+    "0-3,8,10-11" -> [0, 1, 2, 3, 8, 10, 11]
+    """
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus.extend(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+
+def format_cpu_list(cpus) -> str:
+    """
+    Inverse of parse_cpu_list(), for log messages.
+    """
+    out = []
+    cpus = sorted(cpus)
+    i = 0
+    while i < len(cpus):
+        j = i
+        while j + 1 < len(cpus) and cpus[j + 1] == cpus[j] + 1:
+            j += 1
+        out.append(str(cpus[i]) if i == j else f"{cpus[i]}-{cpus[j]}")
+        i = j + 1
+    return ",".join(out)
+
+
+def _read(path: str, default=None):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def read_topology(root: str = SYSFS_ROOT) -> List[CpuInfo]:
+    online = _read(os.path.join(root, "cpu", "online"))
+    if online is None:
+        return [CpuInfo(i, i, 0, 0) for i in range(os.cpu_count() or 1)]
+
+    node_of: Dict[int, int] = {}
+    node_dir = os.path.join(root, "node")
+    try:
+        names = os.listdir(node_dir)
+    except OSError:
+        names = []
+    for name in names:
+        if name.startswith("node") and name[4:].isdigit():
+            cpulist = _read(os.path.join(node_dir, name, "cpulist"), "")
+            for cpu in parse_cpu_list(cpulist):
+                node_of[cpu] = int(name[4:])
+
+    cpus = []
+    for cpu in parse_cpu_list(online):
+        topo = os.path.join(root, "cpu", f"cpu{cpu}", "topology")
+        cpus.append(CpuInfo(
+            cpu=cpu,
+            core=int(_read(os.path.join(topo, "core_id"), cpu)),
+            package=max(0, int(_read(os.path.join(topo, "physical_package_id"), 0))),
+            node=node_of.get(cpu, 0),
+        ))
+    return cpus
+
+
+def pick_cpus(cpus: List[CpuInfo], threads: int) -> List[CpuInfo]:
+    """
+    Choose `threads` CPUs: one hardware thread per physical core before
+    any SMT sibling, spread evenly over NUMA nodes.
+    """
+    by_node: Dict[int, List[CpuInfo]] = {}
+    seen = set()
+    primaries, siblings = [], []
+    for info in sorted(cpus):
+        key = (info.package, info.core)
+        (siblings if key in seen else primaries).append(info)
+        seen.add(key)
+    for info in primaries + siblings:
+        by_node.setdefault(info.node, []).append(info)
+
+    queues = [by_node[n] for n in sorted(by_node)]
+    picked = []
+    while len(picked) < threads and any(queues):
+        for q in queues:
+            if q and len(picked) < threads:
+                picked.append(q.pop(0))
+    return picked
+
+
+def plan_groups(cpus: List[CpuInfo], threads: int, layout: str = "auto") -> List[List[int]]:
+    """
+    CPU lists, one per cpuminer instance.
+
+      single: one process over all picked CPUs, scheduled by the OS
+      pinned: like single, but held to the picked CPUs
+      node:   one process per NUMA node
+      core:   one process per physical core (its SMT siblings together)
+      auto:   node on multi-node machines, otherwise single
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"unknown layout: {layout!r}")
+    picked = pick_cpus(cpus, max(1, threads))
+    if layout == "auto":
+        layout = "node" if len({c.node for c in picked}) > 1 else "single"
+
+    if layout in ("single", "pinned"):
+        return [sorted(c.cpu for c in picked)]
+
+    groups: Dict[tuple, List[int]] = {}
+    for c in picked:
+        key = (c.node,) if layout == "node" else (c.package, c.core)
+        groups.setdefault(key, []).append(c.cpu)
+    return [sorted(groups[k]) for k in sorted(groups)]
+
+
+def should_pin(layout: str, groups: List[List[int]]) -> bool:
+    return layout == "pinned" or len(groups) > 1
+
+
+def affinity_mask(cpus) -> str:
+    """
+    Hex mask for cpuminer's --cpu-affinity.
+    """
+    mask = 0
+    for cpu in cpus:
+        mask |= 1 << cpu
+    return hex(mask)
+
+
+def pin_process(pid: int, cpus) -> bool:
+    """
+    Restrict every thread of `pid` to `cpus`. Returns False where
+    sched_setaffinity isn't available or the process is already gone.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    cpus = set(cpus)
+    try:
+        tids = [int(t) for t in os.listdir(f"/proc/{pid}/task")]
+    except OSError:
+        tids = [pid]
+    ok = False
+    for tid in tids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+            ok = True
+        except OSError:
+            pass
+    return ok
@@ -0,0 +1,272 @@
+"""
+Header templates for in-process mining.
+
+Every unit of work needs a coinbase built from
+coinb1 + extranonce1 + extranonce2 + coinb2, hashed and folded through the
+job's merkle branch. Per job, everything that does not depend on
+extranonce2 is done once:
+
+  - the SHA-256 state after coinb1 + extranonce1 (copied, never recomputed)
+  - the decoded merkle branch
+  - the first 36 header bytes (version + prevhash) and nbits
+
+Each new extranonce2 then costs one coinbase hash plus one sha256d per
+branch level, and each merkle root is reused for `ntime_roll` ntime values,
+which only rewrites 4 header bytes.
+
+WorkGenerator keeps a bounded queue of ready templates topped up by a
+background thread, so a consumer (e.g. HashingPool) that exhausts its nonce
+space gets the next header without waiting on any of the above.
+madgood/inprocess.py connects it between a StratumClient and a HashingPool:
+
+    gen = WorkGenerator(extranonce1, extranonce2_size)
+    gen.start()
+    client.on_job = gen.set_job          # StratumClient callback
+    work = gen.next_work()
+    pool.set_job(work.header, work.target, work.clean_jobs, work.job_id)
+"""
+import hashlib
+import queue
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from .sha256d import sha256d, target_from_difficulty
+
+
+class Work(NamedTuple):
+    job_id: str
+    extranonce2: str    # hex, as submitted
+    ntime: int
+    header: bytes       # 80 bytes, nonce field zero
+    target: int
+    clean_jobs: bool
+    generation: int     # bumps on every new job; stale work has an old one
+
+    def submit_params(self, nonce: int):
+        """
+        (job_id, extranonce2, ntime, nonce) as mining.submit expects them.
+        """
+        return self.job_id, self.extranonce2, f"{self.ntime:08x}", f"{nonce:08x}"
+
+
+def _swap_words(data: bytes) -> bytes:
+    # Stratum sends prevhash with each 32-bit word byte-swapped.
+    return b"".join(data[i:i + 4][::-1] for i in range(0, len(data), 4))
+
+
+class JobTemplate:
+    """
+    The per-job part of header construction. merkle_root() and header()
+    are cheap enough to call for every extranonce2 / ntime value.
+    """
+
+    __slots__ = (
+        "job_id", "clean_jobs", "target", "received_at",
+        "_coinbase_prefix", "_coinb2", "_branch", "_head", "_ntime", "_nbits",
+        "_en2_size",
+    )
+
+    def __init__(self, job, extranonce1: str, extranonce2_size: int):
+        self.job_id = job.job_id
+        self.clean_jobs = job.clean_jobs
+        self.target = target_from_difficulty(job.difficulty)
+        self.received_at = job.received_at
+        self._coinbase_prefix = hashlib.sha256(
+            bytes.fromhex(job.coinb1) + bytes.fromhex(extranonce1)
+        )
+        self._coinb2 = bytes.fromhex(job.coinb2)
+        self._branch = tuple(bytes.fromhex(b) for b in job.merkle_branch)
+        self._head = struct.pack("<I", int(job.version, 16)) + _swap_words(
+            bytes.fromhex(job.prevhash)
+        )
+        self._ntime = int(job.ntime, 16)
+        self._nbits = int(job.nbits, 16)
+        self._en2_size = extranonce2_size
+
+    def merkle_root(self, extranonce2: bytes) -> bytes:
+        h = self._coinbase_prefix.copy()
+        h.update(extranonce2 + self._coinb2)
+        root = hashlib.sha256(h.digest()).digest()
+        for branch in self._branch:
+            root = sha256d(root + branch)
+        return root
+
+    def header(self, merkle_root: bytes, ntime: int) -> bytes:
+        return self._head + merkle_root + struct.pack("<III", ntime, self._nbits, 0)
+
+    def ntime_now(self, now: Optional[float] = None) -> int:
+        """
+        The job's ntime advanced by the time since it arrived.
+        """
+        now = time.time() if now is None else now
+        return self._ntime + max(0, int(now - self.received_at))
+
+    def extranonce2_bytes(self, counter: int) -> bytes:
+        return counter.to_bytes(self._en2_size, "big")
+
+
+class WorkGenerator:
+    """
+    Rolls extranonce2 (and optionally ntime) over the current job and keeps
+    up to `queue_size` headers ready ahead of demand.
+
+    Jobs come from a StratumClient (`on_job=gen.set_job`); extranonce1 and
+    its size from its subscription (`set_extranonce`).
+    """
+
+    RECENT_JOBS = 8
+
+    def __init__(self, extranonce1: str = "", extranonce2_size: int = 4,
+                 queue_size: int = 16, ntime_roll: int = 1):
+        self.extranonce1 = extranonce1
+        self.extranonce2_size = extranonce2_size
+        self.ntime_roll = max(1, ntime_roll)
+        self.generation = 0
+        self.clean_generation = 0  # work older than this is stale at the pool
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._jobs = OrderedDict()   # job_id -> StratumJob, oldest first
+        self._template = None
+        self._counter = 0
+
+    # ---------- Inputs ----------
+
+    def set_extranonce(self, extranonce1: str, extranonce2_size: Optional[int] = None):
+        with self._lock:
+            if extranonce2_size is not None:
+                self.extranonce2_size = extranonce2_size
+            if extranonce1 == self.extranonce1 and self._template is not None:
+                return
+            self.extranonce1 = extranonce1
+            job = next(reversed(self._jobs.values()), None)
+            if job is not None:
+                # Every queued coinbase embeds the old extranonce1.
+                self._switch(job._replace(clean_jobs=True))
+
+    def set_job(self, job):
+        """
+        Accepts a StratumJob. Queued work for the previous job is dropped;
+        Work.clean_jobs tells the consumer whether to abandon what it is
+        already scanning.
+        """
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._jobs.move_to_end(job.job_id)
+            while len(self._jobs) > self.RECENT_JOBS:
+                self._jobs.popitem(last=False)
+            self._switch(job)
+
+    def job(self, job_id: str):
+        """
+        One of the last RECENT_JOBS jobs, for checking late submissions.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def is_stale(self, work: Work) -> bool:
+        """
+        True once a clean job or a new extranonce1 replaced the one `work`
+        was built for, or its job dropped out of the recent ones.
+        """
+        with self._lock:
+            return (work.generation < self.clean_generation
+                    or work.job_id not in self._jobs)
+
+    def _switch(self, job):
+        # Caller holds the lock.
+        self._template = JobTemplate(job, self.extranonce1, self.extranonce2_size)
+        self._counter = 0
+        self.generation += 1
+        if job.clean_jobs:
+            self.clean_generation = self.generation
+        self._drain()
+        self._wake.set()
+
+    def _drain(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    # ---------- Production ----------
+
+    def build(self):
+        """
+        Build the work for the next extranonce2 directly (no queue).
+        Returns a list of `ntime_roll` Work items sharing one merkle root,
+        or [] if there is no job or extranonce2 space is used up.
+        """
+        with self._lock:
+            tmpl = self._template
+            if tmpl is None or self._counter >= 1 << (8 * self.extranonce2_size):
+                return []
+            counter = self._counter
+            self._counter += 1
+            generation = self.generation
+        en2 = tmpl.extranonce2_bytes(counter)
+        root = tmpl.merkle_root(en2)
+        ntime = tmpl.ntime_now()
+        return [
+            Work(tmpl.job_id, en2.hex(), ntime + k, tmpl.header(root, ntime + k),
+                 tmpl.target, tmpl.clean_jobs, generation)
+            for k in range(self.ntime_roll)
+        ]
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._fill_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _fill_loop(self):
+        while not self._stop.is_set():
+            batch = self.build()
+            if not batch:
+                self._wake.wait(0.5)
+                self._wake.clear()
+                continue
+            for work in batch:
+                while not self._stop.is_set() and work.generation == self.generation:
+                    try:
+                        self._queue.put(work, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+    # ---------- Consumption ----------
+
+    def next_work(self, timeout: Optional[float] = None) -> Optional[Work]:
+        """
+        Next ready header for the current job, or None on timeout. Work
+        queued for an older job is skipped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                work = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if work.generation == self.generation:
+                return work
+
+    def pending(self) -> int:
+        return self._queue.qsize()
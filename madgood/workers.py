@@ -0,0 +1,270 @@
+"""
+Multiprocess hashing backend for the built-in sha256d engine.
+
+The parent publishes the current job in a multiprocessing.shared_memory block
+guarded by a generation counter (a seqlock: odd while being written). Each
+worker polls the counter between scan chunks, so picking up new work is a
+few memory reads and never involves pickling. Worker i owns nonce slice i of
+the 32-bit space and its own hash counter slot, so the counters sum to an
+exact total without any locking.
+
+Found shares are rare and go back to the parent on a multiprocessing.Queue.
+"""
+import multiprocessing as mp
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Optional
+
+from .miner import get_threads_for_power
+from .sha256d import get_engine, pick_engine
+
+# Layout of the shared block
+_GEN = struct.Struct("<Q")          # offset 0: generation (odd = writing)
+_FLAGS = struct.Struct("<II")       # offset 8: stop flag, clean_jobs flag
+_HEADER_OFF = 16                    # 80-byte header (nonce bytes ignored)
+_TARGET_OFF = _HEADER_OFF + 80      # 32-byte target, little-endian
+_COUNTERS_OFF = _TARGET_OFF + 32    # u64 hash counter per worker
+_COUNTER = struct.Struct("<Q")
+
+NONCE_SPACE = 1 << 32
+
+
+class FoundShare(NamedTuple):
+    generation: int
+    worker: int
+    nonce: int
+    hash: bytes
+
+
+def workers_for_power(mode: str) -> int:
+    """
+    High/Medium/Low map straight to a worker process count.
+    """
+    return get_threads_for_power(mode)
+
+
+def nonce_slice(worker: int, workers: int):
+    """
+    Half-open nonce range [start, end) owned by `worker`.
+    """
+    span = NONCE_SPACE // workers
+    start = worker * span
+    end = NONCE_SPACE if worker == workers - 1 else start + span
+    return start, end
+
+
+class SharedJob:
+    """
+    Typed view over the shared block, used by both the parent and workers.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, workers: int):
+        self.shm = shm
+        self.buf = shm.buf
+        self.workers = workers
+
+    @staticmethod
+    def size(workers: int) -> int:
+        return _COUNTERS_OFF + _COUNTER.size * workers
+
+    def generation(self) -> int:
+        return _GEN.unpack_from(self.buf, 0)[0]
+
+    def stopped(self) -> bool:
+        return _FLAGS.unpack_from(self.buf, 8)[0] != 0
+
+    def publish(self, header: bytes, target: int, clean_jobs: bool) -> int:
+        """
+        Single-writer update. Returns the new (even) generation.
+        """
+        buf = self.buf
+        gen = self.generation()
+        _GEN.pack_into(buf, 0, gen + 1)
+        stop = _FLAGS.unpack_from(buf, 8)[0]
+        _FLAGS.pack_into(buf, 8, stop, 1 if clean_jobs else 0)
+        buf[_HEADER_OFF:_HEADER_OFF + 80] = header[:80].ljust(80, b"\0")
+        buf[_TARGET_OFF:_TARGET_OFF + 32] = target.to_bytes(32, "little")
+        _GEN.pack_into(buf, 0, gen + 2)
+        return gen + 2
+
+    def set_stop(self):
+        clean = _FLAGS.unpack_from(self.buf, 8)[1]
+        _FLAGS.pack_into(self.buf, 8, 1, clean)
+
+    def read(self):
+        """
+        Consistent (generation, header, target, clean_jobs) snapshot.
+        """
+        buf = self.buf
+        while True:
+            g1 = _GEN.unpack_from(buf, 0)[0]
+            if g1 & 1:
+                continue
+            clean = _FLAGS.unpack_from(buf, 8)[1]
+            header = bytes(buf[_HEADER_OFF:_HEADER_OFF + 80])
+            target = int.from_bytes(buf[_TARGET_OFF:_TARGET_OFF + 32], "little")
+            if _GEN.unpack_from(buf, 0)[0] == g1:
+                return g1, header, target, bool(clean)
+
+    def add_hashes(self, worker: int, count: int):
+        off = _COUNTERS_OFF + _COUNTER.size * worker
+        _COUNTER.pack_into(self.buf, off, _COUNTER.unpack_from(self.buf, off)[0] + count)
+
+    def hashes(self) -> List[int]:
+        return [
+            _COUNTER.unpack_from(self.buf, _COUNTERS_OFF + _COUNTER.size * i)[0]
+            for i in range(self.workers)
+        ]
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # The parent owns and unlinks the block. Workers share its resource
+    # tracker, where registering the name again is a no-op.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(shm_name: str, worker: int, workers: int, engine: str,
+                 chunk: int, results):
+    shm = _attach(shm_name)
+    job = SharedJob(shm, workers)
+    scan = get_engine(engine)
+    slice_start, slice_end = nonce_slice(worker, workers)
+
+    generation = 0
+    header = b""
+    target = 0
+    nonce = slice_end  # nothing to do until the first job
+    try:
+        while not job.stopped():
+            if job.generation() != generation:
+                gen, new_header, new_target, clean = job.read()
+                if gen == 0:
+                    time.sleep(0.001)
+                    continue
+                # Non-clean updates keep scanning where we were if the
+                # header prefix (everything but ntime/nonce) is unchanged.
+                if clean or new_header[:68] != header[:68]:
+                    nonce = slice_start
+                generation, header, target = gen, new_header, new_target
+
+            if nonce >= slice_end:
+                time.sleep(0.001)  # slice exhausted; wait for new work
+                continue
+
+            count = min(chunk, slice_end - nonce)
+            for hit in scan(header, nonce, count, target):
+                results.put(FoundShare(generation, worker, hit.nonce, hit.hash))
+            job.add_hashes(worker, count)
+            nonce += count
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del job
+        shm.close()
+
+
+class HashingPool:
+    """
+    Process pool scanning disjoint nonce slices of the current job.
+
+        pool = HashingPool(workers_for_power("medium"))
+        pool.start()
+        pool.set_job(header, target, clean_jobs=True, job_id="abc")
+        ... pool.total_hashes(), pool.drain_shares() ...
+        pool.stop()
+    """
+
+    # Shares found for older jobs than this are too stale to submit.
+    RECENT_JOBS = 8
+
+    def __init__(self, workers: int, engine: str = "auto", chunk: Optional[int] = None):
+        self.workers = max(1, workers)
+        # Decide once in the parent so workers don't each calibrate.
+        self.engine = pick_engine() if engine == "auto" else engine
+        self.chunk = chunk or (1 << 15 if self.engine == "numpy" else 1 << 13)
+        self._ctx = mp.get_context()
+        self._shm = None
+        self._job = None
+        self._procs = []
+        self._results = None
+        self._job_ids: Dict[int, str] = {}
+
+    def start(self):
+        size = SharedJob.size(self.workers)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._shm.buf[:size] = bytes(size)
+        self._job = SharedJob(self._shm, self.workers)
+        self._results = self._ctx.Queue()
+        for i in range(self.workers):
+            p = self._ctx.Process(
+                target=_worker_main,
+                args=(self._shm.name, i, self.workers, self.engine,
+                      self.chunk, self._results),
+                daemon=True,
+            )
+            p.start()
+            self._procs.append(p)
+
+    def set_job(self, header: bytes, target: int, clean_jobs: bool = True,
+                job_id: str = "") -> int:
+        gen = self._job.publish(header, target, clean_jobs)
+        self._job_ids[gen] = job_id
+        # Generations go up by 2 per publish; keep the last RECENT_JOBS.
+        self._job_ids.pop(gen - 2 * self.RECENT_JOBS, None)
+        return gen
+
+    def job_id_for(self, generation: int) -> str:
+        return self._job_ids.get(generation, "")
+
+    def hashes_per_worker(self) -> List[int]:
+        return self._job.hashes() if self._job else [0] * self.workers
+
+    def total_hashes(self) -> int:
+        return sum(self.hashes_per_worker())
+
+    def drain_shares(self) -> List[FoundShare]:
+        found = []
+        if self._results is None:
+            return found
+        while True:
+            try:
+                found.append(self._results.get_nowait())
+            except Exception:
+                return found
+
+    def stop(self, timeout: float = 5.0):
+        if self._job is None:
+            return
+        self._job.set_stop()
+        for p in self._procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self._procs = []
+        self._job = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+def benchmark_pool(workers: int, engine: str = "auto", seconds: float = 5.0):
+    """
+    Run the pool on a dummy job that can never hit; return per-worker H/s.
+    """
+    pool = HashingPool(workers, engine=engine)
+    pool.start()
+    try:
+        pool.set_job(bytes(range(76)) + b"\0\0\0\0", target=0)
+        time.sleep(0.5)  # let every worker get going
+        before = pool.hashes_per_worker()
+        t0 = time.perf_counter()
+        time.sleep(seconds)
+        after = pool.hashes_per_worker()
+        elapsed = time.perf_counter() - t0
+    finally:
+        pool.stop()
+    return [(b - a) / elapsed for a, b in zip(before, after)]
@@ -1,228 +1,370 @@
+import time
+
+_LAUNCHED = time.perf_counter()  # origin of the --profile-startup report
+
 import os
-import re
 import sys
-import time
 import threading
-import subprocess
 import tkinter as tk
+from bisect import bisect_left
 from tkinter import ttk
 
-import requests
-from PIL import Image, ImageTk
-
-# ---------------- CONFIG ----------------
-
-APP_VERSION = "0.3.2"
-
-GIF_NAME = os.path.join("assets", "BTC Miner App.gif")   # Animated logo in assets/
+# Only what the first frame needs is imported here. PIL, asyncio, the
+# supervisor, HTTP and the metrics server load when first used.
+from madgood.config import (
+    APP_VERSION,
+    CPUMINER_PATH,
+    DONATION_ADDRESS,
+    LOGO_PATH,
+    POOL_HOST,
+    POOL_PORT,
+    README_PATH,
+)
+from madgood.events import (
+    BUS_BLOCK,
+    BUS_CONNECTION,
+    BUS_MINER_EXIT,
+    BUS_NETWORK,
+    BUS_SHARE,
+    BUS_STATUS,
+    EventBus,
+)
+from madgood.logstore import LOG_KINDS, LogStore
+from madgood.parsing import measure_parser_throughput
+from madgood import startup
+from madgood.stats import MinerStats
+
+_IMPORTED = time.perf_counter()
+
+# ---------------- SETTINGS ----------------
+
+wallet_address = ""   # default shown in the wallet field
+power_mode = "high"  # "high" | "medium" | "low"
+cpu_layout = "auto"  # "auto" | "single" | "pinned" | "node" | "core" (see madgood/topology.py)
+use_governor = False  # scale CPUs with temperature / other load while mining (Linux)
+metrics_listen = ""  # e.g. "127.0.0.1:9877" to serve Prometheus stats at /metrics
+archive_log = True  # keep the full cpuminer log in <user data dir>/logs (see madgood/logarchive.py)
+record_history = True  # per-second stats to <user data dir>/history (see madgood/history.py)
+
+# Log view filter choices: (label, LOG_KINDS entry or None for every line)
+LOG_KIND_LABELS = [("All", None)] + [
+    (label, kind) for label, kind in zip(
+        ("Shares", "Jobs", "Connection", "Errors", "Hashrate", "Blocks"), LOG_KINDS
+    )
+]
 
-# Choose the right miner binary per OS
-if sys.platform.startswith("win"):
-    # Windows
-    CPUMINER_NAME = os.path.join("miner", "windows", "cpuminer.exe")
-elif sys.platform == "darwin":
-    # macOS
-    CPUMINER_NAME = os.path.join("miner", "mac", "cpuminer")
-else:
-    # Linux (what you're running now)
-    CPUMINER_NAME = os.path.join("miner", "linux", "cpuminer")
+UI_FRAME_MS = 100  # drain the bus and render at most 10x per second
+RATE_STATS_MS = 1000  # hashrate EWMA / windows / quantiles are recomputed this often
+BACKGROUND_START_MS = 50  # network poller and logo start this long after the window is up
 
-README_FILENAME = "README.txt"
+GIF_FRAME_MS = 120
+SMALL_LOGO_SIZE = (80, 80)
 
-POOL_HOST = "solo.ckpool.org"
-POOL_PORT = 3333
 
-# Donation address (for future dev / support)
-DONATION_ADDRESS = "bc1qkjdpk5awqwswx7rl4nclh90x8gntm93g3y4mnc"
+# ---------------- HELPERS ----------------
 
+def load_readme_text() -> str:
+    if os.path.exists(README_PATH):
+        try:
+            with open(README_PATH, "r", encoding="utf-8", errors="ignore") as f:
+                return f.read()
+        except Exception:
+            pass
+    return (
+        "MADGood Micro Miner\n"
+        "(No README.txt found next to the app yet.)"
+    )
 
-# ---------------- PATH HELPERS ----------------
 
-def resource_path(relative_path: str) -> str:
+def warm_power_settings():
     """
-    Resolve path whether running from source or as a PyInstaller binary.
+    Look the tuned power modes up once; the first lookup hashes the
+    cpuminer binary (see madgood/autotune.py).
     """
-    if hasattr(sys, "_MEIPASS"):
-        base = sys._MEIPASS
-    else:
-        base = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(base, relative_path)
-
-
-LOGO_PATH = resource_path(GIF_NAME)
-CPUMINER_PATH = resource_path(CPUMINER_NAME)
-README_PATH = resource_path(README_FILENAME)
+    from madgood.autotune import tuned_modes
 
+    tuned_modes(CPUMINER_PATH)
 
-# ---------------- GLOBAL STATE ----------------
 
-wallet_address = ""
-mining = False
-connected_to_pool = False
+# ---------------- GIF FRAMES ----------------
 
-current_hashrate = 0.0  # H/s
-total_hashes = 0.0
-
-btc_price_usd = 0.0
-block_height = 0
-
-hash_integrate_last = None
-
-power_mode = "high"  # "high" | "medium" | "low"
-mining_start_time = None
-
-ckpool_user_id = ""
-current_job_id = ""
-block_attempts = 0
-blocks_found = 0
-
-
-# ---------------- PARSERS & HELPERS ----------------
-
-def parse_hashrate_from_line(line: str) -> float:
+class GifFrameCache:
     """
-    Extract hashrate from cpuminer log output.
-
-    Handles:
-      - Periodic report lines: "Hash rate ... (13.16Mh/s)"
-      - TTF lines: "TTF @ 80.00 h/s" or "TTF @ 13.79 Mh/s"
-      - Generic "123.45 kH/s", "12.3 MH/s", etc.
+    Lazily decoded frames of one animated GIF, shared by every widget that
+    shows it.
 
-    Returns hashrate in H/s.
+    A frame is decoded once, the first time any size asks for it; each
+    requested size gets its own memoized PhotoImage, created on first
+    display.
     """
-    def to_hps(val: float, unit: str) -> float:
-        unit = unit.strip()
-        mult = 1.0
-        if unit in ("k", "K"):
-            mult = 1e3
-        elif unit in ("m", "M"):
-            mult = 1e6
-        elif unit in ("g", "G"):
-            mult = 1e9
-        return val * mult
-
-    lower = line.lower()
-
-    # Periodic report style: "Hash rate ... (13.16Mh/s)"
-    m = re.search(r"\(([\d.]+)\s*([kKmMgG])h/s\)", line)
-    if m:
-        val = float(m.group(1))
-        unit = m.group(2)
-        return to_hps(val, unit)
 
-    # TTF lines: "TTF @ 80.00 h/s" or "TTF @ 13.79 Mh/s"
-    if "ttf" in lower:
-        m = re.search(r"TTF @\s*([\d.]+)\s*([kKmMgG]?)[hH]/s", line)
-        if m:
-            val = float(m.group(1))
-            unit = m.group(2)
-            return to_hps(val, unit)
-
-    # Generic "xxx H/s" somewhere in the line (not TTF)
-    if "h/s" in lower and "ttf" not in lower:
-        m = re.search(r"([\d.]+)\s*([kKmMgG]?)[hH]/s", line)
-        if m:
-            val = float(m.group(1))
-            unit = m.group(2)
-            return to_hps(val, unit)
-
-    return 0.0
-
-
-def parse_block_height_from_line(line: str):
-    m = re.search(r"Block\s+(\d+)", line)
-    return int(m.group(1)) if m else None
+    def __init__(self, path: str):
+        self.path = path
+        self._img = None
+        self._failed = not path or not os.path.exists(path)
+        self._count = None  # unknown until the decoder hits EOF
+        self._sources = []
+        self._photos = {}  # (size, index) -> PhotoImage
+
+    @property
+    def available(self) -> bool:
+        return not self._failed
+
+    def frame_count(self):
+        return self._count
+
+    def _source(self, index: int):
+        while index >= len(self._sources):
+            if self._count is not None:
+                return None
+            try:
+                if self._img is None:
+                    from PIL import Image
+
+                    self._img = Image.open(self.path)
+                self._img.seek(len(self._sources))
+                self._sources.append(self._img.copy())
+            except EOFError:
+                self._count = len(self._sources)
+                if self._img is not None:
+                    self._img.close()
+                    self._img = None
+                return None
+            except Exception:
+                self._failed = not self._sources
+                self._count = len(self._sources)
+                return None
+        return self._sources[index]
+
+    def photo(self, index: int, size=None):
+        key = (size, index)
+        photo = self._photos.get(key)
+        if photo is None and not self._failed:
+            frame = self._source(index)
+            if frame is None:
+                return None
+            if size is not None:
+                frame = frame.resize(size)
+            from PIL import ImageTk
+
+            photo = ImageTk.PhotoImage(frame)
+            self._photos[key] = photo
+        return photo
+
+
+class GifAnimator:
+    """
+    Cycles a label through a GifFrameCache. The timer stops itself as soon
+    as is_visible() is false; resume() restarts it.
+    """
 
+    def __init__(self, root, label, cache: GifFrameCache, size, is_visible,
+                 placeholder: str = ""):
+        self.root = root
+        self.label = label
+        self.cache = cache
+        self.size = size
+        self.is_visible = is_visible
+        self.placeholder = placeholder
+        self.index = -1
+        self.job = None
+
+    def resume(self):
+        if self.job is None and self.cache.available and self.is_visible():
+            self.tick()
+
+    def tick(self):
+        self.job = None
+        if not self.is_visible():
+            return
 
-def parse_extranonce_from_line(line: str):
-    m = re.search(r"stratum extranonce1\s+0x([0-9a-fA-F]+)", line, re.IGNORECASE)
-    return m.group(1) if m else None
+        nxt = self.index + 1
+        count = self.cache.frame_count()
+        if count is not None and nxt >= count:
+            nxt = 0
+        photo = self.cache.photo(nxt, self.size)
+        if photo is None and nxt > 0:
+            # Ran past the last frame; the count is known now.
+            nxt = 0
+            photo = self.cache.photo(0, self.size)
+        if photo is None:
+            self.label.config(text=self.placeholder)
+            return
 
+        self.index = nxt
+        self.label.config(image=photo)
+        if self.cache.frame_count() != 1:
+            self.job = self.root.after(GIF_FRAME_MS, self.tick)
 
-def parse_job_from_line(line: str):
-    m = re.search(r"Job\s+([0-9a-fA-F]+)", line)
-    return m.group(1) if m else None
 
+# ---------------- LOG VIEW ----------------
 
-def get_threads_for_power() -> int:
-    """
-    Map power_mode -> number of CPU threads.
-    High   = all cores
-    Medium = half the cores (rounded up)
-    Low    = 1 core
+class LogView:
     """
-    cores = os.cpu_count() or 1
-    if power_mode == "high":
-        return max(1, cores)
-    elif power_mode == "medium":
-        return max(1, (cores + 1) // 2)
-    else:
-        return 1  # low
-
-
-def load_readme_text() -> str:
-    if os.path.exists(README_PATH):
-        try:
-            with open(README_PATH, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
-        except Exception:
-            pass
-    return (
-        "MADGood Micro Miner\n"
-        "(No README.txt found next to the app yet.)"
-    )
+    Append-only view of a LogStore in a read-only tk.Text.
 
+    Each refresh inserts just the new lines and trims the oldest ones from
+    the top, so the cost depends on how much arrived, not on the buffer size.
 
-def network_status_loop(ui_update_callback):
-    """
-    Periodically fetch BTC price + tip block height.
+    With a kind filter set (see LOG_KINDS) only lines of that kind are shown,
+    taken straight from the store's per-kind index. jump() moves to the
+    previous / next line of a kind and pauses following the tail until
+    follow() is called (or a forward jump runs off the end).
     """
-    global btc_price_usd, block_height
 
-    while True:
-        try:
-            # Block height
-            r_block = requests.get(
-                "https://blockstream.info/api/blocks/tip/height", timeout=5
-            )
-            if r_block.ok:
-                block_height = int(r_block.text.strip())
-
-            # BTC price
-            r_price = requests.get(
-                "https://api.coingecko.com/api/v3/simple/price",
-                params={"ids": "bitcoin", "vs_currencies": "usd"},
-                timeout=5,
-            )
-            if r_price.ok:
-                data = r_price.json()
-                btc_price_usd = float(data["bitcoin"]["usd"])
-        except Exception:
-            pass
+    def __init__(self, text_widget, store: LogStore, max_lines: int = 100):
+        self.text = text_widget
+        self.store = store
+        self.max_lines = max_lines
+        self.seq = 0
+        self.seqs = []        # store seq of each line in the widget, in order
+        self.kind = None      # show only this kind (None = every line)
+        self.following = True
+        self.cursor = None    # seq of the line last jumped to
+        self.text.tag_configure("jump", background="#fff2a8")
+
+    def _fetch(self, start: int, end: int, limit: int):
+        if self.kind is None:
+            return self.store.range(max(start, end - limit), end)
+        return self.store.matches(self.kind, start, end, limit)
+
+    def _render(self, pairs):
+        text = self.text
+        text.config(state="normal")
+        text.delete("1.0", tk.END)
+        text.insert(tk.END, "\n".join(line for _, line in pairs))
+        text.config(state="disabled")
+        self.seqs = [seq for seq, _ in pairs]
+
+    def refresh(self):
+        if not self.following:
+            return  # new lines stay in the store until follow()
+        end = self.store.next_seq
+        new = self._fetch(self.seq, end, self.max_lines)
+        self.seq = end
+        if not new:
+            return
 
-        ui_update_callback()
-        time.sleep(600)  # 10 minutes
+        text = self.text
+        text.config(state="normal")
+        if len(new) >= self.max_lines:
+            # Whole view replaced; no point appending and trimming.
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, "\n".join(line for _, line in new))
+            self.seqs = [seq for seq, _ in new]
+        else:
+            prefix = "\n" if self.seqs else ""
+            text.insert(tk.END, prefix + "\n".join(line for _, line in new))
+            self.seqs.extend(seq for seq, _ in new)
+            excess = len(self.seqs) - self.max_lines
+            if excess > 0:
+                text.delete("1.0", f"{excess + 1}.0")
+                del self.seqs[:excess]
+        text.see(tk.END)
+        text.config(state="disabled")
+
+    def set_filter(self, kind):
+        self.kind = kind
+        self.follow()
+
+    def follow(self):
+        """
+        Back to the newest lines and keep up with new ones.
+        """
+        self.following = True
+        self.cursor = None
+        self.seq = self.store.next_seq
+        self._render(self._fetch(0, self.seq, self.max_lines))
+        self.text.see(tk.END)
+
+    def jump(self, kind: str, forward: bool) -> bool:
+        """
+        Show the previous / next `kind` line relative to the last jump (or
+        the end of the view). Returns False when there is none.
+        """
+        if self.kind is not None and kind != self.kind:
+            self.kind = None  # the target would not be visible
+        if self.cursor is not None:
+            anchor = self.cursor
+        elif self.seqs:
+            anchor = self.seqs[-1] + 1 if not forward else self.seqs[-1]
+        else:
+            anchor = self.store.next_seq
+        if forward:
+            target = self.store.next_of(kind, anchor)
+            if target is None:
+                self.follow()
+                return False
+        else:
+            target = self.store.prev_of(kind, anchor)
+            if target is None:
+                return False
+
+        self.following = False
+        self.cursor = target
+        i = bisect_left(self.seqs, target)
+        if i == len(self.seqs) or self.seqs[i] != target:
+            # Not on screen: re-render a window around it.
+            half = self.max_lines // 2
+            if self.kind is None:
+                self._render(self.store.range(target - half, target + half))
+            else:
+                self._render(self.store.matches(self.kind, 0, target + 1, self.max_lines))
+            i = bisect_left(self.seqs, target)
+        text = self.text
+        text.tag_remove("jump", "1.0", tk.END)
+        text.tag_add("jump", f"{i + 1}.0", f"{i + 2}.0")
+        text.see(f"{i + 1}.0")
+        return True
 
 
 # ---------------- MAIN APP ----------------
 
 class MadGoodMinerApp:
-    def __init__(self, root):
+    def __init__(self, root, profile=None):
         self.root = root
         root.title("MADGood Micro BTC Miner")
-
-        self.miner_proc = None
-        self.log_lines = []
-        self.log_lock = threading.Lock()
-
-        # GIF & logos
+        self.startup = profile or startup.StartupProfile()
+        phase = self.startup.phase
+
+        self.supervisor = None
+        self.stop_requested = False  # Stop pressed, waiting for BUS_MINER_EXIT
+        self.governor = None
+        self.history = None
+        self.network_task = None
+        self.stats = MinerStats()
+        # The on-disk archive becomes the store's sink in start_background_work
+        self.log_archive = None
+        self.log_store = LogStore(maxlen=5000)
+        self.log_view = None
+
+        # Worker threads publish here; the Tk thread drains it in pump_events
+        self.bus = EventBus()
+        self.bus.subscribe(self.on_bus_events)
+        self.bus.subscribe(self.on_miner_exit, kinds=[BUS_MINER_EXIT])
+        self.ui_dirty = False
+
+        # Optional scrape endpoint; serves cached snapshots off the Tk thread
+        self.metrics = None
+        if metrics_listen:
+            with phase("metrics exporter"):
+                from madgood.metrics import MetricsExporter
+
+                host, _, port = metrics_listen.rpartition(":")
+                try:
+                    self.metrics = MetricsExporter(self.stats, port=int(port), host=host or "127.0.0.1")
+                    self.metrics.start()
+                except (OSError, ValueError) as e:
+                    self.metrics = None
+                    self.bus.publish(BUS_STATUS, f"Metrics disabled: {e}")
+
+        # GIF & logos (one decoded-frame cache shared by every size)
+        self.gif_cache = GifFrameCache(LOGO_PATH)
         self.logo_label = None
-        self.logo_frames = []
-        self.logo_frame_index = 0
+        self.small_logo_anim = None
 
         self.big_logo_label = None
-        self.big_logo_frames = []
-        self.big_logo_frame_index = 0
+        self.big_logo_anim = None
 
         # Block alert flashing
         self.block_flash_active = False
@@ -234,6 +376,7 @@ class MadGoodMinerApp:
         self.comp_logo_label = None
         self.comp_uptime_label = None
         self.comp_hashrate_label = None
+        self.comp_rates_label = None
         self.comp_attempts_label = None
         self.comp_conn_light = None
         self.comp_mining_light = None
@@ -255,17 +398,84 @@ class MadGoodMinerApp:
         self.notebook.add(self.info_frame, text="Info")
         self.notebook.add(self.gif_frame, text="GIF")
 
-        self.build_miner_tab()
-        self.build_info_tab()
-        self.build_gif_tab()
+        with phase("miner tab"):
+            self.build_miner_tab()
+        # The other tabs are filled in the first time they are selected.
+        self.pending_tabs = {
+            str(self.info_frame): ("info tab (README)", self.build_info_tab),
+            str(self.gif_frame): ("GIF tab (first frame)", self.build_gif_tab),
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
-        # Network info thread
-        net_thread = threading.Thread(
-            target=network_status_loop,
-            args=(self.thread_safe_update,),
-            daemon=True,
-        )
-        net_thread.start()
+        # Only animate what can actually be seen
+        root.bind("<Map>", self.update_animations)
+        root.bind("<Map>", self.on_first_map, add="+")
+
+    # ---------- Startup ----------
+
+    def on_first_map(self, event=None):
+        if "window mapped" in self.startup.marks:
+            return
+        self.startup.mark("window mapped")
+        self.root.after_idle(self.on_interactive)
+
+    def on_interactive(self):
+        self.startup.mark("interactive")
+        self.startup.deferred = True
+        self.root.after(BACKGROUND_START_MS, self.start_background_work)
+
+    def start_background_work(self):
+        """
+        What the first frame can do without: the logo, the log archive,
+        the tuned power settings and network info.
+        """
+        phase = self.startup.phase
+        with phase("logo (PIL import, first frame)"):
+            self.setup_small_logo_animation()
+        if archive_log:
+            with phase("log archive"):
+                self.start_log_archive()
+        with phase("power settings lookup (thread)"):
+            # Hashes the cpuminer binary once; keep that off the Tk thread so
+            # change_power_mode() later only finds it memoized.
+            threading.Thread(target=warm_power_settings, daemon=True).start()
+        with phase("network poller (asyncio loop)"):
+            from madgood.aio import shared_loop
+            from madgood.network import network_status_task
+
+            # Polled on the same background loop as the miners
+            self.network_task = shared_loop().submit(
+                network_status_task(self.stats, lambda: self.bus.publish(BUS_NETWORK))
+            )
+        self.startup.mark("background started")
+
+    def start_log_archive(self):
+        """
+        Send every miner line to the compressed on-disk archive from now
+        on, plus whatever the log store already holds.
+        """
+        from madgood.logarchive import LogArchive
+
+        try:
+            archive = LogArchive()
+            archive.start()
+        except OSError:
+            return
+        self.log_archive = archive
+        seq = self.log_store.next_seq
+        self.log_store.sink = archive.write
+        archive.write([line for _, line in self.log_store.range(0, seq)])
+
+    def on_tab_changed(self, event=None):
+        pending = self.pending_tabs.pop(self.notebook.select(), None)
+        if pending is None:
+            self.update_animations()
+            return
+        name, build = pending
+        with self.startup.phase(name):
+            build()
+            self.update_animations()
+            self.root.update_idletasks()
 
     # ---------- Miner Tab ----------
 
@@ -301,7 +511,6 @@ class MadGoodMinerApp:
         self.logo_label = ttk.Label(main, text="[logo]")
         self.logo_label.grid(row=0, column=2, rowspan=2,
                              sticky="ne", padx=(10, 0), pady=(0, 10))
-        self.setup_small_logo_animation()
 
         # Block alert label (flashing red on block found)
         self.block_alert_var = tk.StringVar(value="")
@@ -370,6 +579,14 @@ class MadGoodMinerApp:
             row=8, column=1, sticky="w", pady=(8, 0)
         )
 
+        # EWMA and 1m / 15m / 1h windows beside the instantaneous figures
+        self.rate_stats_var = tk.StringVar(value="")
+        self.compact_rates_text = ""
+        self.rate_stats_at = 0.0
+        ttk.Label(
+            main, textvariable=self.rate_stats_var, justify="left", font=("Courier", 8)
+        ).grid(row=8, column=2, rowspan=5, sticky="nw", padx=(10, 0), pady=(8, 0))
+
         ttk.Label(main, text="Total Hash Attempts:").grid(row=9, column=0, sticky="w")
         self.total_hashes_var = tk.StringVar(value="0")
         ttk.Label(main, textvariable=self.total_hashes_var).grid(
@@ -449,52 +666,50 @@ class MadGoodMinerApp:
         ttk.Label(main, text="Miner Log:").grid(
             row=15, column=0, sticky="w", pady=(10, 0)
         )
+        log_bar = ttk.Frame(main)
+        log_bar.grid(row=15, column=1, columnspan=2, sticky="e", pady=(10, 0))
+        self.log_kind_var = tk.StringVar(value=LOG_KIND_LABELS[0][0])
+        kind_box = ttk.Combobox(
+            log_bar, textvariable=self.log_kind_var, state="readonly", width=11,
+            values=[label for label, _ in LOG_KIND_LABELS],
+        )
+        kind_box.bind("<<ComboboxSelected>>", lambda e: self.change_log_filter())
+        self.log_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            log_bar, text="Only", variable=self.log_only_var,
+            command=self.change_log_filter,
+        ).grid(row=0, column=1, padx=(4, 0))
+        kind_box.grid(row=0, column=0)
+        ttk.Button(log_bar, text="\u25b2", width=3,
+                   command=lambda: self.jump_log(False)).grid(row=0, column=2, padx=(4, 0))
+        ttk.Button(log_bar, text="\u25bc", width=3,
+                   command=lambda: self.jump_log(True)).grid(row=0, column=3)
+        ttk.Button(log_bar, text="Live", width=5,
+                   command=lambda: self.log_view.follow()).grid(row=0, column=4, padx=(4, 0))
         self.log_text = tk.Text(
             main, height=8, width=70, state="disabled", wrap="word"
         )
         self.log_text.grid(
             row=16, column=0, columnspan=3, sticky="nsew", pady=(2, 0)
         )
+        self.log_view = LogView(self.log_text, self.log_store, max_lines=100)
 
-        # Kick off periodic UI refresh
+        # Kick off periodic UI refresh and the event pump
         self.schedule_ui_refresh()
+        self.pump_events()
 
     # ---------- Logos & GIF ----------
 
     def setup_small_logo_animation(self):
-        if not LOGO_PATH or not os.path.exists(LOGO_PATH):
-            self.logo_label.config(text="[logo]")
-            return
-
-        frames = []
-        try:
-            img = Image.open(LOGO_PATH)
-            i = 0
-            while True:
-                img.seek(i)
-                frame = img.copy().resize((80, 80))
-                frames.append(ImageTk.PhotoImage(frame))
-                i += 1
-        except EOFError:
-            pass
-        except Exception:
-            frames = []
-
-        if not frames:
-            self.logo_label.config(text="[logo]")
-            return
-
-        self.logo_frames = frames
-        self.logo_frame_index = 0
-        self.logo_label.config(image=self.logo_frames[0])
-        self.animate_small_logo()
-
-    def animate_small_logo(self):
-        if not self.logo_frames:
-            return
-        self.logo_frame_index = (self.logo_frame_index + 1) % len(self.logo_frames)
-        self.logo_label.config(image=self.logo_frames[self.logo_frame_index])
-        self.root.after(120, self.animate_small_logo)
+        self.small_logo_anim = GifAnimator(
+            self.root,
+            self.logo_label,
+            self.gif_cache,
+            size=SMALL_LOGO_SIZE,
+            is_visible=lambda: self.is_tab_visible(self.miner_frame),
+            placeholder="[logo]",
+        )
+        self.small_logo_anim.resume()
 
     def build_gif_tab(self):
         frame = self.gif_frame
@@ -507,41 +722,29 @@ class MadGoodMinerApp:
         self.setup_big_logo_animation()
 
     def setup_big_logo_animation(self):
-        if not LOGO_PATH or not os.path.exists(LOGO_PATH):
-            self.big_logo_label.config(text="[GIF]")
-            return
-
-        frames = []
-        try:
-            img = Image.open(LOGO_PATH)
-            i = 0
-            while True:
-                img.seek(i)
-                frame = img.copy()
-                frames.append(ImageTk.PhotoImage(frame))
-                i += 1
-        except EOFError:
-            pass
-        except Exception:
-            frames = []
-
-        if not frames:
-            self.big_logo_label.config(text="[GIF]")
-            return
+        # Frames are decoded the first time the tab is shown.
+        self.big_logo_anim = GifAnimator(
+            self.root,
+            self.big_logo_label,
+            self.gif_cache,
+            size=None,
+            is_visible=lambda: self.is_tab_visible(self.gif_frame),
+            placeholder="[GIF]",
+        )
 
-        self.big_logo_frames = frames
-        self.big_logo_frame_index = 0
-        self.big_logo_label.config(image=self.big_logo_frames[0])
-        self.animate_big_logo()
+    def is_tab_visible(self, tab) -> bool:
+        if self.root.state() in ("withdrawn", "iconic"):
+            return False
+        return self.notebook.select() == str(tab)
 
-    def animate_big_logo(self):
-        if not self.big_logo_frames:
-            return
-        self.big_logo_frame_index = (self.big_logo_frame_index + 1) % len(
-            self.big_logo_frames
-        )
-        self.big_logo_label.config(image=self.big_logo_frames[self.big_logo_frame_index])
-        self.root.after(120, self.animate_big_logo)
+    def update_animations(self, event=None):
+        """
+        Resume whichever logo animation just became visible. Hidden ones stop
+        rescheduling themselves on their next tick.
+        """
+        for anim in (self.small_logo_anim, self.big_logo_anim):
+            if anim is not None:
+                anim.resume()
 
     # ---------- Info Tab ----------
 
@@ -593,14 +796,30 @@ class MadGoodMinerApp:
         self.readme_text.insert("1.0", load_readme_text())
         self.readme_text.config(state="disabled")
 
+    # ---------- Log filter ----------
+
+    def selected_log_kind(self):
+        return dict(LOG_KIND_LABELS).get(self.log_kind_var.get())
+
+    def change_log_filter(self):
+        kind = self.selected_log_kind()
+        self.log_view.set_filter(kind if self.log_only_var.get() else None)
+
+    def jump_log(self, forward: bool):
+        kind = self.selected_log_kind()
+        if kind is None or not self.log_view.jump(kind, forward):
+            self.root.bell()
+
     # ---------- Mining Power ----------
 
     def change_power_mode(self):
+        from madgood.autotune import settings_for_power
+
         global power_mode
         power_mode = self.power_mode_var.get()
         self.status_var.set(
             f"Mining power set to: {power_mode.capitalize()} "
-            f"({get_threads_for_power()} threads)"
+            f"({settings_for_power(power_mode, cpu_layout).threads} threads)"
         )
 
     # ---------- Alerts ----------
@@ -639,234 +858,190 @@ class MadGoodMinerApp:
     # ---------- Mining Control ----------
 
     def start_mining(self):
-        global mining, wallet_address, hash_integrate_last, mining_start_time, current_job_id
-
-        if mining:
+        if self.stats.snapshot().mining:
             return
 
         if not os.path.exists(CPUMINER_PATH):
             self.status_var.set("ERROR: cpuminer not found in the miner/ folder.")
             return
 
-        wallet_address = self.wallet_var.get().strip()
-        if not wallet_address:
+        wallet = self.wallet_var.get().strip()
+        if not wallet:
             self.status_var.set("ERROR: Wallet address is empty. Enter a BTC address first.")
             return
 
-        threads = get_threads_for_power()
-        cmd = [
-            CPUMINER_PATH,
-            "-a", "sha256d",
-            "-o", f"stratum+tcp://{POOL_HOST}:{POOL_PORT}",
-            "-u", wallet_address,
-            "-p", "x",
-            "-t", str(threads),
-        ]
+        # Loaded on first start rather than at launch (asyncio, subprocess, ...)
+        from madgood.autotune import settings_for_power
+        from madgood.supervisor import MinerSupervisor
+        from madgood.topology import plan_groups, read_topology, should_pin
+
+        # Tuned optimum from `python3 -m madgood --autotune`, if any
+        threads, layout = settings_for_power(power_mode, cpu_layout)
+        groups = plan_groups(read_topology(), threads, layout)
+        supervisor = MinerSupervisor(
+            wallet, groups, self.stats, self.bus, self.log_store,
+            pin=should_pin(layout, groups),
+        )
 
+        # Start the clock first: the readers may report a connection at once.
+        self.stats.start()
         try:
-            self.miner_proc = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-            )
+            supervisor.start()
         except Exception as e:
+            self.stats.stop()
             self.status_var.set(f"ERROR starting cpuminer: {e}")
-            self.miner_proc = None
             return
+        self.supervisor = supervisor
+        if use_governor:
+            from madgood.governor import Governor, describe as describe_decision
+
+            self.governor = Governor(
+                threads, supervisor.set_active_cpus, pids=supervisor.pids,
+                on_decision=lambda d: self.bus.publish(BUS_STATUS, describe_decision(d)),
+                loop=supervisor.loop,
+            )
+            self.governor.start()
+        if record_history:
+            from madgood.history import HistoryRecorder
+
+            try:
+                self.history = HistoryRecorder(self.stats, loop=supervisor.loop)
+                self.history.start()
+            except OSError as e:
+                self.bus.publish(BUS_STATUS, f"History disabled: {e}")
 
-        mining = True
-        mining_start_time = time.time()
-        hash_integrate_last = time.time()
-        current_job_id = ""
         self.block_flash_active = False
         self.block_alert_var.set("")
 
         self.start_btn.config(state="disabled")
         self.stop_btn.config(state="normal")
         self.wallet_entry.config(state="disabled")
-        self.status_var.set(f"cpuminer running on {threads} threads...")
-
-        t = threading.Thread(
-            target=self.miner_output_loop,
-            args=(self.miner_proc,),
-            daemon=True,
-        )
-        t.start()
+        if len(groups) > 1:
+            self.status_var.set(
+                f"cpuminer running on {threads} threads ({len(groups)} pinned instances)..."
+            )
+        else:
+            self.status_var.set(f"cpuminer running on {threads} threads...")
 
     def stop_mining(self):
-        global mining, mining_start_time, connected_to_pool, current_hashrate
-
-        mining = False
-        mining_start_time = None
-        connected_to_pool = False
-        current_hashrate = 0.0
+        if self.supervisor is None or self.stop_requested:
+            return
+        self.stop_requested = True
+        self.stats.stop()
 
         self.block_flash_active = False
         self.block_alert_var.set("")
 
-        if self.miner_proc is not None:
-            try:
-                self.miner_proc.terminate()
-                try:
-                    self.miner_proc.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    self.miner_proc.kill()
-            except Exception:
-                pass
-            self.miner_proc = None
+        self.stop_governor()
+        self.stop_history()
+        # Don't wait for cpuminer on the Tk thread; on_miner_exit finishes
+        # the teardown once every instance has exited.
+        self.supervisor.stop(wait=False)
 
-        self.start_btn.config(state="normal")
+        self.start_btn.config(state="disabled")
         self.stop_btn.config(state="disabled")
-        self.wallet_entry.config(state="normal")
-        self.status_var.set("Stopped.")
+        self.status_var.set("Stopping...")
 
     # ---------- Miner Output & Parsing ----------
 
-    def miner_output_loop(self, proc):
-        global current_hashrate, total_hashes, connected_to_pool
-        global ckpool_user_id, mining, block_height, block_attempts, blocks_found, current_job_id
-
-        for raw_line in proc.stdout:
-            if raw_line is None:
-                break
-
-            line = raw_line.strip()
-            if not line:
-                continue
-
-            lower = line.lower()
-
-            # Save log
-            with self.log_lock:
-                self.log_lines.append(line)
-                if len(self.log_lines) > 200:
-                    self.log_lines = self.log_lines[-200:]
-
-            # Connection status
-            if "stratum connect" in lower:
-                connected_to_pool = False
-                self.status_var.set("Connecting to CKPool...")
-
-            if (
-                "stratum connection established" in lower
-                or "new stratum diff" in lower
-                or "new work" in lower
-            ):
-                connected_to_pool = True
-                self.status_var.set("Connected to CKPool, mining...")
-
-            if (
-                "stratum authentication failed" in lower
-                or "stratum connection failed" in lower
-            ):
-                connected_to_pool = False
-                mining = False
-                self.status_var.set("CKPool connection failed. Miner stopped.")
-                try:
-                    proc.terminate()
-                except Exception:
-                    pass
-                self.thread_safe_update()
-                break
-
-            # Extranonce (used as pseudo user-id)
-            if "stratum extranonce1" in lower:
-                ex = parse_extranonce_from_line(line)
-                if ex:
-                    ckpool_user_id = ex
-
-            # Job / block attempts
-            if " job " in lower or "job " in line:
-                jid = parse_job_from_line(line)
-                if jid:
-                    current_job_id = jid
-                    block_attempts += 1
-
-            # Block found
-            if "block found" in lower or "yay!!!" in lower:
-                blocks_found += 1
-                self.status_var.set("BLOCK FOUND! Check CKPool / wallet.")
-                self.root.after(0, self.on_block_found_alert)
-
-            # Share accepted
-            if "accepted" in lower and "block" not in lower and "yay" not in lower:
-                self.root.after(0, self.on_share_accepted_alert)
-
-            # Hashrate
-            hr = parse_hashrate_from_line(line)
-            if hr > 0:
-                current_hashrate = hr
-
-            # Block height from miner output (optional)
-            bh = parse_block_height_from_line(line)
-            if bh is not None and bh > 0:
-                block_height = bh
-
-            self.thread_safe_update()
-
-        # Process ended
-        proc.wait()
-        if self.miner_proc is proc:
-            self.miner_proc = None
-
-        mining = False
-        connected_to_pool = False
-        current_hashrate = 0.0
-        self.thread_safe_update()
-        self.root.after(0, self.on_miner_exit)
-
-    def on_miner_exit(self):
+    def stop_governor(self):
+        if self.governor is not None:
+            self.governor.stop()
+            self.governor = None
+
+    def stop_history(self):
+        if self.history is not None:
+            self.history.stop()
+            self.history = None
+
+    def on_miner_exit(self, events):
+        # Process(es) ended, on request or on their own. Ignore a stale supervisor.
+        if not any(ev.payload is self.supervisor for ev in events):
+            return
+        requested, self.stop_requested = self.stop_requested, False
+        self.supervisor = None
+        self.stats.stop()
+        self.bus.publish(BUS_CONNECTION, False)
+        self.stop_governor()
+        self.stop_history()
         self.start_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
         self.wallet_entry.config(state="normal")
         self.block_flash_active = False
         self.block_alert_var.set("")
-        if not self.status_var.get().lower().startswith("error"):
+        if requested:
+            self.status_var.set("Stopped.")
+        elif not self.status_var.get().lower().startswith("error"):
             self.status_var.set("Miner exited.")
 
-    # ---------- UI Refresh ----------
+    # ---------- Event Bus ----------
+
+    def pump_events(self):
+        """
+        Drain the event bus on the Tk thread and render at most once per frame.
+        """
+        self.bus.dispatch()
+        if self.ui_dirty:
+            self.ui_dirty = False
+            self.refresh_ui()
+        else:
+            # Plain log lines carry no event; still show them promptly.
+            self.log_view.refresh()
+        self.root.after(UI_FRAME_MS, self.pump_events)
+
+    def on_bus_events(self, events):
+        status = None
+        shares = 0
+        blocks = 0
+        for ev in events:
+            if ev.kind == BUS_STATUS:
+                status = ev.payload
+            elif ev.kind == BUS_SHARE and ev.payload:
+                shares += 1
+            elif ev.kind == BUS_BLOCK:
+                blocks += 1
+
+        if status is not None:
+            self.status_var.set(status)
+        if blocks:
+            self.on_block_found_alert()
+        elif shares:
+            self.on_share_accepted_alert()
+        self.ui_dirty = True
 
-    def thread_safe_update(self):
-        self.root.after(0, self.refresh_ui)
+    # ---------- UI Refresh ----------
 
     def schedule_ui_refresh(self):
         self.refresh_ui()
         self.root.after(1000, self.schedule_ui_refresh)
 
     def refresh_ui(self):
-        global total_hashes, hash_integrate_last, current_hashrate
-        global mining_start_time, ckpool_user_id, block_attempts, blocks_found, current_job_id
-
-        # Integrate hashrate over time into total_hashes
         now = time.time()
-        if hash_integrate_last is not None:
-            dt = now - hash_integrate_last
-            if dt > 0 and current_hashrate > 0:
-                total_hashes += current_hashrate * dt
-        hash_integrate_last = now
+        snap = self.stats.snapshot()
 
         # Main lights
-        self.conn_light.config(fg="green" if connected_to_pool else "red")
-        self.mining_light.config(fg="green" if mining else "red")
+        self.conn_light.config(fg="green" if snap.connected else "red")
+        self.mining_light.config(fg="green" if snap.mining else "red")
 
         # Hashrate + totals
-        self.hashrate_var.set(f"{current_hashrate:,.2f} H/s")
-        self.total_hashes_var.set(f"{int(total_hashes):,}")
+        self.hashrate_var.set(f"{snap.hashrate:,.2f} H/s")
+        self.total_hashes_var.set(f"{int(snap.hashes_at(now)):,}")
+        if now - self.rate_stats_at >= RATE_STATS_MS / 1000:
+            self.rate_stats_at = now
+            self.render_rate_stats(now)
 
         # BTC price
-        if btc_price_usd > 0:
-            self.price_var.set(f"${btc_price_usd:,.2f}")
+        if snap.btc_price_usd > 0:
+            self.price_var.set(f"${snap.btc_price_usd:,.2f}")
         else:
             self.price_var.set("…")
 
         # Block height
-        self.block_var.set(str(block_height))
+        self.block_var.set(str(snap.block_height))
 
         # Uptime
-        if mining_start_time is not None and mining:
-            seconds = int(time.time() - mining_start_time)
+        if snap.mining and snap.mining_start_time is not None:
+            seconds = int(snap.uptime_at(now))
             h, rem = divmod(seconds, 3600)
             m, s = divmod(rem, 60)
             if h > 0:
@@ -879,19 +1054,14 @@ class MadGoodMinerApp:
             self.uptime_var.set("0s")
 
         # Extras
-        self.user_id_var.set(ckpool_user_id if ckpool_user_id else "-")
-        self.job_id_var.set(current_job_id if current_job_id else "-")
-        self.block_counter_var.set(f"Attempts: {block_attempts} / Found: {blocks_found}")
-
-        # Log text
-        self.log_text.config(state="normal")
-        self.log_text.delete("1.0", tk.END)
-        with self.log_lock:
-            tail = self.log_lines[-100:]
-        if tail:
-            self.log_text.insert(tk.END, "\n".join(tail))
-        self.log_text.see(tk.END)
-        self.log_text.config(state="disabled")
+        self.user_id_var.set(snap.ckpool_user_id if snap.ckpool_user_id else "-")
+        self.job_id_var.set(snap.current_job_id if snap.current_job_id else "-")
+        self.block_counter_var.set(
+            f"Attempts: {snap.block_attempts} / Found: {snap.blocks_found}"
+        )
+
+        # Log text (only lines added since the last refresh)
+        self.log_view.refresh()
 
         # --- Compact UI update (if active) ---
 
@@ -900,17 +1070,44 @@ class MadGoodMinerApp:
                 self.comp_uptime_label.config(text=f"Uptime: {self.uptime_var.get()}")
             if self.comp_hashrate_label is not None:
                 self.comp_hashrate_label.config(text=f"Hashrate: {self.hashrate_var.get()}")
+            if self.comp_rates_label is not None:
+                self.comp_rates_label.config(text=self.compact_rates_text)
             if self.comp_attempts_label is not None:
-                self.comp_attempts_label.config(
-                    text=f"Attempts: {block_attempts} / Found: {blocks_found}"
-                )
+                self.comp_attempts_label.config(text=self.block_counter_var.get())
             if self.comp_conn_light is not None:
-                self.comp_conn_light.config(fg="green" if connected_to_pool else "red")
+                self.comp_conn_light.config(fg="green" if snap.connected else "red")
             if self.comp_mining_light is not None:
-                self.comp_mining_light.config(fg="green" if mining else "gray")
+                self.comp_mining_light.config(fg="green" if snap.mining else "gray")
             if self.comp_status_label is not None:
                 self.comp_status_label.config(text=f"Status: {self.status_var.get()}")
 
+    def render_rate_stats(self, now: float):
+        """
+        Dashboard table and compact-mode line from the hashrate statistics.
+        """
+        from madgood.ratestats import format_rate, rate_unit
+
+        summary = self.stats.rates.summary(now)
+        if not summary.samples:
+            self.rate_stats_var.set("")
+            self.compact_rates_text = ""
+            return
+        # One unit for the whole table so the columns line up.
+        unit, scale = rate_unit(summary.ewma)
+        rows = [f"EWMA {format_rate(summary.ewma)}",
+                f"{'':>3} {'mean':>7} {'min':>7} {'max':>7} {'p50':>7} {'p95':>7}  {unit}"]
+        for w in summary.windows:
+            if w.count:
+                rows.append(" ".join([f"{w.name:>3}"] + [
+                    f"{v / scale:7.2f}" for v in (w.mean, w.low, w.high, w.p50, w.p95)
+                ]))
+        self.rate_stats_var.set("\n".join(rows))
+        text = f"Avg: {format_rate(summary.ewma)}"
+        minute = summary.window("1m")
+        if minute is not None and minute.count:
+            text += f"  (1m p50 {format_rate(minute.p50)}, p95 {format_rate(minute.p95)})"
+        self.compact_rates_text = text
+
     # ---------- Compact Mode (with position memory) ----------
 
     def open_compact_mode(self):
@@ -920,6 +1117,7 @@ class MadGoodMinerApp:
         Layout:
           [LOGO]   Uptime: XX
                    Hashrate: XX H/s
+                   Avg: XX MH/s (1m p50 / p95)
                    *Attempts / Found*
 
           [ Signals ]
@@ -943,7 +1141,7 @@ class MadGoodMinerApp:
         if self.compact_geometry:
             self.compact_win.geometry(self.compact_geometry)
         else:
-            self.compact_win.geometry("450x165+100+100")
+            self.compact_win.geometry("450x180+100+100")
 
         self.compact_win.resizable(False, False)
         self.compact_win.protocol("WM_DELETE_WINDOW", self.close_compact_mode)
@@ -958,8 +1156,9 @@ class MadGoodMinerApp:
         self.compact_win.rowconfigure(0, weight=1)
 
         # --- Logo on the left ------------------------------------------------
-        if self.logo_frames:
-            self.comp_logo_label = tk.Label(main, image=self.logo_frames[0], bg=bg)
+        logo = self.gif_cache.photo(0, SMALL_LOGO_SIZE)
+        if logo is not None:
+            self.comp_logo_label = tk.Label(main, image=logo, bg=bg)
         else:
             self.comp_logo_label = tk.Label(main, text="[logo]", bg=bg)
         self.comp_logo_label.grid(row=0, column=0, rowspan=3, sticky="w")
@@ -984,9 +1183,17 @@ class MadGoodMinerApp:
         )
         self.comp_hashrate_label.pack(anchor="w")
 
+        self.comp_rates_label = tk.Label(
+            metrics_frame,
+            text=self.compact_rates_text,
+            bg=bg,
+            font=("Helvetica", 8),
+        )
+        self.comp_rates_label.pack(anchor="w")
+
         self.comp_attempts_label = tk.Label(
             metrics_frame,
-            text=f"Attempts: {block_attempts} / Found: {blocks_found}",
+            text=self.block_counter_var.get(),
             bg=bg,
             font=("Helvetica", 9, "italic"),
         )
@@ -1055,15 +1262,65 @@ class MadGoodMinerApp:
             self.compact_win.destroy()
         self.compact_win = None
         self.root.deiconify()
+        self.update_animations()
 
 
 # ---------------- ENTRY POINT ----------------
 
+def _arg_value(argv, name):
+    if name in argv[:-1]:
+        return argv[argv.index(name) + 1]
+    return None
+
+
+def profile_startup(app, argv):
+    """
+    --profile-startup: once the background work has started, open each
+    lazily built tab once, print the phase report and quit.
+    """
+    if "background started" not in app.startup.marks:
+        app.root.after(20, profile_startup, app, argv)
+        return
+    for tab in (app.info_frame, app.gif_frame, app.miner_frame):
+        app.notebook.select(tab)
+        app.root.update()
+    profile = app.startup
+    print(profile.report())
+
+    out = _arg_value(argv, "--profile-out")
+    if out:
+        startup.save(profile, out)
+    before = _arg_value(argv, "--profile-compare")
+    if before:
+        print(f"\nCompared with {before}:")
+        for row in startup.compare(startup.load(before), profile.as_dict()):
+            print("  " + row)
+    app.root.destroy()
+
+
 def main():
-    root = tk.Tk()
-    app = MadGoodMinerApp(root)
+    argv = sys.argv[1:]
+    if "--bench-parser" in argv:
+        rate = measure_parser_throughput(seconds=2.0)
+        print(f"classify_line: {rate:,.0f} lines/sec")
+        return
+
+    profile = startup.StartupProfile(_LAUNCHED)
+    profile.add("imports", _LAUNCHED, _IMPORTED - _LAUNCHED)
+    with profile.phase("tk.Tk()"):
+        root = tk.Tk()
+    app = MadGoodMinerApp(root, profile)
+    if "--profile-startup" in argv:
+        root.after(0, profile_startup, app, argv)
     root.mainloop()
 
+    # Window closed: stop cpuminer and write out what is still buffered for disk
+    if app.supervisor is not None:
+        app.supervisor.stop()
+    app.stop_history()
+    if app.log_archive is not None:
+        app.log_archive.stop()
+
 
 if __name__ == "__main__":
     main()
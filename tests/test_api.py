@@ -0,0 +1,172 @@
+"""
+ApiPoller against an asyncio server answering like cpuminer-opt's API.
+"""
+import asyncio
+
+from madgood.api import ApiPoller, free_port, parse_summary, parse_threads
+from madgood.events import EventBus
+from madgood.logstore import LogStore
+from madgood.miner import handle_miner_lines
+from madgood.stats import MinerStats
+
+SUMMARY = ("NAME=cpuminer-opt;VER=25.6;API=1.0;ALGO=sha256d;CPUS=2;URL=x;"
+           "HS={hs};KHS={khs};ACC={acc};REJ={rej};SOL=0;ACCMN=0.000;DIFF=0.5;"
+           "TEMP=0.0;FAN=0;FREQ=0;UPTIME=8;TS=1700000000|")
+THREADS = "CPU=0;kH/s=2600.00|CPU=1;kH/s=2531.36|"
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+class FakeApi:
+    """
+    One-shot exchanges: read the command, write the reply, hang up.
+    """
+
+    def __init__(self):
+        self.hashrate = 5131360.0
+        self.accepted = 0
+        self.rejected = 0
+        self.commands = []
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        command = (await reader.read(64)).decode()
+        self.commands.append(command)
+        if command == "summary":
+            reply = SUMMARY.format(hs=f"{self.hashrate:.2f}", khs=f"{self.hashrate / 1e3:.2f}",
+                                   acc=self.accepted, rej=self.rejected)
+        else:
+            reply = THREADS
+        writer.write(reply.encode() + b"\0")
+        await writer.drain()
+        writer.close()
+
+
+def test_parse_summary_and_threads():
+    s = parse_summary(SUMMARY.format(hs="5131356.49", khs="5131.36", acc=3, rej=1))
+    assert s.hashrate == 5131356.49
+    assert (s.accepted, s.rejected, s.difficulty, s.uptime) == (3, 1, 0.5, 8.0)
+    assert s.version == "25.6"
+    assert parse_summary("garbage") is None
+    # Older builds only send KHS.
+    assert parse_summary("KHS=12.5;ACC=0|").hashrate == 12500.0
+    assert parse_threads(THREADS) == (2600000.0, 2531360.0)
+
+
+def test_poll_async_updates_stats():
+    async def main():
+        api = FakeApi()
+        await api.start()
+        stats = MinerStats()
+        stats.start()
+        api.accepted, api.rejected = 4, 1
+        poller = ApiPoller(stats, api.port, interval=0.05)
+        try:
+            assert not poller.healthy
+            assert await poller.poll_async()
+            assert poller.healthy
+            assert api.commands == ["summary", "threads"]
+            snap = stats.snapshot()
+            assert snap.hashrate == 5131360.0
+            assert snap.thread_hashrates == (2600000.0, 2531360.0)
+            assert (snap.shares_accepted, snap.shares_rejected) == (4, 1)
+            assert snap.share_difficulty == 0.5
+            assert stats.rates.summary().samples == 1
+        finally:
+            await api.close()
+
+    run(main())
+
+
+def test_poll_async_counts_failures_when_nothing_listens():
+    async def main():
+        stats = MinerStats()
+        poller = ApiPoller(stats, free_port(), timeout=0.5)
+        assert not await poller.poll_async()
+        assert not await poller.poll_async()
+        assert poller.failures == 2
+        assert not poller.healthy
+        assert stats.snapshot().hashrate == 0.0
+
+    run(main())
+
+
+def test_log_counts_shares_while_unhealthy_and_api_takes_over_without_loss():
+    async def main():
+        api = FakeApi()
+        await api.start()
+        stats, bus, store = MinerStats(), EventBus(), LogStore()
+        stats.start()
+        poller = ApiPoller(stats, api.port, interval=0.05)
+        accepted = "[2025-01-01 00:00:00] 1 Accepted 1 S0 R0 B0, 0.031 sec (31ms)"
+        try:
+            # Before the first answer the log counts shares.
+            handle_miner_lines([accepted], stats, bus, store, api=poller)
+            assert stats.snapshot().shares_accepted == 1
+            api.accepted = 1
+            await poller.poll_async()
+            assert stats.snapshot().shares_accepted == 1
+
+            # Healthy: log lines no longer count, the API does.
+            handle_miner_lines([accepted], stats, bus, store, api=poller)
+            assert stats.snapshot().shares_accepted == 1
+            api.accepted = 2
+            await poller.poll_async()
+            assert stats.snapshot().shares_accepted == 2
+
+            # The API stops answering; the log takes over for two shares.
+            poller.last_ok = 0.0
+            handle_miner_lines([accepted, accepted], stats, bus, store, api=poller)
+            assert stats.snapshot().shares_accepted == 4
+            # Back, but its total only moved by one: the count must not drop,
+            # and later shares add on top of it.
+            api.accepted = 3
+            await poller.poll_async()
+            assert stats.snapshot().shares_accepted == 4
+            api.accepted = 4
+            await poller.poll_async()
+            assert stats.snapshot().shares_accepted == 5
+
+            # Down again and back with the same two shares: no double count.
+            poller.last_ok = 0.0
+            handle_miner_lines([accepted, accepted], stats, bus, store, api=poller)
+            api.accepted = 6
+            await poller.poll_async()
+            assert stats.snapshot().shares_accepted == 7
+        finally:
+            await api.close()
+
+    run(main())
+
+
+def test_run_async_polls_until_cancelled():
+    async def main():
+        api = FakeApi()
+        await api.start()
+        stats = MinerStats()
+        poller = ApiPoller(stats, api.port, interval=0.02)
+        task = asyncio.ensure_future(poller.run_async())
+        try:
+            for _ in range(100):
+                if len(api.commands) >= 4:
+                    break
+                await asyncio.sleep(0.02)
+            assert len(api.commands) >= 4
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await api.close()
+        assert task.cancelled()
+
+    run(main())
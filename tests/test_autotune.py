@@ -0,0 +1,49 @@
+"""
+autotune.measure() over a stand-in cpuminer printing a canned mixed log.
+"""
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from madgood.autotune import benchmark_command, measure
+
+CANNED_LOG = [
+    "[2025-01-01 12:00:00] 2 of 2 miner threads started using 'sha256d' algorithm",
+    "[2025-01-01 12:00:00] Miner TTF @ 80.00 Mh/s 8.2y, Net TTF @ 900.00 Eh/s 10.0m",
+    "[2025-01-01 12:00:01] CPU #0: 9000.00 kH/s",
+    "[2025-01-01 12:00:05] Total: 1000.00 kH/s, Temp: 0C, Freq: 0.000/0.000 GHz",
+    "[2025-01-01 12:00:06] CPU #1: 500.00 kH/s",
+    "[2025-01-01 12:00:10] Total: 2000.00 kH/s, Temp: 0C, Freq: 0.000/0.000 GHz",
+    "[2025-01-01 12:00:11] Miner TTF @ 13.79 Mh/s 4.00m",
+    "[2025-01-01 12:00:15] Total: 3000.00 kH/s, Temp: 0C, Freq: 0.000/0.000 GHz",
+]
+
+
+def _fake_cpuminer(tmp_path) -> str:
+    path = tmp_path / "cpuminer"
+    path.write_text(textwrap.dedent(f"""\
+        #!{sys.executable}
+        import sys, time
+        sys.stdout.write({"".join(line + chr(10) for line in CANNED_LOG)!r})
+        sys.stdout.flush()
+        time.sleep(30)
+    """))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="the stand-in relies on a shebang")
+def test_measure_uses_only_total_reports(tmp_path):
+    binary = _fake_cpuminer(tmp_path)
+    # The first Total is a warm-up; the rest average to 2.5 MH/s per process.
+    assert measure([[0]], pin=False, seconds=0.5, binary=binary) == 2.5e6
+    assert measure([[0], [1]], pin=False, seconds=0.5, binary=binary) == 5e6
+
+
+def test_benchmark_command():
+    assert benchmark_command("cpuminer", 4) == [
+        "cpuminer", "-a", "sha256d", "--benchmark", "-t", "4", "--no-color"]
+    assert benchmark_command("cpuminer", 2, [0, 2])[-2:] == ["--cpu-affinity", "0x5"]
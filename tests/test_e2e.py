@@ -0,0 +1,29 @@
+"""
+The offline --e2e cycle: fake cpuminer, mock pool, real supervisor stack.
+"""
+import json
+import os
+
+from madgood.headless import main
+
+
+def test_e2e_cycle_writes_its_own_report(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("MADGOOD_DATA_DIR", str(tmp_path / "data"))
+    out = tmp_path / "e2e.json"
+    replay_out = tmp_path / "replay.json"
+    environ = dict(os.environ)
+    code = main(["--e2e", "--bench-seconds", "1", "--threads", "1",
+                 "--e2e-out", str(out), "--replay-out", str(replay_out)])
+    assert code == 0
+    # The fake miner's settings went to its process, not ours.
+    assert dict(os.environ) == environ
+
+    result = json.loads(out.read_text())
+    assert result == json.loads(capsys.readouterr().out)
+    assert result["connect_s"] is not None
+    assert result["first_hashrate_s"] is not None
+    assert result["jobs"] > 0
+    assert result["pool"]["connections"] >= 1
+    assert result["stop_s"] < 10
+    # --replay-out belongs to --replay.
+    assert not replay_out.exists()
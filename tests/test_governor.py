@@ -0,0 +1,191 @@
+"""
+Governor.step() against a fake /proc and /sys tree.
+"""
+import os
+import time
+
+from madgood.governor import Governor, read_cpu_times, read_max_temp, read_process_ticks
+
+HZ = 100
+PID = 4242
+
+
+class FakeSystem:
+    """
+    Writes root/proc/stat, root/proc/loadavg, root/proc/<PID>/stat and
+    root/sys/class/thermal/thermal_zone0/temp as the counters advance.
+    """
+
+    def __init__(self, root, cpus: int = 8):
+        self.root = str(root)
+        self.cpus = cpus
+        self.busy = self.idle = self.miner = 0
+        os.makedirs(os.path.join(self.root, "proc", str(PID)))
+        self.write(load=0.0, temp=None)
+
+    def _put(self, rel: str, text: str):
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def write(self, load: float, temp):
+        self._put("proc/stat", f"cpu  {self.busy} 0 0 {self.idle} 0 0 0 0 0 0\ncpu0 0 0 0 0\n")
+        self._put("proc/loadavg", f"{load:.2f} 0.00 0.00 1/100 {PID}\n")
+        self._put(f"proc/{PID}/stat",
+                  f"{PID} (cpu miner) R" + " 0" * 10 + f" {self.miner} 0 0 0\n")
+        zone = os.path.join(self.root, "sys/class/thermal/thermal_zone0/temp")
+        if temp is None:
+            if os.path.exists(zone):
+                os.remove(zone)
+        else:
+            self._put("sys/class/thermal/thermal_zone0/temp", f"{int(temp * 1000)}\n")
+
+    def advance(self, seconds: float = 5.0, cpu_busy: float = 1.0, miner_busy: float = 1.0,
+                load: float = 0.0, temp=50.0):
+        """
+        cpu_busy / miner_busy: fraction of the whole machine over the interval.
+        """
+        ticks = int(seconds * HZ * self.cpus)
+        self.busy += int(ticks * cpu_busy)
+        self.idle += ticks - int(ticks * cpu_busy)
+        self.miner += int(ticks * miner_busy)
+        self.write(load, temp)
+
+
+def _governor(system: FakeSystem, applied, **kwargs):
+    return Governor(system.cpus, applied.append, pids=lambda: [PID], root=system.root,
+                    cpu_count=system.cpus, cooldown=15.0, up_samples=3, **kwargs)
+
+
+def test_readers_parse_the_fake_tree(tmp_path):
+    system = FakeSystem(tmp_path)
+    system.advance(cpu_busy=0.5, miner_busy=0.25, temp=71.5)
+    times = read_cpu_times(system.root)
+    assert times.total == 5 * HZ * 8
+    assert times.busy == times.total // 2
+    assert read_process_ticks([PID, 99999], system.root) == 5 * HZ * 8 // 4
+    assert read_max_temp(system.root) == 71.5
+
+
+def test_first_sample_only_primes(tmp_path):
+    system = FakeSystem(tmp_path)
+    applied = []
+    gov = _governor(system, applied)
+    assert gov.step(1000.0) is None
+    assert applied == []
+
+
+def test_other_work_steps_down_and_idle_steps_back_up(tmp_path):
+    system = FakeSystem(tmp_path)
+    applied, decisions = [], []
+    gov = _governor(system, applied, on_decision=decisions.append)
+    gov.step(1000.0)
+
+    # Machine saturated, the miner only gets half of it: 4 CPUs of other work.
+    system.advance(cpu_busy=1.0, miner_busy=0.5)
+    d = gov.step(1005.0)
+    assert (d.old, d.new) == (8, 6)
+    assert "other work" in d.reason
+    assert applied == [6] and decisions == [d] and gov.active == 6
+
+    # Other work gone: needs up_samples calm samples and the cooldown.
+    for now in (1010.0, 1015.0):
+        system.advance(cpu_busy=0.75, miner_busy=0.75)
+        assert gov.step(now) is None
+    system.advance(cpu_busy=0.75, miner_busy=0.75)
+    d = gov.step(1020.0)
+    assert (d.old, d.new) == (6, 7)
+    assert applied == [6, 7]
+
+
+def test_heat_steps_down_without_cooldown(tmp_path):
+    system = FakeSystem(tmp_path)
+    applied = []
+    gov = _governor(system, applied, temp_high=85.0, temp_low=75.0)
+    gov.step(1000.0)
+    for now, expected in ((1005.0, 7), (1010.0, 6)):
+        system.advance(temp=90.0)
+        d = gov.step(now)
+        assert d.new == expected
+        assert "temp 90C" in d.reason
+    # Between the thresholds nothing moves.
+    for now in (1015.0, 1020.0, 1025.0, 1030.0):
+        system.advance(cpu_busy=0.75, miner_busy=0.75, temp=80.0)
+        assert gov.step(now) is None
+    assert applied == [7, 6]
+
+
+def test_never_below_min_cpus(tmp_path):
+    system = FakeSystem(tmp_path, cpus=2)
+    applied = []
+    gov = _governor(system, applied, min_cpus=1)
+    gov.step(1000.0)
+    for i in range(1, 5):
+        system.advance(temp=99.0)
+        gov.step(1000.0 + 5 * i)
+    assert applied == [1]
+    assert gov.active == 1
+
+
+def test_no_thermal_zone_counts_as_cool(tmp_path):
+    system = FakeSystem(tmp_path)
+    gov = _governor(system, [])
+    gov.active = 4
+    gov.step(1000.0)
+    decision = None
+    for i in range(1, 5):
+        system.advance(cpu_busy=0.5, miner_busy=0.5, temp=None)
+        decision = gov.step(1000.0 + 5 * i) or decision
+    assert decision is not None and decision.new == 5
+    assert "n/a" in decision.reason
+
+
+def test_start_stop_on_a_loop(tmp_path):
+    from madgood.aio import LoopThread
+
+    system = FakeSystem(tmp_path)
+    loop = LoopThread("test-governor")
+    gov = _governor(system, [], interval=0.01, loop=loop)
+    try:
+        gov.start()
+        task = gov._task
+        system.advance(temp=99.0)
+        for _ in range(200):
+            if gov.decisions:
+                break
+            time.sleep(0.01)
+        gov.stop()
+        assert task.done()
+        assert gov.decisions and gov.decisions[0].new == 7
+    finally:
+        loop.stop()
+
+
+def test_unreadable_first_sample_does_not_kill_the_task(tmp_path):
+    from madgood.aio import LoopThread
+
+    system = FakeSystem(tmp_path)
+    calls = []
+
+    def pids():
+        calls.append(1)
+        if len(calls) == 1:
+            raise PermissionError("/proc/4242/stat")
+        return [PID]
+
+    loop = LoopThread("test-governor")
+    gov = Governor(system.cpus, [].append, pids=pids, root=system.root,
+                   cpu_count=system.cpus, interval=0.01, loop=loop)
+    try:
+        gov.start()
+        for _ in range(200):
+            system.advance(temp=99.0)
+            if gov.decisions:
+                break
+            time.sleep(0.01)
+        assert not gov._task.done()
+        assert gov.decisions and gov.decisions[0].new == 7
+    finally:
+        gov.stop()
+        loop.stop()
@@ -0,0 +1,165 @@
+"""
+HistoryStore: round trip, rollups, restarts inside a bucket, trimming.
+"""
+import os
+import time
+
+import pytest
+
+from madgood.history import RECORD_SIZE, HistoryStore
+from madgood.stats import StatsSnapshot
+
+# An hour boundary in the future, so synthetic samples are never "late".
+HOUR = (int(time.time()) // 3600 + 2) * 3600
+
+
+def snap(hashrate, attempts=0, accepted=0, rejected=0, connected=True):
+    return StatsSnapshot(mining=True, connected=connected, hashrate=hashrate,
+                         block_attempts=attempts, shares_accepted=accepted,
+                         shares_rejected=rejected)
+
+
+def mine(store, start, seconds, hashrate, **kwargs):
+    for t in range(start, start + seconds):
+        store.append(t + 0.5, snap(hashrate, **kwargs))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history")
+
+
+def test_round_trip_before_and_after_flush(path):
+    store = HistoryStore(path, flush_interval=1e9)
+    for i in range(10):
+        store.append(HOUR + i, snap(100.0 + i, attempts=i, accepted=i // 2, rejected=i // 5,
+                                    connected=i % 3 != 0))
+    pending = store.read("raw", HOUR, HOUR + 10)
+    assert store.count("raw") == 0
+    store.flush()
+    assert store.count("raw") == 10
+    stored = store.read("raw", HOUR, HOUR + 10)
+    assert stored == pending
+    assert [r.ts for r in stored] == list(range(HOUR, HOUR + 10))
+    r = stored[7]
+    assert (r.hashrate, r.attempts, r.accepted, r.rejected, r.samples, r.connected) == \
+        (107.0, 7, 3, 1, 1, 1)
+    assert store.read("raw", HOUR + 3, HOUR + 5) == stored[3:5]
+    # Late or repeated seconds are dropped.
+    store.append(HOUR + 5, snap(1.0))
+    assert len(store.read("raw", HOUR, HOUR + 100)) == 10
+    assert store.query(HOUR, HOUR + 10) == stored
+
+
+def test_minute_and_hour_rollups(path):
+    store = HistoryStore(path)
+    for i in range(150):
+        store.append(HOUR + i, snap(100.0 if i < 60 else 200.0 + i, attempts=i,
+                                    connected=i >= 30))
+    store.close()
+    minutes = store.read("1m", HOUR, HOUR + 3600)
+    assert [m.ts for m in minutes] == [HOUR, HOUR + 60, HOUR + 120]
+    first, second, partial = minutes
+    assert (first.hashrate, first.hr_min, first.hr_max) == (100.0, 100.0, 100.0)
+    assert (first.samples, first.connected, first.attempts) == (60, 30, 59)
+    assert second.hashrate == pytest.approx(200.0 + sum(range(60, 120)) / 60)
+    assert (second.hr_min, second.hr_max) == (260.0, 319.0)
+    assert (partial.samples, partial.attempts) == (30, 149)
+
+    (hour,) = store.read("1h", HOUR, HOUR + 3600)
+    assert hour.ts == HOUR
+    assert (hour.samples, hour.connected, hour.attempts) == (150, 120, 149)
+    assert (hour.hr_min, hour.hr_max) == (100.0, 349.0)
+    assert hour.hashrate == pytest.approx(sum(r.hashrate * r.samples for r in minutes) / 150)
+    # Long spans come from the coarser tiers.
+    assert store.query(HOUR, HOUR + 86400, max_points=100) == [hour]
+
+
+def test_restart_within_the_hour_keeps_both_sessions(path):
+    first = HistoryStore(path)
+    mine(first, HOUR, 300, 100.0)
+    first.close()
+
+    second = HistoryStore(path)
+    mine(second, HOUR + 300, 53 * 60, 900.0)
+    second.close()
+
+    (hour,) = second.read("1h", HOUR, HOUR + 3600)
+    assert hour.samples == 300 + 53 * 60
+    assert hour.hashrate == pytest.approx((300 * 100.0 + 53 * 60 * 900.0) / hour.samples)
+    assert (hour.hr_min, hour.hr_max) == (100.0, 900.0)
+    minutes = second.read("1m", HOUR, HOUR + 3600)
+    assert [m.ts for m in minutes] == [HOUR + 60 * i for i in range(58)]
+    assert os.path.getsize(os.path.join(path, "1h.bin")) == RECORD_SIZE
+
+
+def test_restart_within_the_minute(path):
+    first = HistoryStore(path)
+    mine(first, HOUR, 20, 100.0)
+    first.close()
+    assert first.read("1m", HOUR, HOUR + 60)[0].samples == 20
+
+    second = HistoryStore(path)
+    mine(second, HOUR + 30, 30, 400.0)
+    # Before the minute closes a reader sees the old partial record once ...
+    assert [m.samples for m in second.read("1m", HOUR, HOUR + 3600)] == [20]
+    mine(second, HOUR + 60, 10, 400.0)
+    # ... and after, only the merged one, flushed or not.
+    assert [m.samples for m in second.read("1m", HOUR, HOUR + 3600)] == [50]
+    second.flush()
+    assert [m.samples for m in second.read("1m", HOUR, HOUR + 3600)] == [50]
+    second.close()
+
+    minute, partial = second.read("1m", HOUR, HOUR + 3600)
+    assert (minute.ts, minute.samples) == (HOUR, 50)
+    assert minute.hashrate == pytest.approx((20 * 100.0 + 30 * 400.0) / 50)
+    assert (partial.ts, partial.samples) == (HOUR + 60, 10)
+    (hour,) = second.read("1h", HOUR, HOUR + 3600)
+    assert hour.samples == 60
+
+
+def test_crash_without_close_is_rebuilt_from_raw(path):
+    first = HistoryStore(path)
+    mine(first, HOUR + 600, 100, 100.0)   # minute 10 done, minute 11 partial
+    first.flush()                          # raw and minute 10 on disk; no close()
+
+    second = HistoryStore(path)
+    mine(second, HOUR + 700, 80, 300.0)
+    second.close()
+
+    minutes = second.read("1m", HOUR, HOUR + 3600)
+    assert [(m.ts - HOUR, m.samples) for m in minutes] == [(600, 60), (660, 60), (720, 60)]
+    assert minutes[1].hashrate == pytest.approx((40 * 100.0 + 20 * 300.0) / 60)
+    (hour,) = second.read("1h", HOUR, HOUR + 3600)
+    assert hour.samples == 180
+
+
+def test_next_hour_after_a_restart(path):
+    first = HistoryStore(path)
+    mine(first, HOUR + 3500, 50, 100.0)
+    first.close()
+    second = HistoryStore(path)
+    mine(second, HOUR + 3550, 120, 200.0)
+    second.close()
+    hours = second.read("1h", HOUR, HOUR + 7200)
+    assert [(h.ts - HOUR, h.samples) for h in hours] == [(0, 100), (3600, 70)]
+
+
+def test_trim_keeps_the_retention_window(path):
+    store = HistoryStore(path, flush_interval=5, retention={"raw": 100})
+    mine(store, HOUR, 1000, 100.0)
+    store.flush()
+    size = os.path.getsize(os.path.join(path, "raw.bin"))
+    assert size <= 2 * 100 * RECORD_SIZE + 5 * RECORD_SIZE
+    records = store.read("raw", 0, HOUR + 2000)
+    assert records[-1].ts == HOUR + 999
+    assert records[0].ts >= HOUR + 999 - 2 * 100 - 5
+    assert [r.ts for r in records] == list(range(records[0].ts, HOUR + 1000))
+    # Trimming raw never touches the minute tier.
+    assert len(store.read("1m", HOUR, HOUR + 2000)) == 16
+
+    # A restart after trimming still resumes where it left off.
+    store.close()
+    again = HistoryStore(path, retention={"raw": 100})
+    again.append(HOUR + 999, snap(1.0))
+    assert again.read("raw", HOUR + 990, HOUR + 2000)[-1].hashrate == 100.0
@@ -0,0 +1,123 @@
+"""
+InProcessMiner: mock pool -> WorkGenerator -> HashingPool -> mining.submit.
+"""
+import asyncio
+import json
+
+from madgood.inprocess import InProcessMiner
+from madgood.mockpool import MockPool
+from madgood.sha256d import hash_meets_target, sha256d, target_from_difficulty
+from madgood.stats import MinerStats
+from madgood.stratum import StratumJob
+from madgood.work import JobTemplate
+
+# About one share per 65k hashes, so the hashlib engine finds several a second.
+DIFFICULTY = 2.0 ** -16
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 30))
+
+
+class RecordingPool(MockPool):
+    """
+    MockPool that keeps every submit along with the session's extranonce1
+    and the job it names.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(difficulty=DIFFICULTY, **kwargs)
+        self.jobs_by_id = {}
+        self.submitted = []
+
+    def _new_job(self, new_block):
+        super()._new_job(new_block)
+        params = json.loads(self._notify)["params"]
+        self.jobs_by_id[params[0]] = params
+
+    def _handle(self, client, msg):
+        if msg.get("method") == "mining.submit":
+            params = msg["params"]
+            self.submitted.append((client.extranonce1, self.jobs_by_id[params[1]], params))
+        super()._handle(client, msg)
+
+
+def _check_share(extranonce1, notify, params):
+    _, job_id, extranonce2, ntime, nonce = params
+    assert job_id == notify[0]
+    job = StratumJob.from_params(notify, 0.0, DIFFICULTY)
+    tmpl = JobTemplate(job, extranonce1, len(extranonce2) // 2)
+    header = tmpl.header(tmpl.merkle_root(bytes.fromhex(extranonce2)), int(ntime, 16))
+    header = header[:76] + int(nonce, 16).to_bytes(4, "little")
+    assert hash_meets_target(sha256d(header), target_from_difficulty(DIFFICULTY))
+
+
+async def _wait_for(predicate, timeout=15.0):
+    for _ in range(int(timeout / 0.05)):
+        if predicate():
+            return True
+        await asyncio.sleep(0.05)
+    return predicate()
+
+
+def test_mines_and_submits_valid_shares():
+    async def main():
+        pool = RecordingPool()
+        await pool.start()
+        stats = MinerStats()
+        stats.start()
+        miner = InProcessMiner("bc1qinproc", stats, workers=1, engine="hashlib",
+                               pool_host=pool.host, pool_port=pool.port)
+        miner.start()
+        runner = asyncio.ensure_future(miner.run(poll=0.01))
+        try:
+            assert await _wait_for(lambda: stats.snapshot().shares_accepted >= 3)
+            assert await _wait_for(lambda: stats.snapshot().hashrate > 0)
+            snap = stats.snapshot()
+            assert snap.connected
+            assert snap.block_attempts == 1 and snap.current_job_id == "1"
+            assert snap.share_difficulty == DIFFICULTY
+            assert pool.stats().connections == 1
+            for extranonce1, notify, params in pool.submitted:
+                _check_share(extranonce1, notify, params)
+        finally:
+            await miner.close()
+            await asyncio.wait_for(runner, 5)
+            await pool.close()
+        assert stats.snapshot().hashrate == 0.0
+
+    run(main())
+
+
+def test_new_job_and_reconnect_switch_the_work():
+    async def main():
+        pool = RecordingPool()
+        await pool.start()
+        stats = MinerStats()
+        miner = InProcessMiner("bc1qinproc", stats, workers=2, engine="hashlib",
+                               pool_host=pool.host, pool_port=pool.port)
+        miner.start()
+        runner = asyncio.ensure_future(miner.run(retry_delay=0.05, poll=0.01))
+        try:
+            assert await _wait_for(lambda: pool.submitted)
+            pool._new_job(True)
+            assert await _wait_for(lambda: any(p[1] == "2" for _, _, p in pool.submitted))
+            # Job 1 was cleaned: nothing found for it after that goes out.
+            cleaned = next(i for i, (_, _, p) in enumerate(pool.submitted) if p[1] == "2")
+            assert all(p[1] == "2" for _, _, p in pool.submitted[cleaned:])
+
+            # Drop the session: the miner reconnects under a new extranonce1
+            # and its shares are valid for that one.
+            for c in list(pool._clients.values()):
+                c.writer.close()
+            assert await _wait_for(lambda: miner.connects == 2)
+            assert await _wait_for(lambda: any(en1 == "00000002" for en1, _, _ in pool.submitted))
+            for extranonce1, notify, params in pool.submitted:
+                _check_share(extranonce1, notify, params)
+            assert stats.snapshot().shares_rejected == 0
+        finally:
+            await miner.close()
+            await asyncio.wait_for(runner, 5)
+            await pool.close()
+
+    run(main())
@@ -0,0 +1,114 @@
+"""
+LogArchive: rotation, max_segments, tail across segments, search(since=...).
+"""
+import gzip
+import os
+import types
+
+import pytest
+
+from madgood import logarchive
+from madgood.logarchive import LogArchive
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Block times come from time.time() when lines are queued.
+    now = [1000.0]
+    monkeypatch.setattr(logarchive, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def lines(start, count):
+    return [f"line {i}" for i in range(start, start + count)]
+
+
+def archive(tmp_path, **kwargs):
+    # segment_bytes=1: every block after the first opens a new segment.
+    kwargs.setdefault("segment_bytes", 1)
+    kwargs.setdefault("block_lines", 10)
+    return LogArchive(str(tmp_path / "logs"), **kwargs)
+
+
+def test_blocks_rotate_and_old_segments_go(tmp_path):
+    a = archive(tmp_path, max_segments=4)
+    a.write(lines(0, 95))
+    a.flush()
+    segments = a.segments()
+    assert [seq for seq, _ in segments] == [7, 8, 9, 10]
+    assert sorted(os.listdir(a.path)) == sorted(
+        f"miner-{seq:06d}.{ext}" for seq in (7, 8, 9, 10) for ext in ("log.gz", "idx"))
+    # Each segment is a plain .gz file and its index numbers lines archive-wide.
+    with gzip.open(segments[0][1], "rt") as f:
+        assert f.read().splitlines() == lines(60, 10)
+    assert [(b.first_line, b.lines) for b in a.read_index(10)] == [(90, 5)]
+
+
+def test_large_segments_hold_many_blocks(tmp_path):
+    a = archive(tmp_path, segment_bytes=1 << 20)
+    for i in range(5):
+        a.write(lines(i * 7, 7))
+    a.flush()
+    (seq, path), = a.segments()
+    assert [(b.first_line, b.lines) for b in a.read_index(seq)] == [(0, 10), (10, 10), (20, 10), (30, 5)]
+    with gzip.open(path, "rt") as f:
+        assert f.read().splitlines() == lines(0, 35)
+
+
+def test_tail_spans_segments_and_the_queue(tmp_path):
+    a = archive(tmp_path, max_segments=3)
+    a.write(lines(0, 50))
+    a.flush()
+    a.write(lines(50, 3))  # still queued
+    assert a.tail(3) == lines(50, 3)
+    assert a.tail(17) == lines(36, 17)
+    assert a.tail(25) == lines(28, 25)
+    # Only three segments (lines 20-49) are left on disk.
+    assert a.tail(1000) == lines(20, 33)
+    assert a.tail(0) == []
+
+
+def test_reopening_continues_the_numbering(tmp_path):
+    a = archive(tmp_path, max_segments=3)
+    a.write(lines(0, 25))
+    a.stop()
+    b = archive(tmp_path, max_segments=3)
+    b.write(lines(25, 10))
+    b.flush()
+    assert b.tail(15) == lines(20, 15)
+    assert b.search("line 3")[-1] == (34, "line 34")
+
+
+def test_search_since_skips_old_blocks(tmp_path, clock):
+    a = archive(tmp_path, segment_bytes=1 << 20)
+    for start in (0, 10, 20):
+        a.write(lines(start, 10))
+        a.flush()
+        clock[0] += 100.0   # blocks at 1000, 1100 and 1200
+    assert [b.time for b in a.read_index(1)] == [1000.0, 1100.0, 1200.0]
+
+    def numbers(**kwargs):
+        return [n for n, _ in a.search("line", **kwargs)]
+
+    assert numbers() == list(range(30))
+    # A block may hold lines queued up to the next block's time, so it is
+    # kept while that time is not before `since`.
+    assert numbers(since=1099.0) == list(range(30))
+    assert numbers(since=1100.0) == list(range(30))
+    assert numbers(since=1100.5) == list(range(10, 30))
+    assert numbers(since=1250.0) == list(range(20, 30))
+    assert numbers(since=1250.0, limit=3) == [20, 21, 22]
+
+
+def test_search_since_across_segments(tmp_path, clock):
+    a = archive(tmp_path)
+    for start in range(0, 40, 10):
+        a.write(lines(start, 10))
+        a.flush()
+        clock[0] += 60.0   # one block per segment, at 1000, 1060, 1120, 1180
+    assert len(a.segments()) == 4
+    assert a.search("line 1", since=1100.0) == [(10, "line 10")] + \
+        [(i, f"line {i}") for i in range(11, 20)]
+    assert a.search("LINE 3", since=1170.0) == [(i, f"line {i}") for i in range(30, 40)]
+    assert a.search(r"line [23]5$", regex=True, since=1130.0) == [(25, "line 25"), (35, "line 35")]
+    assert a.search("line", ignore_case=False, since=2000.0) == [(i, f"line {i}") for i in range(30, 40)]
@@ -0,0 +1,175 @@
+"""
+NetworkFetcher TTLs, ETag revalidation and backoff against a local HTTP server.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from madgood.network import (
+    NetworkFetcher,
+    Provider,
+    _height_from_log,
+    _parse_coingecko_price,
+    _parse_height,
+)
+from madgood.stats import MinerStats
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        site = self.server.site
+        site.requests.append((self.path, self.headers.get("If-None-Match")))
+        if site.fail.get(self.path):
+            self.send_response(500)
+            self.end_headers()
+            return
+        body, etag = site.bodies[self.path]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeSite:
+    def __init__(self):
+        self.requests = []
+        self.fail = {}
+        self.bodies = {
+            "/height": ("930001\n", '"h1"'),
+            "/price": (json.dumps({"bitcoin": {"usd": 65000.5}}), '"p1"'),
+        }
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.site = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+    def paths(self):
+        return sorted(path for path, _ in self.requests)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def site():
+    s = FakeSite()
+    yield s
+    s.close()
+
+
+def _fetcher(site, stats, **kwargs):
+    providers = [
+        Provider("block height", site.url("/height"), "block_height", _parse_height,
+                 ttl=120.0, skip=_height_from_log),
+        Provider("btc price", site.url("/price"), "btc_price_usd", _parse_coingecko_price,
+                 ttl=300.0),
+    ]
+    return NetworkFetcher(stats, providers, timeout=2.0, **kwargs)
+
+
+def fetch(fetcher, now=None) -> bool:
+    return asyncio.run(fetcher.run_once_async(now))
+
+
+def test_fetches_due_providers_then_waits_for_ttl(site):
+    stats = MinerStats()
+    fetcher = _fetcher(site, stats)
+    try:
+        assert fetch(fetcher)
+        snap = stats.snapshot()
+        assert (snap.block_height, snap.btc_price_usd) == (930001, 65000.5)
+        assert site.paths() == ["/height", "/price"]
+
+        # Nothing is due inside the TTL.
+        assert not fetch(fetcher)
+        assert len(site.requests) == 2
+        assert 110 < fetcher.seconds_until_due() <= 120
+    finally:
+        fetcher.close()
+
+
+def test_revalidates_with_etag(site):
+    stats = MinerStats()
+    fetcher = _fetcher(site, stats)
+    try:
+        fetch(fetcher)
+        later = time.time() + 301
+        assert not fetch(fetcher, later)  # both 304
+        assert sorted(site.requests[2:]) == [("/height", '"h1"'), ("/price", '"p1"')]
+        assert stats.snapshot().block_height == 930001
+
+        site.bodies["/price"] = (json.dumps({"bitcoin": {"usd": 66000.0}}), '"p2"')
+        assert fetch(fetcher, time.time() + 301)
+        assert stats.snapshot().btc_price_usd == 66000.0
+        assert fetcher.state["btc price"].etag == '"p2"'
+    finally:
+        fetcher.close()
+
+
+def test_failing_provider_backs_off_while_the_other_updates(site):
+    stats = MinerStats()
+    site.fail["/height"] = True
+    fetcher = _fetcher(site, stats, backoff_base=10.0, backoff_max=100.0)
+    try:
+        start = time.time()
+        assert fetch(fetcher)
+        assert stats.snapshot().btc_price_usd == 65000.5
+        assert stats.snapshot().block_height == 0
+        height = fetcher.state["block height"]
+        assert height.failures == 1 and height.error
+        assert start + 5 <= height.next_at <= time.time() + 15
+
+        # Each failure doubles the delay (with +-50% jitter), up to the cap.
+        for failures in (2, 3, 4, 5):
+            fetch(fetcher, height.next_at)
+            assert height.failures == failures
+        assert height.next_at - time.time() <= 100 * 1.5
+
+        # Recovery resets the count and schedules by TTL again.
+        site.fail.clear()
+        assert fetch(fetcher, height.next_at)
+        assert height.failures == 0 and height.error is None
+        assert stats.snapshot().block_height == 930001
+    finally:
+        fetcher.close()
+
+
+def test_block_height_not_polled_while_the_log_reports_it(site):
+    stats = MinerStats()
+    stats.record_block_height(930005)
+    fetcher = _fetcher(site, stats)
+    try:
+        fetch(fetcher)
+        assert site.paths() == ["/price"]
+        assert stats.snapshot().block_height == 930005
+    finally:
+        fetcher.close()
+
+
+def test_newer_height_from_log_is_not_overwritten(site):
+    stats = MinerStats()
+    fetcher = _fetcher(site, stats)
+    try:
+        # The log reported a newer height long enough ago that polling resumed.
+        stats.update(block_height=930010, block_height_at=time.time() - 1000)
+        fetch(fetcher)
+        assert stats.snapshot().block_height == 930010
+    finally:
+        fetcher.close()
@@ -0,0 +1,112 @@
+"""
+classify_line() over the sample and replay lines, one table row per case.
+"""
+import pytest
+
+from madgood.parsing import (
+    EVENT_BLOCK_FOUND,
+    EVENT_CONN_FAILED,
+    EVENT_CONNECTED,
+    EVENT_CONNECTING,
+    EVENT_ERROR,
+    EVENT_EXTRANONCE,
+    EVENT_HASHRATE,
+    EVENT_HEIGHT,
+    EVENT_JOB,
+    EVENT_REJECT,
+    EVENT_SHARE,
+    EVENT_SUBMIT,
+    SAMPLE_MINER_LOG,
+    PipeLineSplitter,
+    classify_line,
+    parse_hashrate_from_line,
+)
+from madgood.replay import SCENARIOS
+
+TS = "[2025-01-01 12:00:00] "
+
+CASES = [
+    # (line, kind, value, height); kind None = nothing to track
+    (TS + "4 of 4 miner threads started using 'sha256d' algorithm", None, None, 0),
+    (TS + "Starting Stratum on stratum+tcp://solo.ckpool.org:3333", None, None, 0),
+
+    # Hashrate
+    (TS + "Total: 13784.22 kH/s, Temp: 0C, Freq: 0.000/0.000 GHz", EVENT_HASHRATE, 13784220.0, 0),
+    ("Hash rate         13.16Mh/s     13.22Mh/s   (13.16Mh/s)", EVENT_HASHRATE, 13160000.0, 0),
+    # TTF: the miner's own figure, not the network's that follows it.
+    (TS + "Miner TTF @ 13.79 Mh/s 4.00m, Net TTF @ 600.00 Eh/s 9.99y", EVENT_HASHRATE, 13790000.0, 0),
+    (TS + "Miner TTF @ 80.00 h/s 1y", EVENT_HASHRATE, 80.0, 0),
+    # Per-thread lines are hashrate events too (as before the classifier);
+    # consumers that want machine totals check for "Total:" themselves.
+    ("CPU #0: 3.29 MH/s", EVENT_HASHRATE, 3290000.0, 0),
+    (TS + "CPU #3: 5012.00 kH/s", EVENT_HASHRATE, 5012000.0, 0),
+    (TS + "CPU #3 bound to CPU 3", None, None, 0),
+
+    # Shares
+    (TS + "1 Accepted 1 S0 R0 B0, 0.210 sec (35ms)", EVENT_SHARE, 0.0, 0),
+    (TS + "1 Accepted 1 S0 R0 B0, 0.21 sec (12.5 kH/s)", EVENT_SHARE, 12500.0, 0),
+    (TS + "2 Rejected 1 S0 R1 B0, 0.2 sec", EVENT_REJECT, None, 0),
+    (TS + "1 Submitted Diff 1.2, Block 876544, Job 67a1b2c3000002", EVENT_SUBMIT, "67a1b2c3000002", 876544),
+    # Periodic report rows start with the keyword and carry no event.
+    ("Accepted              1            1    100.0%", None, None, 0),
+    ("Rejected              0            0      0.0%", None, None, 0),
+
+    # Jobs and blocks
+    (TS + "New Stratum Diff 1, Block 876543, Tx 3120, Job 67a1b2c3000001", EVENT_JOB, "67a1b2c3000001", 876543),
+    (TS + "New Block 876544, Tx 2871, Net Diff 1.1e+14, Job 67a1b2c3000002", EVENT_JOB, "67a1b2c3000002", 876544),
+    (TS + "New Work: Block 123, Job ab12", EVENT_JOB, "ab12", 123),
+    (TS + "New Stratum Diff 1, Block 876543", EVENT_CONNECTED, None, 876543),
+    (TS + "Block 930001, diff", EVENT_HEIGHT, None, 930001),
+    (TS + "YAY!!! block solved", EVENT_BLOCK_FOUND, None, 0),
+    (TS + "Accepted 1 S0 R0 B1, BLOCK FOUND", EVENT_BLOCK_FOUND, None, 0),
+
+    # Connection
+    (TS + "Stratum connection established", EVENT_CONNECTED, None, 0),
+    (TS + "Stratum connection interrupted", EVENT_CONNECTING, None, 0),
+    (TS + "Stratum connecting to solo.ckpool.org", EVENT_CONNECTING, None, 0),
+    (TS + "Stratum connection failed: Connection refused", EVENT_CONN_FAILED, None, 0),
+    (TS + "Stratum authentication failed", EVENT_CONN_FAILED, None, 0),
+    (TS + "Stratum extranonce1 0x1a2b3c4d, extranonce2 size 8", EVENT_EXTRANONCE, "1a2b3c4d", 0),
+
+    # Errors and debug noise
+    (TS + "Something error here", EVENT_ERROR, None, 0),
+    (TS + "DEBUG: hash_count 1006611292580, nonce 0x9a9a80fd", None, None, 0),
+    ('< {"id":null,"method":"mining.ping","params":[]}', None, None, 0),
+    ("", None, None, 0),
+]
+
+
+@pytest.mark.parametrize("line, kind, value, height", CASES)
+def test_classify_line(line, kind, value, height):
+    ev = classify_line(line)
+    if kind is None:
+        assert ev is None
+        return
+    assert (ev.kind, ev.value, ev.height) == (kind, value, height)
+    assert ev.line == line
+
+
+def test_sample_log_covers_the_main_kinds():
+    kinds = {ev.kind for ev in map(classify_line, SAMPLE_MINER_LOG) if ev}
+    assert {EVENT_HASHRATE, EVENT_JOB, EVENT_SUBMIT, EVENT_SHARE, EVENT_CONNECTED,
+            EVENT_CONNECTING, EVENT_EXTRANONCE} <= kinds
+
+
+@pytest.mark.parametrize("name", ["startup", "steady", "reconnect", "debug"])
+def test_hashrate_agrees_with_the_old_parser(name):
+    seen = 0
+    for _, line in list(SCENARIOS[name]())[:5000]:
+        ev = classify_line(line)
+        if ev is not None and ev.kind == EVENT_HASHRATE:
+            assert ev.value == parse_hashrate_from_line(line)
+            seen += 1
+    assert seen
+
+
+def test_pipe_splitter_carries_partial_lines():
+    s = PipeLineSplitter()
+    assert s.feed(b"\x1b[01;37m[x] Stratum connection est") == []
+    assert s.feed(b"ablished\x1b[0m\r\n\n[x] Total: 1") == ["[x] Stratum connection established"]
+    assert s.feed(b"2 kH/s") == []
+    assert s.finish() == ["[x] Total: 12 kH/s"]
+    assert s.finish() == []
@@ -0,0 +1,194 @@
+"""
+StratumProxy between the mock pool and raw downstream connections.
+"""
+import asyncio
+import json
+
+from madgood.mockpool import MockPool
+from madgood.proxy import StratumProxy
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+class _Miner:
+    """
+    A downstream speaking line-delimited JSON by hand, so tests can send
+    anything.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.notifies = []
+
+    @classmethod
+    async def connect(cls, proxy: StratumProxy):
+        reader, writer = await asyncio.open_connection("127.0.0.1", proxy.listen_port)
+        return cls(reader, writer)
+
+    async def send(self, msg):
+        data = msg if isinstance(msg, bytes) else json.dumps(msg).encode() + b"\n"
+        self.writer.write(data)
+        await self.writer.drain()
+
+    async def reply(self, msg_id):
+        while True:
+            msg = json.loads(await asyncio.wait_for(self.reader.readline(), 3))
+            if msg.get("method") == "mining.notify":
+                self.notifies.append(msg["params"])
+            elif msg.get("id") == msg_id:
+                return msg
+
+    async def call(self, msg_id, method, params):
+        await self.send({"id": msg_id, "method": method, "params": params})
+        return await self.reply(msg_id)
+
+    async def login(self):
+        sub = await self.call(1, "mining.subscribe", ["test/1.0"])
+        auth = await self.call(2, "mining.authorize", ["w1", "x"])
+        return sub, auth
+
+    def close(self):
+        self.writer.close()
+
+
+async def _start(pool_kwargs=None):
+    pool = MockPool(**(pool_kwargs or {}))
+    await pool.start()
+    proxy = StratumProxy("bc1qproxy", upstream_host=pool.host, upstream_port=pool.port,
+                         listen_port=0)
+    await proxy.start()
+    runner = asyncio.ensure_future(proxy.run(retry_delay=0.05))
+    await asyncio.wait_for(proxy._ready.wait(), 3)
+    return pool, proxy, runner
+
+
+async def _stop(pool, proxy, runner):
+    await proxy.close()
+    await asyncio.wait_for(runner, 3)
+    await pool.close()
+
+
+def test_downstreams_get_disjoint_extranonces_and_jobs():
+    async def main():
+        pool, proxy, runner = await _start({"extranonce2_size": 8})
+        a = await _Miner.connect(proxy)
+        b = await _Miner.connect(proxy)
+        try:
+            (sub_a, auth_a), (sub_b, auth_b) = await a.login(), await b.login()
+            assert auth_a["result"] is True and auth_b["result"] is True
+            en1_a, size_a = sub_a["result"][1:]
+            en1_b, size_b = sub_b["result"][1:]
+            assert size_a == size_b == 7
+            assert en1_a != en1_b
+            assert en1_a.startswith(proxy.upstream.extranonce1)
+            pool._new_job(False)
+            await a.call(3, "mining.extranonce.subscribe", [])
+            assert a.notifies and a.notifies[-1][0] == "2"
+            # One upstream session for both miners.
+            assert pool.stats().connections == 1
+        finally:
+            a.close()
+            b.close()
+            await _stop(pool, proxy, runner)
+
+    run(main())
+
+
+def test_submits_are_forwarded_and_counted():
+    async def main():
+        pool, proxy, runner = await _start({"reject_every": 2})
+        miner = await _Miner.connect(proxy)
+        try:
+            await miner.login()
+            size = proxy.extranonce2_size
+            ok = await miner.call(10, "mining.submit", ["w1", "1", "00" * size, "00000000", "00000000"])
+            bad = await miner.call(11, "mining.submit", ["w1", "1", "01" * size, "00000000", "00000001"])
+            assert ok["result"] is True and ok["error"] is None
+            assert bad["result"] is False and bad["error"][0] == 23
+            stats = proxy.stats()
+            assert (stats.shares_accepted, stats.shares_rejected) == (1, 1)
+        finally:
+            miner.close()
+            await _stop(pool, proxy, runner)
+
+    run(main())
+
+
+def test_non_object_and_undecodable_lines_are_skipped():
+    async def main():
+        pool, proxy, runner = await _start()
+        miner = await _Miner.connect(proxy)
+        try:
+            for line in (b"[1, 2]\n", b"7\n", b'"text"\n', b"{oops\n"):
+                await miner.send(line)
+            sub, auth = await miner.login()
+            assert auth["result"] is True
+            assert proxy.stats().downstreams == 1
+        finally:
+            miner.close()
+            await _stop(pool, proxy, runner)
+
+    run(main())
+
+
+def test_bad_submit_params_are_rejected():
+    async def main():
+        pool, proxy, runner = await _start()
+        miner = await _Miner.connect(proxy)
+        try:
+            await miner.login()
+            for msg_id, params in ((20, ["w1", "1"]), (21, {"job": "1"}), (22, 5),
+                                   (23, ["w1", "1", "00", "00000000", "00000000"]),
+                                   (24, ["w1", "1", 7, "00000000", "00000000"])):
+                reply = await miner.call(msg_id, "mining.submit", params)
+                assert reply["result"] is None
+                assert reply["error"][0] == 20
+            assert pool.stats().submits == 0
+        finally:
+            miner.close()
+            await _stop(pool, proxy, runner)
+
+    run(main())
+
+
+def test_submit_without_upstream_is_stale_not_a_crash():
+    async def main():
+        proxy = StratumProxy("bc1qproxy", upstream_host="127.0.0.1", upstream_port=1,
+                             listen_port=0)
+        await proxy.start()
+        miner = await _Miner.connect(proxy)
+        try:
+            reply = await miner.call(1, "mining.submit", ["w1", "1", "0000", "00000000", "00000000"])
+            assert reply["result"] is None
+            assert reply["error"][1] == "Stale or malformed share"
+            assert proxy.stats().downstreams == 1
+        finally:
+            miner.close()
+            await proxy.close()
+
+    run(main())
+
+
+def test_upstream_loss_drops_downstreams_and_reconnects():
+    async def main():
+        pool, proxy, runner = await _start()
+        miner = await _Miner.connect(proxy)
+        try:
+            await miner.login()
+            for c in list(pool._clients.values()):
+                c.writer.close()
+            await asyncio.wait_for(miner.reader.read(), 3)  # the proxy hangs up
+            assert miner.reader.at_eof()
+            for _ in range(100):
+                if proxy.upstream_connects == 2 and proxy._ready.is_set():
+                    break
+                await asyncio.sleep(0.02)
+            assert proxy.upstream_connects == 2
+        finally:
+            miner.close()
+            await _stop(pool, proxy, runner)
+
+    run(main())
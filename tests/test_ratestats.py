@@ -0,0 +1,107 @@
+"""
+RateStats windows against numpy.percentile over the samples still in them.
+"""
+import math
+
+import pytest
+
+from madgood.ratestats import P2Quantile, RateStats, RollingWindow, format_rate
+
+np = pytest.importorskip("numpy")
+
+
+def live_samples(window, samples, now):
+    # What the window should still hold: whole buckets, newest len(ring).
+    oldest = int(now // window.span) - len(window.ring) + 1
+    return [x for t, x in samples if int(t // window.span) >= oldest]
+
+
+def feed(window, values, step, start=0.0):
+    samples = [(start + i * step, x) for i, x in enumerate(values)]
+    for t, x in samples:
+        window.add(x, t)
+    return samples, samples[-1][0]
+
+
+@pytest.mark.parametrize("p", [1, 2, 5])
+def test_exact_below_six_samples(p):
+    rng = np.random.default_rng(p)
+    values = list(rng.normal(5e6, 1e6, p))
+    for q in (0.5, 0.95):
+        sketch = P2Quantile(q)
+        for x in values:
+            sketch.add(x)
+        assert sketch.exact()
+        assert sketch.value() == pytest.approx(np.percentile(values, q * 100), rel=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_exact_when_every_bucket_has_at_most_five(seed):
+    rng = np.random.default_rng(seed)
+    window = RollingWindow("1m", 60.0, 12)
+    # Two samples a bucket with some repeats, across more than a window,
+    # so whole buckets have fallen out.
+    values = list(rng.choice(rng.normal(5e6, 1e6, 20), 40))
+    samples, now = feed(window, values, 2.5)
+    live = live_samples(window, samples, now)
+    s = window.stats(now)
+    assert s.count == len(live) < len(values)
+    assert s.mean == pytest.approx(np.mean(live))
+    assert (s.low, s.high) == (min(live), max(live))
+    assert s.p50 == pytest.approx(np.percentile(live, 50), rel=1e-12)
+    assert s.p95 == pytest.approx(np.percentile(live, 95), rel=1e-12)
+
+
+@pytest.mark.parametrize("dist", ["normal", "lognormal", "uniform"])
+@pytest.mark.parametrize("name,seconds,buckets,step", [
+    ("1m", 60.0, 12, 0.1), ("15m", 900.0, 15, 1.0), ("1h", 3600.0, 12, 5.0)])
+def test_windowed_quantiles_track_numpy(dist, name, seconds, buckets, step):
+    rng = np.random.default_rng(7)
+    values = {
+        "normal": lambda n: rng.normal(5e6, 3e5, n),
+        "lognormal": lambda n: rng.lognormal(15, 0.3, n),
+        "uniform": lambda n: rng.uniform(1e6, 2e6, n),
+    }[dist](3000)
+    window = RollingWindow(name, seconds, buckets)
+    samples, now = feed(window, list(values), step)
+    live = live_samples(window, samples, now)
+    s = window.stats(now)
+    assert s.count == len(live)
+    spread = np.std(live)
+    assert abs(s.p50 - np.percentile(live, 50)) < 0.25 * spread
+    assert abs(s.p95 - np.percentile(live, 95)) < 0.25 * spread
+    assert s.low <= s.p50 <= s.p95 <= s.high
+
+
+def test_old_buckets_leave_the_window():
+    rates = RateStats()
+    for i in range(600):
+        rates.add(10e6, i * 0.1)          # first minute at 10 MH/s
+    for i in range(600, 1200):
+        rates.add(5e6 + (i % 7), i * 0.1)  # then 5 MH/s
+    s = rates.summary(119.9)
+    one_minute = s.window("1m")
+    assert one_minute.high < 6e6
+    assert one_minute.p50 == pytest.approx(5e6 + 3, abs=4)
+    assert one_minute.p95 == pytest.approx(5e6 + 6, abs=4)
+    fifteen = s.window("15m")
+    assert fifteen.count == 1200
+    # Marker CDFs interpolate across the gap between the two rates.
+    assert 5e6 <= fifteen.p50 < fifteen.p95 <= fifteen.high == 10e6
+    assert fifteen.p95 > 9e6
+    assert s.samples == 1200
+    # Past the last bucket nothing is left.
+    assert rates.summary(10_000.0).window("1h").count == 0
+
+
+def test_ewma_and_ignored_rates():
+    rates = RateStats(tau=30.0)
+    rates.add(0.0, 0.0)
+    rates.add(-1.0, 0.0)
+    assert rates.summary(0.0).samples == 0
+    rates.add(100.0, 0.0)
+    rates.add(200.0, 30.0)
+    assert rates.summary(30.0).ewma == pytest.approx(200.0 - 100.0 / math.e)
+    rates.reset()
+    assert rates.summary(30.0) == rates.summary(0.0)
+    assert format_rate(5131356.49) == "5.13 MH/s"
@@ -0,0 +1,79 @@
+"""
+The built-in sha256d engines against the genesis block and each other.
+"""
+import os
+import struct
+
+import pytest
+
+from madgood.sha256d import (
+    DIFF1_TARGET,
+    get_engine,
+    hash_meets_target,
+    np,
+    scan_hashlib,
+    scan_numpy,
+    sha256d,
+    target_from_difficulty,
+    target_from_nbits,
+)
+
+GENESIS_HEADER = bytes.fromhex(
+    "01000000" + "00" * 32
+    + "3ba3edfd7a7b12b27ac72c3e67768f617fc81bc3888a51323a9fb8aa4b1e5e4a"
+    + "29ab5f49" + "ffff001d" + "00000000"
+)
+GENESIS_NONCE = 2083236893
+GENESIS_HASH = "000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f"
+
+needs_numpy = pytest.mark.skipif(np is None, reason="numpy is not installed")
+ENGINES = [scan_hashlib, pytest.param(scan_numpy, marks=needs_numpy)]
+
+
+def test_targets():
+    assert target_from_nbits(0x1D00FFFF) == DIFF1_TARGET
+    assert target_from_difficulty(1.0) == DIFF1_TARGET
+    assert target_from_difficulty(2.0) == DIFF1_TARGET // 2
+    assert target_from_difficulty(0) == (1 << 256) - 1
+    digest = sha256d(GENESIS_HEADER[:76] + struct.pack("<I", GENESIS_NONCE))
+    assert digest[::-1].hex() == GENESIS_HASH
+    assert hash_meets_target(digest, target_from_nbits(0x1D00FFFF))
+
+
+@pytest.mark.parametrize("scan", ENGINES)
+def test_finds_the_genesis_nonce(scan):
+    target = target_from_nbits(0x1D00FFFF)
+    start = GENESIS_NONCE - 3000
+    hits = scan(GENESIS_HEADER, start, 5000, target)
+    assert [h.nonce for h in hits] == [GENESIS_NONCE]
+    assert hits[0].hash[::-1].hex() == GENESIS_HASH
+
+
+@pytest.mark.parametrize("scan", ENGINES)
+def test_scan_stops_at_the_top_of_the_nonce_space(scan):
+    # Every hash qualifies, so the hits are exactly the nonces tried.
+    hits = scan(GENESIS_HEADER, (1 << 32) - 5, 100, (1 << 256) - 1)
+    assert [h.nonce for h in hits] == list(range((1 << 32) - 5, 1 << 32))
+
+
+@needs_numpy
+@pytest.mark.parametrize("seed", range(6))
+def test_numpy_matches_hashlib_on_random_headers(seed):
+    header = os.urandom(76) + b"\0\0\0\0"
+    start = int.from_bytes(os.urandom(4), "little") & ~0xFFFF
+    # ~1 in 256 hashes qualifies: enough hits to compare, including on the
+    # batch boundaries.
+    target = target_from_difficulty(2.0 ** -24)
+    expected = scan_hashlib(header, start, 1 << 15, target)
+    got = scan_numpy(header, start, 1 << 15, target, batch=1 << 12)
+    assert got == expected
+    assert len(expected) > 40
+    for hit in expected:
+        assert hit.hash == sha256d(header[:76] + struct.pack("<I", hit.nonce))
+
+
+def test_get_engine():
+    assert get_engine("hashlib") is scan_hashlib
+    assert get_engine("auto") in (scan_hashlib, scan_numpy)
+    with pytest.raises(ValueError):
+        get_engine("gpu")
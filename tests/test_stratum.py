@@ -0,0 +1,151 @@
+"""
+StratumClient against the in-process mock pool (madgood/mockpool.py).
+"""
+import asyncio
+
+import pytest
+
+from madgood.mockpool import MockPool
+from madgood.stratum import StratumClient, StratumError, StratumJob
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+async def _session(pool_kwargs=None, **client_kwargs):
+    pool = MockPool(**(pool_kwargs or {}))
+    await pool.start()
+    client = StratumClient("bc1qtest", host=pool.host, port=pool.port,
+                           request_timeout=2, **client_kwargs)
+    await client.connect()
+    return pool, client
+
+
+def _broadcast(pool: MockPool, data: bytes):
+    for c in pool._clients.values():
+        c.send(data)
+
+
+def test_subscribe_authorize_and_first_job():
+    async def main():
+        pool, client = await _session({"extranonce2_size": 6})
+        try:
+            job = await client.wait_for_job(timeout=2)
+            assert client.authorized
+            assert client.extranonce1 == "00000001"
+            assert client.extranonce2_size == 6
+            assert isinstance(job, StratumJob)
+            assert job.job_id == "1"
+            assert client.difficulty == 1.0
+        finally:
+            await client.close()
+            await pool.close()
+
+    run(main())
+
+
+def test_submit_accepted_and_rejected():
+    async def main():
+        shares = []
+        pool, client = await _session({"reject_every": 2}, on_share=shares.append)
+        try:
+            job = await client.wait_for_job(timeout=2)
+            ok = await client.submit(job.job_id, "00" * 8, job.ntime, "00000000")
+            bad = await client.submit(job.job_id, "01" * 8, job.ntime, "00000001")
+            assert ok.accepted and ok.error is None
+            assert not bad.accepted and bad.error == "Low difficulty share"
+            assert shares == [ok, bad]
+            assert pool.stats().submits == 2
+        finally:
+            await client.close()
+            await pool.close()
+
+    run(main())
+
+
+def test_new_jobs_and_difficulty_arrive():
+    async def main():
+        difficulties = []
+        pool, client = await _session(on_difficulty=difficulties.append)
+        try:
+            first = await client.wait_for_job(timeout=2)
+            pool.difficulty = 4.0
+            _broadcast(pool, b'{"id": null, "method": "mining.set_difficulty", "params": [4]}\n')
+            pool._new_job(True)
+            second = await client.wait_for_job(first, timeout=2)
+            assert second.job_id != first.job_id
+            assert second.clean_jobs
+            assert second.difficulty == 4.0
+            assert difficulties[-1] == 4.0
+        finally:
+            await client.close()
+            await pool.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("line", [
+    b"[1, 2]\n",
+    b"42\n",
+    b"not json\n",
+    b'{"id": null, "method": "mining.notify", "params": ["short"]}\n',
+    b'{"id": null, "method": "mining.set_difficulty", "params": []}\n',
+    b'{"id": null, "method": "mining.set_difficulty", "params": ["x"]}\n',
+    b'{"id": [1], "result": true, "error": null}\n',
+])
+def test_malformed_message_is_skipped(line):
+    async def main():
+        pool, client = await _session()
+        try:
+            first = await client.wait_for_job(timeout=2)
+            _broadcast(pool, line)
+            pool._new_job(False)
+            second = await client.wait_for_job(first, timeout=2)
+            assert client.connected
+            share = await client.submit(second.job_id, "00" * 8, second.ntime, "00000000")
+            assert share.accepted
+        finally:
+            await client.close()
+            await pool.close()
+
+    run(main())
+
+
+def test_failing_callback_does_not_end_session():
+    calls = []
+
+    def on_job(job):
+        calls.append(job)
+        raise RuntimeError("callback bug")
+
+    async def main():
+        pool, client = await _session(on_job=on_job)
+        try:
+            first = await client.wait_for_job(timeout=2)
+            pool._new_job(False)
+            await client.wait_for_job(first, timeout=2)
+            assert client.connected
+            assert len(calls) == 2
+        finally:
+            await client.close()
+            await pool.close()
+
+    run(main())
+
+
+def test_pool_disconnect_marks_client_disconnected():
+    async def main():
+        lost = asyncio.Event()
+        pool, client = await _session(on_disconnect=lambda exc: lost.set())
+        try:
+            await client.wait_for_job(timeout=2)
+            await pool.close()
+            await asyncio.wait_for(lost.wait(), 2)
+            assert not client.connected
+            with pytest.raises(StratumError):
+                await client.submit("1", "00" * 8, "00000000", "00000000")
+        finally:
+            await client.close()
+
+    run(main())
@@ -0,0 +1,57 @@
+"""
+MinerSupervisor around the fake cpuminer and a MockPool.
+"""
+import os
+import time
+
+from madgood.aio import LoopThread
+from madgood.e2e import FAKE_CPUMINER
+from madgood.events import BUS_MINER_EXIT, EventBus
+from madgood.logstore import LogStore
+from madgood.mockpool import MockPool
+from madgood.stats import MinerStats
+from madgood.supervisor import MinerSupervisor
+
+
+def _dispatch_until(bus, predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        bus.dispatch()
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_stop_without_waiting_then_exit_event():
+    pool = MockPool()
+    host, port = pool.start_background()
+    stats = MinerStats()
+    bus = EventBus()
+    exits = []
+    bus.subscribe(lambda events: exits.extend(ev.payload for ev in events),
+                  kinds=[BUS_MINER_EXIT])
+    # Its own loop: it also installs a child watcher bound to that loop.
+    loop = LoopThread("test-supervisor")
+    env = dict(os.environ, MADGOOD_FAKE_STARTUP="0.05", MADGOOD_FAKE_REPORT="0.2")
+    sup = MinerSupervisor("bc1qsupervisor", [[0], [1]], stats, bus, LogStore(maxlen=50),
+                          pool_host=host, pool_port=port, binary=FAKE_CPUMINER,
+                          pin=False, use_api=False, env=env, loop=loop)
+    try:
+        stats.start()
+        sup.start()
+        assert _dispatch_until(bus, lambda: stats.snapshot().hashrate > 0)
+        assert sup.is_running() and not exits
+
+        t0 = time.perf_counter()
+        sup.stop(wait=False)
+        assert time.perf_counter() - t0 < 0.5
+        assert _dispatch_until(bus, lambda: exits)
+        assert exits == [sup]
+        assert not sup.is_running()
+        assert sup.wait(timeout=1) is False
+    finally:
+        sup.stop()
+        stats.stop()
+        pool.stop()
+        loop.stop()
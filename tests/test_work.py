@@ -0,0 +1,167 @@
+"""
+Coinbase, merkle root and header assembly in madgood.work.
+"""
+import os
+import struct
+import time
+
+from madgood.sha256d import sha256d, target_from_difficulty
+from madgood.stratum import StratumJob
+from madgood.work import JobTemplate, WorkGenerator
+
+# The genesis block's coinbase transaction and header fields.
+GENESIS_COINBASE = (
+    "01000000010000000000000000000000000000000000000000000000000000000000000000"
+    "ffffffff4d04ffff001d0104455468652054696d65732030332f4a616e2f32303039204368"
+    "616e63656c6c6f72206f6e206272696e6b206f66207365636f6e64206261696c6f757420666f"
+    "722062616e6b73ffffffff0100f2052a01000000434104678afdb0fe5548271967f1a67130b7"
+    "105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504e51ec112de5c384df7ba"
+    "0b8d578a4c702b6bf11d5fac00000000"
+)
+GENESIS_MERKLE_ROOT = "4a5e1e4baab89f3a32518a88c31bc87f618f76673e2cc77ab2127b7afdeda33b"
+GENESIS_HASH = "000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f"
+GENESIS_NONCE = 2083236893
+
+
+def _job(coinb1, coinb2, branch=(), job_id="1", prevhash="00" * 32, version="00000001",
+         nbits="1d00ffff", ntime="495fab29", difficulty=1.0, received_at=None, clean=True):
+    return StratumJob(job_id, prevhash, coinb1, coinb2, tuple(branch), version, nbits,
+                      ntime, clean, time.time() if received_at is None else received_at,
+                      difficulty)
+
+
+def _genesis_split():
+    # Cut the scriptSig's text into coinb1 | en1 (4 bytes) | en2 (4 bytes) | coinb2.
+    cut = 2 * 60
+    coinb1 = GENESIS_COINBASE[:cut]
+    en1 = GENESIS_COINBASE[cut:cut + 8]
+    en2 = GENESIS_COINBASE[cut + 8:cut + 16]
+    coinb2 = GENESIS_COINBASE[cut + 16:]
+    return coinb1, en1, en2, coinb2
+
+
+def _merkle_root(txids):
+    # Textbook tree over internal-order hashes, duplicating odd tails.
+    level = list(txids)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [sha256d(level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0]
+
+
+def test_genesis_header_rebuilds_exactly():
+    coinb1, en1, en2, coinb2 = _genesis_split()
+    tmpl = JobTemplate(_job(coinb1, coinb2), en1, extranonce2_size=4)
+
+    root = tmpl.merkle_root(bytes.fromhex(en2))
+    assert root[::-1].hex() == GENESIS_MERKLE_ROOT
+
+    header = tmpl.header(root, 1231006505)
+    assert len(header) == 80
+    assert header[76:] == b"\0\0\0\0"
+    block = header[:76] + struct.pack("<I", GENESIS_NONCE)
+    assert sha256d(block)[::-1].hex() == GENESIS_HASH
+
+
+def test_merkle_branch_matches_the_full_tree():
+    coinb1, coinb2 = "01" * 40, "02" * 30
+    en1, en2 = "aabbccdd", bytes.fromhex("00000007")
+    coinbase_txid = sha256d(bytes.fromhex(coinb1 + en1) + en2 + bytes.fromhex(coinb2))
+    for count in (1, 2, 3, 4, 7):
+        txids = [os.urandom(32) for _ in range(count)]
+        # The pool's branch: the coinbase's sibling at each level.
+        branch, level = [], [coinbase_txid] + txids
+        while len(level) > 1:
+            if len(level) % 2:
+                level.append(level[-1])
+            branch.append(level[1])
+            level = [sha256d(level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+        tmpl = JobTemplate(_job(coinb1, coinb2, [b.hex() for b in branch]), en1, 4)
+        assert tmpl.merkle_root(en2) == _merkle_root([coinbase_txid] + txids)
+
+
+def test_header_fields_are_in_wire_order():
+    prevhash = "".join(f"{i:02x}" for i in range(32))
+    tmpl = JobTemplate(_job("00", "00", prevhash=prevhash, version="20000000",
+                            nbits="1703a30c", difficulty=2.0), "", 4)
+    header = tmpl.header(b"\x11" * 32, 0x6751C2A0)
+    assert header[:4] == bytes.fromhex("00000020")
+    # Stratum's prevhash words are byte-swapped back to header order.
+    assert header[4:8] == bytes.fromhex("03020100")
+    assert header[36:68] == b"\x11" * 32
+    assert struct.unpack("<III", header[68:]) == (0x6751C2A0, 0x1703A30C, 0)
+    assert tmpl.target == target_from_difficulty(2.0)
+
+
+def test_ntime_follows_the_clock_since_the_job_arrived():
+    tmpl = JobTemplate(_job("00", "00", ntime="00000100", received_at=1000.0), "", 4)
+    assert tmpl.ntime_now(999.0) == 0x100
+    assert tmpl.ntime_now(1030.5) == 0x100 + 30
+
+
+def test_generator_rolls_extranonce2_and_ntime():
+    coinb1, en1, _, coinb2 = _genesis_split()
+    gen = WorkGenerator(en1, 4, ntime_roll=3)
+    gen.set_job(_job(coinb1, coinb2))
+    first = gen.build()
+    second = gen.build()
+    assert [w.extranonce2 for w in first] == ["00000000"] * 3
+    assert [w.ntime - first[0].ntime for w in first] == [0, 1, 2]
+    # Same merkle root across the ntime roll, a new one per extranonce2.
+    assert len({w.header[36:68] for w in first}) == 1
+    assert second[0].extranonce2 == "00000001"
+    assert second[0].header[36:68] != first[0].header[36:68]
+
+    assert second[0].header[36:68] == sha256d(
+        bytes.fromhex(coinb1 + en1 + "00000001" + coinb2))
+    assert first[0].submit_params(5) == ("1", "00000000", f"{first[0].ntime:08x}", "00000005")
+
+
+def test_extranonce2_space_runs_out():
+    gen = WorkGenerator("", 1)
+    gen.set_job(_job("00", "00"))
+    assert len([gen.build() for _ in range(256)]) == 256
+    assert gen.build() == []
+
+
+def test_new_job_and_extranonce_drop_queued_work():
+    gen = WorkGenerator("00000001", 4, queue_size=4)
+    gen.start()
+    try:
+        gen.set_job(_job("01" * 20, "02" * 20, job_id="a"))
+        first = gen.next_work(timeout=2)
+        assert first.job_id == "a"
+        gen.set_job(_job("01" * 20, "02" * 20, job_id="b", clean=False))
+        work = gen.next_work(timeout=2)
+        assert work.job_id == "b" and work.generation > first.generation
+        assert not work.clean_jobs
+
+        gen.set_extranonce("00000002")
+        again = gen.next_work(timeout=2)
+        assert again.job_id == "b" and again.clean_jobs
+        assert again.header[36:68] != work.header[36:68]
+        assert gen.job("a") is not None
+    finally:
+        gen.stop()
+
+
+def test_recent_jobs_are_bounded():
+    gen = WorkGenerator("", 4)
+    for i in range(20):
+        gen.set_job(_job("00", "00", job_id=f"{i:x}"))
+    assert gen.job("0") is None
+    assert gen.job(f"{19:x}") is not None
+    assert len(gen._jobs) == WorkGenerator.RECENT_JOBS
+
+
+def test_clean_jobs_make_older_work_stale():
+    gen = WorkGenerator("", 4)
+    gen.set_job(_job("00", "00", job_id="a"))
+    a = gen.build()[0]
+    gen.set_job(_job("00", "00", job_id="b", clean=False))
+    b = gen.build()[0]
+    assert not gen.is_stale(a) and not gen.is_stale(b)
+    gen.set_job(_job("00", "00", job_id="c"))
+    assert gen.is_stale(a) and gen.is_stale(b)
+    assert not gen.is_stale(gen.build()[0])
@@ -0,0 +1,66 @@
+"""
+HashingPool: nonce partitioning, exact hash counters, job-id bookkeeping.
+"""
+import time
+
+import pytest
+
+from madgood.workers import NONCE_SPACE, HashingPool, nonce_slice
+
+HEADER = bytes(range(76)) + b"\0\0\0\0"
+EVERY_HASH = (1 << 256) - 1
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 7, 16, 255])
+def test_nonce_slices_are_disjoint_and_cover_the_space(workers):
+    slices = [nonce_slice(i, workers) for i in range(workers)]
+    assert slices[0][0] == 0
+    assert slices[-1][1] == NONCE_SPACE
+    for (_, end), (start, _) in zip(slices, slices[1:]):
+        assert end == start
+    assert all(start < end for start, end in slices)
+    assert sum(end - start for start, end in slices) == NONCE_SPACE
+
+
+def test_counters_match_the_nonces_scanned():
+    # Every hash meets the target, so each scanned nonce comes back as a
+    # share and the counters can be checked one nonce at a time.
+    pool = HashingPool(2, engine="hashlib", chunk=64)
+    pool.start()
+    shares = []
+    try:
+        gen = pool.set_job(HEADER, EVERY_HASH, job_id="j1")
+        deadline = time.monotonic() + 10
+        while pool.total_hashes() < 1024 and time.monotonic() < deadline:
+            shares += pool.drain_shares()
+            time.sleep(0.005)
+        pool._job.set_stop()
+        while any(p.is_alive() for p in pool._procs) and time.monotonic() < deadline:
+            shares += pool.drain_shares()
+            time.sleep(0.005)
+        per_worker = pool.hashes_per_worker()
+        shares += pool.drain_shares()
+    finally:
+        pool.stop()
+
+    assert sum(per_worker) >= 1024
+    for worker, count in enumerate(per_worker):
+        start, _ = nonce_slice(worker, 2)
+        nonces = sorted(s.nonce for s in shares if s.worker == worker)
+        assert count % 64 == 0
+        assert nonces == list(range(start, start + count))
+    assert {s.generation for s in shares} == {gen}
+    assert pool.job_id_for(gen) == "j1"
+
+
+def test_job_ids_keep_only_recent_generations():
+    pool = HashingPool(1, engine="hashlib")
+    pool.start()
+    try:
+        gens = [pool.set_job(HEADER, 0, job_id=f"j{i}") for i in range(50)]
+    finally:
+        pool.stop()
+    assert len(pool._job_ids) == HashingPool.RECENT_JOBS
+    assert pool.job_id_for(gens[-1]) == "j49"
+    assert pool.job_id_for(gens[-HashingPool.RECENT_JOBS]) == f"j{50 - HashingPool.RECENT_JOBS}"
+    assert pool.job_id_for(gens[0]) == ""